@@ -0,0 +1,47 @@
+"""Add attendance_rollups table
+
+Revision ID: add_attendance_rollups
+Revises: add_subject_id_sessions
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_attendance_rollups'
+down_revision = 'add_subject_id_sessions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('attendance_rollups',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('student_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('class_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('subject_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('sessions_held', sa.Integer(), nullable=False),
+    sa.Column('sessions_attended', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint(
+        'student_id', 'class_id', 'subject_id', 'month',
+        name='unique_attendance_rollup',
+        postgresql_nulls_not_distinct=True
+    )
+    )
+    op.create_index('ix_attendance_rollups_class_month', 'attendance_rollups', ['class_id', 'month'], unique=False)
+    op.create_index('ix_attendance_rollups_subject_month', 'attendance_rollups', ['subject_id', 'month'], unique=False)
+    # Após aplicar, popular com: python scripts/rebuild_attendance_rollups.py
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_rollups_subject_month', table_name='attendance_rollups')
+    op.drop_index('ix_attendance_rollups_class_month', table_name='attendance_rollups')
+    op.drop_table('attendance_rollups')
@@ -0,0 +1,32 @@
+"""Add GIN index on audit_logs.details
+
+Revision ID: add_audit_details_gin
+Revises: partition_audit_logs
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_audit_details_gin'
+down_revision = 'partition_audit_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # jsonb_path_ops: menor que o operador padrão e atende apenas @> (filtros por chave/valor)
+    # Criado na tabela particionada, é replicado em cada partição (inclusive as futuras)
+    op.create_index(
+        'ix_audit_logs_details',
+        'audit_logs',
+        ['details'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'details': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_details', table_name='audit_logs')
@@ -0,0 +1,33 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: add_keyset_indexes
+Revises: add_attendance_rollups
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_keyset_indexes'
+down_revision = 'add_attendance_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_sessions_created_at_id', 'sessions', ['created_at', 'id'], unique=False)
+    op.create_index('ix_sessions_teacher_created_at_id', 'sessions', ['teacher_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_attendances_session_timestamp_id', 'attendances', ['session_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_attendances_student_timestamp_id', 'attendances', ['student_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_audit_logs_created_at_id', 'audit_logs', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_audit_logs_created_at_id', table_name='audit_logs')
+    op.drop_index('ix_attendances_student_timestamp_id', table_name='attendances')
+    op.drop_index('ix_attendances_session_timestamp_id', table_name='attendances')
+    op.drop_index('ix_sessions_teacher_created_at_id', table_name='sessions')
+    op.drop_index('ix_sessions_created_at_id', table_name='sessions')
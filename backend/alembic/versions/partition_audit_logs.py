@@ -0,0 +1,95 @@
+"""Partition audit_logs by month (range on created_at)
+
+Revision ID: partition_audit_logs
+Revises: add_device_credentials
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from datetime import date, datetime
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'partition_audit_logs'
+down_revision = 'add_device_credentials'
+branch_labels = None
+depends_on = None
+
+# Partições criadas à frente do mês atual (depois: scripts/maintain_audit_partitions.py)
+MONTHS_AHEAD = 3
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _audit_columns():
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('actor_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('action', sa.String(), nullable=False),
+        sa.Column('details', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['actor_id'], ['users.id'], ),
+    ]
+
+
+def upgrade() -> None:
+    op.drop_index('ix_audit_logs_created_at_id', table_name='audit_logs')
+    op.drop_index(op.f('ix_audit_logs_created_at'), table_name='audit_logs')
+    op.drop_index(op.f('ix_audit_logs_action'), table_name='audit_logs')
+    op.rename_table('audit_logs', 'audit_logs_unpartitioned')
+    op.execute("ALTER TABLE audit_logs_unpartitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_unpartitioned_pkey")
+
+    op.create_table('audit_logs',
+    *_audit_columns(),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_audit_logs_created_at_id', 'audit_logs', ['created_at', 'id'], unique=False)
+    op.create_index('ix_audit_logs_action_created_at_id', 'audit_logs', ['action', 'created_at', 'id'], unique=False)
+    op.create_index('ix_audit_logs_actor_created_at_id', 'audit_logs', ['actor_id', 'created_at', 'id'], unique=False)
+
+    # Partição DEFAULT: linhas fora das partições mensais nunca falham no INSERT
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    bind = op.get_bind()
+    first = bind.execute(sa.text("SELECT min(created_at) FROM audit_logs_unpartitioned")).scalar()
+    today = datetime.utcnow().date()
+    month = (first.date() if first else today).replace(day=1)
+    last = today.replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        end = _next_month(month)
+        op.execute(
+            f"CREATE TABLE audit_logs_{month:%Y_%m} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+    op.execute(
+        "INSERT INTO audit_logs (id, actor_id, action, details, created_at) "
+        "SELECT id, actor_id, action, details, created_at FROM audit_logs_unpartitioned"
+    )
+    op.drop_table('audit_logs_unpartitioned')
+
+
+def downgrade() -> None:
+    # Partições já arquivadas (removidas) não voltam
+    op.create_table('audit_logs_unpartitioned',
+    *_audit_columns(),
+    sa.PrimaryKeyConstraint('id', name='audit_logs_unpartitioned_pkey')
+    )
+    op.execute(
+        "INSERT INTO audit_logs_unpartitioned (id, actor_id, action, details, created_at) "
+        "SELECT id, actor_id, action, details, created_at FROM audit_logs"
+    )
+    # Remove a tabela particionada com todas as partições
+    op.drop_table('audit_logs')
+    op.rename_table('audit_logs_unpartitioned', 'audit_logs')
+    op.execute("ALTER TABLE audit_logs RENAME CONSTRAINT audit_logs_unpartitioned_pkey TO audit_logs_pkey")
+    op.create_index(op.f('ix_audit_logs_action'), 'audit_logs', ['action'], unique=False)
+    op.create_index(op.f('ix_audit_logs_created_at'), 'audit_logs', ['created_at'], unique=False)
+    op.create_index('ix_audit_logs_created_at_id', 'audit_logs', ['created_at', 'id'], unique=False)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, students, classes, courses, sessions, checkin, reports, audit, users, subjects
+from app.api.v1.endpoints import auth, students, classes, courses, sessions, checkin, reports, audit, users, subjects, system
 
 api_router = APIRouter()
 
@@ -13,4 +13,5 @@ api_router.include_router(checkin.router, prefix="/checkin", tags=["checkin"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 api_router.include_router(audit.router, prefix="/audit-logs", tags=["audit"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
 
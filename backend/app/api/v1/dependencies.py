@@ -1,10 +1,12 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.db.base import get_db
+from app.db.base import get_db, ReadSessionLocal
+from app.db.routing import use_replica_for
 from app.core.security import decode_token
 from app.models.user import User, UserRole
 from app.db.redis_client import get_redis
+from app.services.device_credential_service import is_device_token, decode_device_token, is_credential_revoked
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -38,9 +40,28 @@ def get_current_user(
             detail="User is inactive"
         )
     
+    # Commits desta sessão tornam o usuário "sticky" no primário (read-your-writes)
+    db.info["user_id"] = user.id
+    
     return user
 
 
+def get_read_db(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Dependency de leitura: réplica, ou primário logo após uma escrita do usuário"""
+    if not use_replica_for(current_user.id):
+        yield db
+        return
+    
+    read_db = ReadSessionLocal()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
 def get_current_active_admin(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -77,4 +98,43 @@ def get_current_student(
     return current_user
 
 
-
+def get_checkin_student(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """Dependency do check-in: aceita JWT de aluno ou credencial de aparelho (HMAC, sem bcrypt)"""
+    if not is_device_token(token):
+        return get_current_student(get_current_user(token, db))
+    
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate device credential",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    claims = decode_device_token(token)
+    if claims is None or is_credential_revoked(db, claims["credential_id"]):
+        raise credentials_exception
+    
+    user = db.query(User).filter(User.id == claims["user_id"]).first()
+    if user is None:
+        raise credentials_exception
+    
+    if user.is_active != "true":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User is inactive"
+        )
+    
+    if user.role != UserRole.STUDENT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    db.info["user_id"] = user.id
+    # O endpoint confere o aparelho do pedido com o da credencial
+    request.state.device_credential = claims
+    
+    return user
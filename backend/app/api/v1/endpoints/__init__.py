@@ -1,4 +1,4 @@
-from app.api.v1.endpoints import auth, students, courses, classes, subjects, sessions, checkin, reports, audit, users
+from app.api.v1.endpoints import auth, students, courses, classes, subjects, sessions, checkin, reports, audit, users, system
 
-__all__ = ["auth", "students", "courses", "classes", "subjects", "sessions", "checkin", "reports", "audit", "users"]
+__all__ = ["auth", "students", "courses", "classes", "subjects", "sessions", "checkin", "reports", "audit", "users", "system"]
 
@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
-from app.db.base import get_db
-from app.api.v1.dependencies import get_current_active_admin
+import uuid
+from app.api.v1.dependencies import get_current_active_admin, get_read_db
 from app.models.user import User
 from app.models.audit_log import AuditLog
+from app.api.v1.pagination import apply_keyset, set_next_cursor, to_datetime, to_uuid
 from app.api.v1.schemas.audit import AuditLogResponse
 
 router = APIRouter()
@@ -13,16 +14,26 @@ router = APIRouter()
 
 @router.get("/", response_model=List[AuditLogResponse])
 async def get_audit_logs(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     action: Optional[str] = Query(None),
     actor_id: Optional[str] = Query(None),
     from_date: Optional[datetime] = Query(None),
     to_date: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db),
+    session_id: Optional[uuid.UUID] = Query(None, description="details.session_id"),
+    attendance_id: Optional[uuid.UUID] = Query(None, description="details.attendance_id"),
+    student_id: Optional[uuid.UUID] = Query(None, description="details.student_id"),
+    class_id: Optional[uuid.UUID] = Query(None, description="details.class_id"),
+    user_id: Optional[uuid.UUID] = Query(None, description="details.user_id"),
+    device_id: Optional[str] = Query(None, description="details.device_id"),
+    email: Optional[str] = Query(None, description="details.email"),
+    matricula: Optional[str] = Query(None, description="details.matricula"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_admin)
 ):
-    """Lista logs de auditoria (apenas admin)"""
+    """Lista logs de auditoria (apenas admin, paginação por cursor via X-Next-Cursor)"""
     query = db.query(AuditLog)
     
     if action:
@@ -34,7 +45,37 @@ async def get_audit_logs(
     if to_date:
         query = query.filter(AuditLog.created_at <= to_date)
     
-    logs = query.order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
+    # Filtros em details: um único details @> {...} (índice GIN jsonb_path_ops); UUIDs gravados como texto
+    details_filters = {
+        key: str(value)
+        for key, value in {
+            "session_id": session_id,
+            "attendance_id": attendance_id,
+            "student_id": student_id,
+            "class_id": class_id,
+            "user_id": user_id,
+            "device_id": device_id,
+            "email": email,
+            "matricula": matricula,
+        }.items()
+        if value is not None
+    }
+    if details_filters:
+        query = query.filter(AuditLog.details.contains(details_filters))
+    
+    query = apply_keyset(
+        query,
+        [AuditLog.created_at, AuditLog.id],
+        cursor,
+        [to_datetime, to_uuid]
+    )
+    
+    # skip mantido por compatibilidade; com cursor o custo independe da página
+    if not cursor and skip:
+        query = query.offset(skip)
+    
+    logs = query.limit(limit).all()
+    set_next_cursor(response, logs, limit, lambda log: (log.created_at, log.id))
     
     return logs
 
@@ -4,12 +4,12 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.db.base import get_db
 from app.core.security import (
-    verify_password,
     create_access_token,
     create_refresh_token,
     decode_token
 )
 from app.core.config import settings
+from app.core.hashing import check_password, PasswordVerifyOverloadedError
 from app.models.user import User
 from app.api.v1.dependencies import get_current_user
 from app.api.v1.schemas.auth import Token, TokenRefresh, UserResponse
@@ -26,7 +26,17 @@ async def login(
     """Endpoint de login - retorna access_token e refresh_token"""
     user = db.query(User).filter(User.email == form_data.username).first()
     
-    if not user or not verify_password(form_data.password, user.password_hash):
+    # bcrypt fora do event loop; com a fila cheia, o cliente tenta de novo em instantes
+    try:
+        password_ok = bool(user) and await check_password(form_data.password, user.password_hash)
+    except PasswordVerifyOverloadedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
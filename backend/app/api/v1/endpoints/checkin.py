@@ -1,15 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from typing import List
 from app.db.base import get_db
-from app.api.v1.dependencies import get_current_student
-from app.models.user import User
+from app.api.v1.dependencies import get_current_user, get_current_student, get_checkin_student
+from app.models.user import User, UserRole
 from app.models.student import Student
 from app.models.session import Session as SessionModel
 from app.models.attendance import Attendance, AttendanceMethod
-from app.api.v1.schemas.checkin import CheckInRequest, CheckInResponse
+from app.models.device_credential import DeviceCredential
+from app.api.v1.schemas.checkin import (
+    CheckInRequest,
+    CheckInResponse,
+    DeviceEnrollRequest,
+    DeviceCredentialResponse,
+    DeviceEnrollResponse
+)
 from app.services.qrcode_service import validate_qr_token, mark_qr_token_as_used
 from app.services.attendance_service import register_attendance
 from app.services.audit_service import log_audit
+from app.services.device_credential_service import enroll_device, list_devices, revoke_device
 import uuid
 
 router = APIRouter()
@@ -18,10 +27,22 @@ router = APIRouter()
 @router.post("/", response_model=CheckInResponse, status_code=status.HTTP_200_OK)
 async def check_in(
     checkin_data: CheckInRequest,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_student)
+    current_user: User = Depends(get_checkin_student)
 ):
     """Endpoint principal de check-in via QR Code"""
+    # Credencial de aparelho só vale no aparelho para o qual foi emitida
+    device_credential = getattr(request.state, "device_credential", None)
+    if device_credential:
+        if checkin_data.device_id is None:
+            checkin_data.device_id = device_credential["device_id"]
+        elif checkin_data.device_id != device_credential["device_id"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Device credential was issued for another device"
+            )
+    
     # Validar token do QR
     validation_result = validate_qr_token(db, checkin_data.token)
     
@@ -107,4 +128,64 @@ async def check_in(
     }
 
 
+@router.post("/devices", response_model=DeviceEnrollResponse, status_code=status.HTTP_201_CREATED)
+async def enroll_checkin_device(
+    enroll_data: DeviceEnrollRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_student)
+):
+    """Cadastra o aparelho do aluno e emite credencial de check-in (token exibido uma única vez)"""
+    device_id = enroll_data.device_id.strip()
+    if not device_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="device_id is required"
+        )
+    
+    issued = enroll_device(db, current_user.id, device_id, enroll_data.name)
+    credential = issued["credential"]
+    
+    await log_audit(
+        db=db,
+        actor_id=current_user.id,
+        action="enroll_device",
+        details={"credential_id": str(credential.id), "device_id": device_id}
+    )
+    
+    response = DeviceCredentialResponse.model_validate(credential).model_dump()
+    return {**response, "token": issued["token"]}
 
+
+@router.get("/devices", response_model=List[DeviceCredentialResponse])
+async def list_checkin_devices(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_student)
+):
+    """Lista as credenciais de aparelho do aluno"""
+    return list_devices(db, current_user.id)
+
+
+@router.delete("/devices/{credential_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_checkin_device(
+    credential_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Revoga credencial de aparelho (o próprio aluno ou um admin)"""
+    credential = db.query(DeviceCredential).filter(DeviceCredential.id == credential_id).first()
+    if not credential or (credential.user_id != current_user.id and current_user.role != UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Device credential not found"
+        )
+    
+    revoke_device(db, credential)
+    
+    await log_audit(
+        db=db,
+        actor_id=current_user.id,
+        action="revoke_device",
+        details={"credential_id": str(credential.id), "user_id": str(credential.user_id)}
+    )
+    
+    return None
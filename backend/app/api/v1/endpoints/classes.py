@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 from app.db.base import get_db
-from app.api.v1.dependencies import get_current_active_admin
+from app.api.v1.dependencies import get_current_active_admin, get_read_db
 from app.models.user import User
 from app.models.class_model import Class
 from app.models.course import Course
@@ -52,7 +52,7 @@ async def create_class(
 async def list_classes(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_admin)
 ):
     """Lista todas as turmas"""
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.base import get_db
-from app.api.v1.dependencies import get_current_active_admin
+from app.api.v1.dependencies import get_current_active_admin, get_read_db
 from app.models.user import User
 from app.models.course import Course
 from app.api.v1.schemas.course import CourseCreate, CourseResponse, CourseUpdate
@@ -50,7 +50,7 @@ async def create_course(
 async def list_courses(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_admin)
 ):
     """Lista todos os cursos"""
@@ -1,28 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse, FileResponse, Response
+from sqlalchemy import func, and_
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
+from app.core.config import settings
 from app.db.base import get_db
-from app.api.v1.dependencies import get_current_teacher_or_admin, get_current_user
+from app.api.v1.dependencies import get_current_teacher_or_admin, get_current_user, get_read_db
 from app.models.user import User
 from app.models.attendance import Attendance
 from app.models.session import Session as SessionModel
 from app.models.student import Student
-from app.api.v1.schemas.report import AttendanceResponse, StudentAttendanceResponse
-from app.services.report_service import generate_csv_report, generate_xlsx_report, generate_pdf_report
+from app.models.class_model import Class
+from app.models.subject import Subject
+from app.models.attendance_rollup import AttendanceRollup
+from app.api.v1.pagination import apply_keyset, set_next_cursor, to_datetime, to_uuid
+from app.api.v1.schemas.report import (
+    AttendanceResponse,
+    StudentAttendanceResponse,
+    ReportJobCreate,
+    ReportJobResponse,
+    ClassReportResponse,
+    StudentSummaryResponse,
+    SubjectSummaryResponse,
+    SessionSheetResponse,
+    StudentAbsencesResponse,
+    ClassAbsencesResponse,
+    AtRiskResponse
+)
+from app.services.report_job_service import (
+    REPORT_FORMATS,
+    ReportQueueFullError,
+    submit_report_job,
+    get_report_job,
+    artifact_path
+)
+from app.services.report_service import RENDERERS, generate_report_bundle
+from app.services.term_bundle_service import list_term_classes, stream_term_bundle
+from app.services.report_cache_service import build_cache_key, get_cached_report, store_cached_report
+from app.services.rollup_service import rollup_aggregates, rollup_month_filters
+from app.services.absence_service import (
+    get_session_sheet,
+    get_student_absences,
+    count_class_absences,
+    count_held_sessions
+)
+from app.services.at_risk_service import get_at_risk
+from app.services.matrix_report_service import MATRIX_RENDERERS, generate_matrix_report
+from app.services.columnar_export_service import COLUMNAR_FORMATS, export_attendance_columnar
+from starlette.background import BackgroundTask
 import io
+import os
+import tempfile
 
 router = APIRouter()
 
+# Tamanho da página de presenças quando só o cursor é informado
+ATTENDANCE_PAGE_SIZE = 500
+
 
 @router.get("/sessions/{session_id}/attendances", response_model=List[AttendanceResponse])
 async def get_session_attendances(
     session_id: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Lista presenças de uma sessão"""
+    """Lista presenças de uma sessão (com limit/cursor, paginação via header X-Next-Cursor)"""
     # Verificar se sessão existe
     session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
     if not session:
@@ -38,9 +84,21 @@ async def get_session_attendances(
             detail="Not authorized to view this session"
         )
     
-    attendances = db.query(Attendance).filter(
-        Attendance.session_id == session_id
-    ).all()
+    query = apply_keyset(
+        db.query(Attendance).filter(Attendance.session_id == session_id),
+        [Attendance.timestamp, Attendance.id],
+        cursor,
+        [to_datetime, to_uuid],
+        descending=False
+    )
+    
+    # Sem limit/cursor a lista vem completa (clientes que não paginam, ex.: contagem ao vivo)
+    if limit is None and cursor is None:
+        return query.all()
+    
+    limit = limit or ATTENDANCE_PAGE_SIZE
+    attendances = query.limit(limit).all()
+    set_next_cursor(response, attendances, limit, lambda att: (att.timestamp, att.id))
     
     return attendances
 
@@ -48,12 +106,15 @@ async def get_session_attendances(
 @router.get("/students/{student_id}/attendance", response_model=List[StudentAttendanceResponse])
 async def get_student_attendance(
     student_id: str,
+    response: Response,
     from_date: Optional[datetime] = Query(None),
     to_date: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Histórico de presenças de um aluno"""
+    """Histórico de presenças de um aluno (com limit/cursor, paginação via header X-Next-Cursor)"""
     # Verificar se aluno existe
     student = db.query(Student).filter(Student.id == student_id).first()
     if not student:
@@ -77,22 +138,41 @@ async def get_student_attendance(
     if to_date:
         query = query.filter(Attendance.timestamp <= to_date)
     
-    attendances = query.order_by(Attendance.timestamp.desc()).all()
+    query = apply_keyset(
+        query,
+        [Attendance.timestamp, Attendance.id],
+        cursor,
+        [to_datetime, to_uuid]
+    )
+    
+    # Sem limit/cursor a lista vem completa (clientes que não paginam, ex.: contagem ao vivo)
+    if limit is None and cursor is None:
+        return query.all()
+    
+    limit = limit or ATTENDANCE_PAGE_SIZE
+    attendances = query.limit(limit).all()
+    set_next_cursor(response, attendances, limit, lambda att: (att.timestamp, att.id))
     
     return attendances
 
 
-@router.get("/classes/{class_id}/report")
+@router.get(
+    "/classes/{class_id}/report",
+    response_model=ClassReportResponse,
+    response_model_exclude_none=True
+)
 async def get_class_report(
     class_id: str,
-    month: Optional[int] = Query(None),
+    month: Optional[int] = Query(None, ge=1, le=12),
     year: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
+    include_attendances: bool = Query(False),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Relatório agregado por turma"""
     # Verificar se turma existe
-    from app.models.class_model import Class
     class_obj = db.query(Class).filter(Class.id == class_id).first()
     if not class_obj:
         raise HTTPException(
@@ -100,75 +180,526 @@ async def get_class_report(
             detail="Class not found"
         )
     
-    # Filtrar por mês/ano se fornecido
-    query = db.query(Attendance).join(SessionModel).filter(
-        SessionModel.class_id == class_id
-    )
-    
+    # Filtrar sessões da turma por mês/ano se fornecido
+    session_filters = [SessionModel.class_id == class_id]
     if month and year:
         start_date = datetime(year, month, 1)
         if month == 12:
             end_date = datetime(year + 1, 1, 1)
         else:
             end_date = datetime(year, month + 1, 1)
-        query = query.filter(Attendance.timestamp >= start_date, Attendance.timestamp < end_date)
+        session_filters += [SessionModel.start_at >= start_date, SessionModel.start_at < end_date]
+    elif year:
+        session_filters += [
+            SessionModel.start_at >= datetime(year, 1, 1),
+            SessionModel.start_at < datetime(year + 1, 1, 1)
+        ]
     
-    attendances = query.all()
+    total_sessions = db.query(func.count(SessionModel.id)).filter(*session_filters).scalar()
     
-    # Agregar dados
-    total_sessions = db.query(SessionModel).filter(
-        SessionModel.class_id == class_id
-    ).count()
+    # Agregar por aluno da turma a partir do rollup mensal (O(alunos))
+    sessions_held, sessions_attended, attendance_percentage = rollup_aggregates()
+    rows = db.query(
+        Student.id,
+        Student.user_id,
+        Student.matricula,
+        User.name,
+        sessions_held,
+        sessions_attended,
+        attendance_percentage
+    ).join(
+        User, User.id == Student.user_id
+    ).outerjoin(
+        AttendanceRollup,
+        and_(
+            AttendanceRollup.student_id == Student.user_id,
+            AttendanceRollup.class_id == class_id,
+            *rollup_month_filters(month, year)
+        )
+    ).filter(
+        Student.class_id == class_id
+    ).group_by(
+        Student.id, Student.user_id, Student.matricula, User.name
+    ).order_by(User.name).all()
     
-    students = db.query(Student).filter(Student.class_id == class_id).all()
+    percentages = [row.attendance_percentage for row in rows if row.attendance_percentage is not None]
+    
+    # Totais por método agregados no banco (independem da página de presenças)
+    by_method = {
+        method.value: count
+        for method, count in db.query(Attendance.method, func.count(Attendance.id)).join(
+            SessionModel, SessionModel.id == Attendance.session_id
+        ).filter(*session_filters).group_by(Attendance.method).all()
+    }
     
     report_data = {
         "class_id": class_id,
         "class_name": class_obj.name,
+        "month": month,
+        "year": year,
         "total_sessions": total_sessions,
-        "total_students": len(students),
-        "attendances": [
+        "total_students": len(rows),
+        "average_attendance_percentage": (
+            round(float(sum(percentages)) / len(percentages), 2) if percentages else None
+        ),
+        "total_attendances": sum(by_method.values()),
+        "attendances_by_method": by_method,
+        "students": [
+            {
+                "student_id": str(row.id),
+                "user_id": str(row.user_id),
+                "matricula": row.matricula,
+                "name": row.name,
+                "present_count": row.sessions_attended,
+                "sessions_held": row.sessions_held,
+                "attendance_percentage": (
+                    float(row.attendance_percentage) if row.attendance_percentage is not None else None
+                )
+            }
+            for row in rows
+        ]
+    }
+    
+    # Lista bruta de presenças apenas sob demanda, paginada
+    if include_attendances:
+        attendances = db.query(
+            Attendance.student_id,
+            Attendance.session_id,
+            Attendance.timestamp,
+            Attendance.method
+        ).join(SessionModel, SessionModel.id == Attendance.session_id).filter(
+            *session_filters
+        ).order_by(Attendance.timestamp, Attendance.id).offset(skip).limit(limit).all()
+        
+        report_data["attendances"] = [
             {
                 "student_id": str(att.student_id),
                 "session_id": str(att.session_id),
-                "timestamp": att.timestamp.isoformat()
+                "timestamp": att.timestamp,
+                "method": att.method.value
             }
             for att in attendances
         ]
-    }
     
     return report_data
 
 
-@router.get("/attendance/csv")
-async def export_attendance_csv(
-    session_id: Optional[str] = Query(None),
+@router.get("/students/{student_id}/summary", response_model=StudentSummaryResponse)
+async def get_student_summary(
+    student_id: str,
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Resumo de frequência de um aluno por turma/disciplina"""
+    student = db.query(Student).filter(Student.id == student_id).first()
+    if not student:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    
+    # Verificar permissão (próprio aluno, professor ou admin)
+    if (current_user.role.value not in ["admin", "teacher"] and 
+        current_user.id != student.user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this student's attendance"
+        )
+    
+    sessions_held, sessions_attended, attendance_percentage = rollup_aggregates()
+    rows = db.query(
+        AttendanceRollup.class_id,
+        AttendanceRollup.subject_id,
+        Subject.name.label("subject_name"),
+        sessions_held,
+        sessions_attended,
+        attendance_percentage
+    ).outerjoin(
+        Subject, Subject.id == AttendanceRollup.subject_id
+    ).filter(
+        AttendanceRollup.student_id == student.user_id,
+        *rollup_month_filters(month, year)
+    ).group_by(
+        AttendanceRollup.class_id, AttendanceRollup.subject_id, Subject.name
+    ).order_by(Subject.name).all()
+    
+    total_held = sum(row.sessions_held for row in rows)
+    total_attended = sum(row.sessions_attended for row in rows)
+    
+    return {
+        "student_id": str(student.id),
+        "matricula": student.matricula,
+        "month": month,
+        "year": year,
+        "sessions_held": total_held,
+        "sessions_attended": total_attended,
+        "attendance_percentage": round(total_attended * 100 / total_held, 2) if total_held else None,
+        "subjects": [
+            {
+                "class_id": str(row.class_id),
+                "subject_id": str(row.subject_id) if row.subject_id else None,
+                "subject_name": row.subject_name,
+                "sessions_held": row.sessions_held,
+                "sessions_attended": row.sessions_attended,
+                "attendance_percentage": (
+                    float(row.attendance_percentage) if row.attendance_percentage is not None else None
+                )
+            }
+            for row in rows
+        ]
+    }
+
+
+@router.get("/subjects/{subject_id}/summary", response_model=SubjectSummaryResponse)
+async def get_subject_summary(
+    subject_id: str,
     class_id: Optional[str] = Query(None),
-    student_id: Optional[str] = Query(None),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Resumo de frequência por aluno em uma disciplina"""
+    subject = db.query(Subject).filter(Subject.id == subject_id).first()
+    if not subject:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Subject not found"
+        )
+    
+    filters = [AttendanceRollup.subject_id == subject_id, *rollup_month_filters(month, year)]
+    if class_id:
+        filters.append(AttendanceRollup.class_id == class_id)
+    
+    sessions_held, sessions_attended, attendance_percentage = rollup_aggregates()
+    rows = db.query(
+        Student.id,
+        Student.user_id,
+        Student.matricula,
+        User.name,
+        sessions_held,
+        sessions_attended,
+        attendance_percentage
+    ).select_from(AttendanceRollup).join(
+        Student, Student.user_id == AttendanceRollup.student_id
+    ).join(
+        User, User.id == Student.user_id
+    ).filter(*filters).group_by(
+        Student.id, Student.user_id, Student.matricula, User.name
+    ).order_by(User.name).all()
+    
+    return {
+        "subject_id": str(subject.id),
+        "subject_name": subject.name,
+        "class_id": class_id,
+        "month": month,
+        "year": year,
+        "total_students": len(rows),
+        "students": [
+            {
+                "student_id": str(row.id),
+                "user_id": str(row.user_id),
+                "matricula": row.matricula,
+                "name": row.name,
+                "present_count": row.sessions_attended,
+                "sessions_held": row.sessions_held,
+                "attendance_percentage": (
+                    float(row.attendance_percentage) if row.attendance_percentage is not None else None
+                )
+            }
+            for row in rows
+        ]
+    }
+
+
+@router.get("/sessions/{session_id}/sheet", response_model=SessionSheetResponse)
+async def get_session_attendance_sheet(
+    session_id: str,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Lista de chamada da sessão: alunos da turma marcados como presentes ou ausentes"""
+    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    # Verificar permissão (professor da sessão ou admin)
+    if current_user.role.value != "admin" and session.teacher_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this session"
+        )
+    
+    rows = get_session_sheet(db, session)
+    present_count = sum(1 for row in rows if row.present)
+    
+    return {
+        "session_id": str(session.id),
+        "class_id": str(session.class_id),
+        "start_at": session.start_at,
+        "status": session.status.value,
+        "total_students": len(rows),
+        "present_count": present_count,
+        "absent_count": len(rows) - present_count,
+        "students": [
+            {
+                "student_id": str(row.student_id),
+                "user_id": str(row.user_id),
+                "matricula": row.matricula,
+                "name": row.name,
+                "present": row.present,
+                "timestamp": row.timestamp,
+                "method": row.method.value if row.method else None
+            }
+            for row in rows
+        ]
+    }
+
+
+@router.get("/students/{student_id}/absences", response_model=StudentAbsencesResponse)
+async def get_student_absence_list(
+    student_id: str,
     from_date: Optional[datetime] = Query(None),
     to_date: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Faltas de um aluno (sessões encerradas da turma sem presença)"""
+    student = db.query(Student).filter(Student.id == student_id).first()
+    if not student:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    
+    # Verificar permissão (próprio aluno, professor ou admin)
+    if (current_user.role.value not in ["admin", "teacher"] and 
+        current_user.id != student.user_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this student's attendance"
+        )
+    
+    rows = get_student_absences(db, student, from_date, to_date)
+    
+    return {
+        "student_id": str(student.id),
+        "matricula": student.matricula,
+        "from_date": from_date,
+        "to_date": to_date,
+        "total_absences": len(rows),
+        "absences": [
+            {
+                "session_id": str(row.session_id),
+                "start_at": row.start_at,
+                "subject_id": str(row.subject_id) if row.subject_id else None,
+                "subject_name": row.subject_name
+            }
+            for row in rows
+        ]
+    }
+
+
+@router.get("/classes/{class_id}/absences", response_model=ClassAbsencesResponse)
+async def get_class_absences(
+    class_id: str,
+    from_date: Optional[datetime] = Query(None),
+    to_date: Optional[datetime] = Query(None),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_teacher_or_admin)
 ):
-    """Exporta relatório de presenças em CSV"""
-    csv_content = await generate_csv_report(
-        db=db,
-        session_id=session_id,
+    """Total de faltas por aluno da turma em um período (ex.: semestre)"""
+    class_obj = db.query(Class).filter(Class.id == class_id).first()
+    if not class_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Class not found"
+        )
+    
+    rows = count_class_absences(db, class_id, from_date, to_date)
+    
+    return {
+        "class_id": class_id,
+        "class_name": class_obj.name,
+        "from_date": from_date,
+        "to_date": to_date,
+        "sessions_held": count_held_sessions(db, class_id, from_date, to_date),
+        "students": [
+            {
+                "student_id": str(row.student_id),
+                "user_id": str(row.user_id),
+                "matricula": row.matricula,
+                "name": row.name,
+                "absences": row.absences
+            }
+            for row in rows
+        ]
+    }
+
+
+@router.get("/at-risk", response_model=AtRiskResponse)
+async def get_at_risk_students(
+    class_id: Optional[str] = Query(None),
+    course_id: Optional[str] = Query(None),
+    threshold: Optional[float] = Query(None, gt=0, le=1),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Alunos abaixo da frequência mínima na turma ou no curso (menor frequência primeiro)"""
+    if bool(class_id) == bool(course_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide exactly one of class_id or course_id"
+        )
+    
+    scope, scope_id = ("class", class_id) if class_id else ("course", course_id)
+    threshold = threshold or settings.AT_RISK_THRESHOLD
+    
+    total, members = get_at_risk(scope, scope_id, threshold, limit)
+    
+    # Completar dados dos alunos da página em uma consulta
+    students = {}
+    if members:
+        rows = db.query(
+            Student.id, Student.user_id, Student.matricula, User.name
+        ).join(User, User.id == Student.user_id).filter(
+            Student.user_id.in_([user_id for user_id, _ in members])
+        ).all()
+        students = {str(row.user_id): row for row in rows}
+    
+    return {
+        "scope": scope,
+        "scope_id": scope_id,
+        "threshold": threshold,
+        "total_at_risk": total,
+        "students": [
+            {
+                "student_id": str(students[user_id].id),
+                "user_id": user_id,
+                "matricula": students[user_id].matricula,
+                "name": students[user_id].name,
+                "attendance_percentage": round(score * 100, 2)
+            }
+            for user_id, score in members
+            if user_id in students
+        ]
+    }
+
+
+@router.get("/matrix/{fmt}")
+async def export_attendance_matrix(
+    fmt: str,
+    class_id: Optional[str] = Query(None),
+    course_id: Optional[str] = Query(None),
+    subject_id: Optional[str] = Query(None),
+    from_date: Optional[datetime] = Query(None),
+    to_date: Optional[datetime] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Exporta o diário de classe (alunos x sessões, P/F) em CSV, XLSX ou PDF"""
+    if fmt not in MATRIX_RENDERERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format. Use one of: {', '.join(MATRIX_RENDERERS)}"
+        )
+    
+    if not class_id and not course_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="class_id or course_id is required"
+        )
+    
+    content = await generate_matrix_report(
+        db,
+        fmt,
         class_id=class_id,
-        student_id=student_id,
+        course_id=course_id,
+        subject_id=subject_id,
         from_date=from_date,
         to_date=to_date
     )
+    if isinstance(content, str):
+        content = content.encode()
+    
+    _, media_type, extension = MATRIX_RENDERERS[fmt]
+    return StreamingResponse(
+        io.BytesIO(content),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=attendance_matrix.{extension}"}
+    )
+
+
+async def cached_report_response(
+    request: Request,
+    fmt: str,
+    filters: dict,
+    db: Session
+) -> Response:
+    """Serve relatório do cache (com ETag) ou gera e armazena"""
+    # Gerado no primário: a chave usa versões já incrementadas no primário, e um conteúdo
+    # lido da réplica atrasada ficaria em cache com ETag novo até o TTL
+    generator, media_type, extension = REPORT_FORMATS[fmt]
+    cache_key = build_cache_key(fmt, filters)
+    
+    cached = get_cached_report(cache_key)
+    if cached:
+        content, etag = cached
+    else:
+        content = await generator(db=db, **filters)
+        if isinstance(content, str):
+            content = content.encode()
+        etag = store_cached_report(cache_key, content)
+    
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache"
+    }
+    
+    # ETag pode voltar como fraca (W/) quando a resposta foi comprimida
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.removeprefix("W/") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
+    headers["Content-Disposition"] = f"attachment; filename=attendance_report.{extension}"
     return StreamingResponse(
-        io.BytesIO(csv_content.encode()),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=attendance_report.csv"}
+        io.BytesIO(content),
+        media_type=media_type,
+        headers=headers
     )
 
 
+@router.get("/attendance/csv")
+async def export_attendance_csv(
+    request: Request,
+    session_id: Optional[str] = Query(None),
+    class_id: Optional[str] = Query(None),
+    student_id: Optional[str] = Query(None),
+    from_date: Optional[datetime] = Query(None),
+    to_date: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Exporta relatório de presenças em CSV"""
+    filters = {
+        "session_id": session_id,
+        "class_id": class_id,
+        "student_id": student_id,
+        "from_date": from_date,
+        "to_date": to_date
+    }
+    return await cached_report_response(request, "csv", filters, db)
+
+
 @router.get("/attendance/xlsx")
 async def export_attendance_xlsx(
+    request: Request,
     session_id: Optional[str] = Query(None),
     class_id: Optional[str] = Query(None),
     student_id: Optional[str] = Query(None),
@@ -178,24 +709,19 @@ async def export_attendance_xlsx(
     current_user: User = Depends(get_current_teacher_or_admin)
 ):
     """Exporta relatório de presenças em XLSX"""
-    xlsx_content = await generate_xlsx_report(
-        db=db,
-        session_id=session_id,
-        class_id=class_id,
-        student_id=student_id,
-        from_date=from_date,
-        to_date=to_date
-    )
-    
-    return StreamingResponse(
-        io.BytesIO(xlsx_content),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=attendance_report.xlsx"}
-    )
+    filters = {
+        "session_id": session_id,
+        "class_id": class_id,
+        "student_id": student_id,
+        "from_date": from_date,
+        "to_date": to_date
+    }
+    return await cached_report_response(request, "xlsx", filters, db)
 
 
 @router.get("/attendance/pdf")
 async def export_attendance_pdf(
+    request: Request,
     session_id: Optional[str] = Query(None),
     class_id: Optional[str] = Query(None),
     student_id: Optional[str] = Query(None),
@@ -205,8 +731,45 @@ async def export_attendance_pdf(
     current_user: User = Depends(get_current_teacher_or_admin)
 ):
     """Exporta relatório de presenças em PDF"""
-    pdf_content = await generate_pdf_report(
-        db=db,
+    filters = {
+        "session_id": session_id,
+        "class_id": class_id,
+        "student_id": student_id,
+        "from_date": from_date,
+        "to_date": to_date
+    }
+    return await cached_report_response(request, "pdf", filters, db)
+
+
+def parse_report_formats(formats: str) -> List[str]:
+    """Valida a lista de formatos separados por vírgula (sem repetição)"""
+    requested = list(dict.fromkeys(fmt.strip() for fmt in formats.split(",") if fmt.strip()))
+    unsupported = [fmt for fmt in requested if fmt not in RENDERERS]
+    if not requested or unsupported:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported report formats: {', '.join(unsupported) or formats}"
+        )
+    return requested
+
+
+@router.get("/attendance/bundle")
+async def export_attendance_bundle(
+    formats: str = Query("csv,xlsx,pdf", description="Formatos separados por vírgula"),
+    session_id: Optional[str] = Query(None),
+    class_id: Optional[str] = Query(None),
+    student_id: Optional[str] = Query(None),
+    from_date: Optional[datetime] = Query(None),
+    to_date: Optional[datetime] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Exporta vários formatos em um ZIP com uma única leitura das presenças"""
+    requested = parse_report_formats(formats)
+    
+    content = await generate_report_bundle(
+        db,
+        requested,
         session_id=session_id,
         class_id=class_id,
         student_id=student_id,
@@ -215,10 +778,193 @@ async def export_attendance_pdf(
     )
     
     return StreamingResponse(
-        io.BytesIO(pdf_content),
-        media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=attendance_report.pdf"}
+        io.BytesIO(content),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=attendance_report.zip"}
     )
 
 
+@router.get("/term-bundle")
+async def export_term_bundle(
+    from_date: datetime = Query(...),
+    to_date: datetime = Query(...),
+    course_id: Optional[str] = Query(None),
+    formats: str = Query("xlsx,pdf", description="Formatos separados por vírgula"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Relatórios do período para todas as turmas (ou de um curso) em um único ZIP"""
+    requested = parse_report_formats(formats)
+    
+    classes = list_term_classes(db, course_id)
+    if not classes:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No classes found"
+        )
+    
+    # Cada turma é renderizada em um processo do pool; o ZIP é enviado conforme terminam
+    return StreamingResponse(
+        stream_term_bundle(classes, requested, from_date, to_date),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=term_reports.zip"}
+    )
+
+
+async def columnar_report_response(fmt: str, filters: dict, db: Session) -> FileResponse:
+    """Gera exportação colunar em arquivo temporário e devolve para download"""
+    _, media_type, extension = COLUMNAR_FORMATS[fmt]
+    
+    # Arquivo temporário em disco: a memória fica limitada a um lote por vez
+    fd, path = tempfile.mkstemp(suffix=f".{extension}")
+    os.close(fd)
+    try:
+        await export_attendance_columnar(db, fmt, path, **filters)
+    except Exception:
+        os.remove(path)
+        raise
+    
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=f"attendance_report.{extension}",
+        background=BackgroundTask(os.remove, path)
+    )
+
+
+@router.get("/attendance/parquet")
+async def export_attendance_parquet(
+    session_id: Optional[str] = Query(None),
+    class_id: Optional[str] = Query(None),
+    student_id: Optional[str] = Query(None),
+    from_date: Optional[datetime] = Query(None),
+    to_date: Optional[datetime] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Exporta relatório de presenças em Parquet (colunas tipadas)"""
+    filters = {
+        "session_id": session_id,
+        "class_id": class_id,
+        "student_id": student_id,
+        "from_date": from_date,
+        "to_date": to_date
+    }
+    return await columnar_report_response("parquet", filters, db)
+
+
+@router.get("/attendance/arrow")
+async def export_attendance_arrow(
+    session_id: Optional[str] = Query(None),
+    class_id: Optional[str] = Query(None),
+    student_id: Optional[str] = Query(None),
+    from_date: Optional[datetime] = Query(None),
+    to_date: Optional[datetime] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Exporta relatório de presenças em Arrow IPC (colunas tipadas)"""
+    filters = {
+        "session_id": session_id,
+        "class_id": class_id,
+        "student_id": student_id,
+        "from_date": from_date,
+        "to_date": to_date
+    }
+    return await columnar_report_response("arrow", filters, db)
+
 
+def job_to_response(job: dict) -> dict:
+    """Converte o estado de um job para o formato de resposta"""
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "progress": job.get("progress", 0),
+        "format": job["format"],
+        "created_at": job["created_at"],
+        "finished_at": job.get("finished_at"),
+        "expires_at": job.get("expires_at"),
+        "size_bytes": job.get("size_bytes"),
+        "error": job.get("error"),
+        "download_url": (
+            f"/api/v1/reports/jobs/{job['job_id']}/download"
+            if job["status"] == "done" else None
+        )
+    }
+
+
+def get_job_for_user(job_id: str, current_user: User) -> dict:
+    """Busca job verificando se pertence ao usuário (ou se é admin)"""
+    job = get_report_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    
+    if current_user.role.value != "admin" and job["owner_id"] != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this report job"
+        )
+    
+    return job
+
+
+@router.post("/jobs", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_report_job(
+    job_data: ReportJobCreate,
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Enfileira a geração assíncrona de um relatório de presenças"""
+    filters = job_data.model_dump(exclude={"format"})
+    
+    try:
+        job_id = submit_report_job(current_user.id, job_data.format, filters)
+    except ReportQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "30"}
+        )
+    
+    return job_to_response(get_report_job(job_id))
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Consulta status e progresso de um job de relatório"""
+    job = get_job_for_user(job_id, current_user)
+    return job_to_response(job)
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Faz download do artefato gerado por um job de relatório"""
+    job = get_job_for_user(job_id, current_user)
+    
+    if job["status"] != "done":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report job is {job['status']}"
+        )
+    
+    path = artifact_path(job_id, job["format"])
+    if not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Report artifact expired"
+        )
+    
+    _, media_type, extension = REPORT_FORMATS[job["format"]]
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=f"attendance_report.{extension}"
+    )
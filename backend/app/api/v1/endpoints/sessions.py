@@ -1,17 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
 from app.db.base import get_db
-from app.api.v1.dependencies import get_current_teacher_or_admin, get_current_user, get_current_active_admin
+from app.api.v1.dependencies import get_current_teacher_or_admin, get_current_user, get_current_active_admin, get_read_db
 from app.models.user import User
 from app.models.session import Session as SessionModel, SessionStatus
 from app.models.class_model import Class
 from app.models.subject import Subject
 from app.models.class_subject import ClassSubject
+from app.api.v1.pagination import apply_keyset, set_next_cursor, to_datetime, to_uuid
 from app.api.v1.schemas.session import SessionCreate, SessionResponse, QRCodeResponse
 from app.services.qrcode_service import create_qr_token_for_session
 from app.services.audit_service import log_audit
+from app.services.report_cache_service import bump_report_versions
+from app.services.rollup_service import record_session_closed_rollup
+from app.services.at_risk_service import refresh_class_ratios
 import uuid
 
 router = APIRouter()
@@ -19,24 +23,36 @@ router = APIRouter()
 
 @router.get("/", response_model=List[SessionResponse])
 async def list_sessions(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Lista todas as sessões"""
+    """Lista todas as sessões (paginação por cursor via header X-Next-Cursor)"""
+    query = db.query(SessionModel).options(
+        joinedload(SessionModel.class_obj),
+        joinedload(SessionModel.subject)
+    )
+    
     # Admin vê todas as sessões, professores veem apenas as suas
-    if current_user.role.value == "admin":
-        sessions = db.query(SessionModel).options(
-            joinedload(SessionModel.class_obj),
-            joinedload(SessionModel.subject)
-        ).order_by(SessionModel.created_at.desc()).offset(skip).limit(limit).all()
-    else:
-        # Professores veem apenas suas sessões
-        sessions = db.query(SessionModel).options(
-            joinedload(SessionModel.class_obj),
-            joinedload(SessionModel.subject)
-        ).filter(SessionModel.teacher_id == current_user.id).order_by(SessionModel.created_at.desc()).offset(skip).limit(limit).all()
+    if current_user.role.value != "admin":
+        query = query.filter(SessionModel.teacher_id == current_user.id)
+    
+    query = apply_keyset(
+        query,
+        [SessionModel.created_at, SessionModel.id],
+        cursor,
+        [to_datetime, to_uuid]
+    )
+    
+    # skip mantido por compatibilidade; com cursor o custo independe da página
+    if not cursor and skip:
+        query = query.offset(skip)
+    
+    sessions = query.limit(limit).all()
+    set_next_cursor(response, sessions, limit, lambda s: (s.created_at, s.id))
     
     return sessions
 
@@ -155,11 +171,25 @@ async def close_session(
             detail="Not authorized to close this session"
         )
     
+    was_open = session.status == SessionStatus.OPEN
+    
     session.status = SessionStatus.CLOSED
     session.end_at = datetime.utcnow()
+    
+    # Contabilizar a sessão no rollup apenas no primeiro encerramento
+    if was_open:
+        record_session_closed_rollup(db, session)
+    
     db.commit()
     db.refresh(session)
     
+    # Invalidar relatórios em cache da sessão/turma
+    bump_report_versions(session_id=session.id, class_id=session.class_id)
+    
+    # Faltas desta sessão alteram o score de frequência da turma
+    if was_open:
+        refresh_class_ratios(db, session.class_id)
+    
     await log_audit(
         db=db,
         actor_id=current_user.id,
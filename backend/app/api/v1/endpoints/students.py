@@ -1,15 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import List, Optional
 from app.db.base import get_db
-from app.api.v1.dependencies import get_current_active_admin
+from app.api.v1.dependencies import get_current_active_admin, get_read_db
 from app.models.user import User, UserRole
 from app.models.student import Student
 from app.models.class_model import Class
-from app.api.v1.schemas.student import StudentCreate, StudentResponse, StudentUpdate, CSVUploadResponse
-from app.core.security import get_password_hash
-from app.services.csv_upload_service import process_student_csv
+from app.api.v1.pagination import apply_keyset, set_next_cursor
+from app.api.v1.schemas.student import StudentCreate, StudentResponse, StudentUpdate, CSVUploadResponse, RosterSyncResponse, ImportJobResponse
+from app.core.hashing import hash_password
+from app.services.csv_upload_service import (
+    process_student_csv,
+    load_roster_rows,
+    file_error_result,
+    roster_format,
+    RosterFileError,
+    DEFAULT_PASSWORD
+)
+from app.services.roster_sync_service import sync_student_roster
+from app.services.import_job_service import (
+    submit_import_job,
+    get_import_job,
+    ImportQueueFullError,
+    ImportTooLargeError
+)
 from app.services.audit_service import log_audit
+from app.services.at_risk_service import move_student_between_classes
 import uuid
 
 router = APIRouter()
@@ -71,7 +87,7 @@ async def create_student(
         name=student_data.name,
         email=student_data.email,
         role=UserRole.STUDENT,
-        password_hash=get_password_hash(student_data.password or "senha123"),  # Senha padrão
+        password_hash=await hash_password(student_data.password or DEFAULT_PASSWORD),  # Senha padrão
         is_active="true"
     )
     db.add(user)
@@ -104,13 +120,29 @@ async def create_student(
 
 @router.get("/", response_model=List[StudentResponse])
 async def list_students(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_admin)
 ):
-    """Lista todos os alunos"""
-    students = db.query(Student).options(joinedload(Student.user)).offset(skip).limit(limit).all()
+    """Lista todos os alunos (ordenados por matrícula, cursor via header X-Next-Cursor)"""
+    # students não tem created_at: a matrícula é única e já indexada
+    query = apply_keyset(
+        db.query(Student).options(joinedload(Student.user)),
+        [Student.matricula],
+        cursor,
+        [str],
+        descending=False
+    )
+    
+    # skip mantido por compatibilidade; com cursor o custo independe da página
+    if not cursor and skip:
+        query = query.offset(skip)
+    
+    students = query.limit(limit).all()
+    set_next_cursor(response, students, limit, lambda student: (student.matricula,))
     return [student_to_response(student) for student in students]
 
 
@@ -146,6 +178,7 @@ async def update_student(
         )
     
     user = db.query(User).filter(User.id == student.user_id).first()
+    old_class_id = student.class_id
     
     # Atualizar campos
     if student_data.name:
@@ -172,6 +205,9 @@ async def update_student(
     
     db.commit()
     
+    # Transferência de turma: tirar o aluno do score de frequência da turma antiga
+    move_student_between_classes(db, student.user_id, old_class_id, student.class_id)
+    
     # Recarregar estudante com relacionamento user
     student_with_user = db.query(Student).options(joinedload(Student.user)).filter(Student.id == student.id).first()
     
@@ -215,19 +251,24 @@ async def delete_student(
 @router.post("/upload-csv", response_model=CSVUploadResponse, status_code=status.HTTP_200_OK)
 async def upload_students_csv(
     file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Apenas valida o arquivo, sem gravar nada"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_admin)
 ):
-    """Upload de arquivo CSV para criação em lote de alunos"""
+    """Upload de arquivo CSV ou XLSX para criação em lote de alunos"""
     # Validar extensão
-    if not file.filename.endswith('.csv'):
+    if roster_format(file.filename) is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be a CSV file"
+            detail="File must be a CSV or XLSX file"
         )
     
-    # Processar CSV
-    result = await process_student_csv(file, db, current_user.id)
+    # Processar arquivo
+    result = await process_student_csv(file, db, current_user.id, dry_run=dry_run)
+    
+    # Validação não altera dados: sem registro de auditoria
+    if dry_run:
+        return result
     
     await log_audit(
         db=db,
@@ -244,4 +285,87 @@ async def upload_students_csv(
     return result
 
 
+@router.post("/sync", response_model=RosterSyncResponse, status_code=status.HTTP_200_OK)
+async def sync_students_roster(
+    file: UploadFile = File(...),
+    deactivate_missing: bool = Query(False, description="Desativa alunos ativos ausentes do arquivo"),
+    dry_run: bool = Query(False, description="Apenas calcula as mudanças, sem gravar nada"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_admin)
+):
+    """Sincroniza o cadastro com o arquivo completo de alunos (diferenças por matrícula)"""
+    if roster_format(file.filename) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a CSV or XLSX file"
+        )
+    
+    try:
+        rows = await load_roster_rows(file)
+    except RosterFileError as e:
+        return {**file_error_result(e), "dry_run": dry_run}
+    
+    result = await sync_student_roster(db, rows, deactivate_missing=deactivate_missing, dry_run=dry_run)
+    
+    if dry_run:
+        return result
+    
+    await log_audit(
+        db=db,
+        actor_id=current_user.id,
+        action="sync_students_roster",
+        details={
+            "filename": file.filename,
+            "inserted": result["inserted"],
+            "updated": result["updated"],
+            "deactivated": result["deactivated"],
+            "unchanged": result["unchanged"],
+            "error_count": result["error_count"]
+        }
+    )
+    
+    return result
 
+
+@router.post("/import-jobs", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_import_job(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_active_admin)
+):
+    """Importa um CSV/XLSX grande em background (lotes com commit, progresso em /import-jobs/{id})"""
+    if roster_format(file.filename) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a CSV or XLSX file"
+        )
+    
+    try:
+        job_id = await submit_import_job(file, current_user.id)
+    except ImportTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except ImportQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "30"}
+        )
+    
+    return get_import_job(job_id)
+
+
+@router.get("/import-jobs/{job_id}", response_model=ImportJobResponse)
+async def get_import_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_active_admin)
+):
+    """Consulta progresso e erros parciais de uma importação"""
+    job = get_import_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    return job
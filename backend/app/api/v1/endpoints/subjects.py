@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from app.db.base import get_db
-from app.api.v1.dependencies import get_current_active_admin, get_current_user
+from app.api.v1.dependencies import get_current_active_admin, get_current_user, get_read_db
 from app.models.user import User
 from app.models.subject import Subject
 from app.models.class_subject import ClassSubject
@@ -113,7 +113,7 @@ async def list_subjects(
     skip: int = 0,
     limit: int = 100,
     course_id: Optional[str] = Query(None, description="Filter by course ID"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_admin)
 ):
     """Lista todas as disciplinas"""
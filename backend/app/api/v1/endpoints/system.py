@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from app.api.v1.dependencies import get_current_active_admin
+from app.core.hashing import get_verify_stats
+from app.services.audit_service import get_audit_writer_stats
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_system_stats(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """Estado dos pools e filas internos (apenas admin; fora do /health público)"""
+    return {
+        "password_verify": get_verify_stats(),
+        "audit_writer": get_audit_writer_stats()
+    }
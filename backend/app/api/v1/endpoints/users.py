@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.db.base import get_db
-from app.api.v1.dependencies import get_current_active_admin
+from app.api.v1.dependencies import get_current_active_admin, get_read_db
 from app.models.user import User
+from app.api.v1.pagination import apply_keyset, set_next_cursor, to_datetime, to_uuid
 from app.api.v1.schemas.user import UserCreate, UserResponse, UserUpdate
-from app.core.security import get_password_hash
+from app.core.hashing import hash_password
 from app.services.audit_service import log_audit
 import uuid
 
@@ -14,13 +15,27 @@ router = APIRouter()
 
 @router.get("/", response_model=List[UserResponse])
 async def list_users(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_admin)
 ):
-    """Lista todos os usuários"""
-    users = db.query(User).order_by(User.created_at.desc()).offset(skip).limit(limit).all()
+    """Lista todos os usuários (paginação por cursor via header X-Next-Cursor)"""
+    query = apply_keyset(
+        db.query(User),
+        [User.created_at, User.id],
+        cursor,
+        [to_datetime, to_uuid]
+    )
+    
+    # skip mantido por compatibilidade; com cursor o custo independe da página
+    if not cursor and skip:
+        query = query.offset(skip)
+    
+    users = query.limit(limit).all()
+    set_next_cursor(response, users, limit, lambda user: (user.created_at, user.id))
     return users
 
 
@@ -61,7 +76,7 @@ async def create_user(
         name=user_data.name,
         email=user_data.email,
         role=user_data.role,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await hash_password(user_data.password),
         is_active="true"
     )
     db.add(user)
@@ -113,7 +128,7 @@ async def update_user(
             )
         user.email = user_data.email
     if user_data.password is not None:
-        user.password_hash = get_password_hash(user_data.password)
+        user.password_hash = await hash_password(user_data.password)
     if user_data.role is not None:
         user.role = user_data.role
     if user_data.is_active is not None:
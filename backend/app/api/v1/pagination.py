@@ -0,0 +1,55 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, List, Any, Callable, Sequence
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+# Header com o cursor da próxima página (vazio/ausente na última página)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Codifica os valores da chave de ordenação em um cursor opaco"""
+    payload = [value.isoformat() if isinstance(value, datetime) else str(value) for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *converters: Callable[[str], Any]) -> List[Any]:
+    """Decodifica um cursor aplicando um conversor por posição"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(payload) != len(converters):
+            raise ValueError("Cursor size mismatch")
+        return [convert(value) for convert, value in zip(converters, payload)]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def apply_keyset(query, columns: Sequence, cursor: Optional[str], converters: Sequence, descending: bool = True):
+    """Aplica ordenação e filtro de keyset (seek) sobre as colunas informadas"""
+    if cursor:
+        values = decode_cursor(cursor, *converters)
+        if descending:
+            query = query.filter(tuple_(*columns) < tuple_(*values))
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order)
+
+
+def set_next_cursor(response: Response, items: Sequence, limit: int, key: Callable[[Any], Sequence]):
+    """Define o header de próxima página quando a página veio cheia"""
+    if items and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(items[-1]))
+
+
+# Conversores usados pelos endpoints
+to_datetime = datetime.fromisoformat
+to_uuid = uuid.UUID
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, Dict, Any
 from datetime import datetime
+import uuid
 
 
 class AuditLogResponse(BaseModel):
@@ -10,6 +11,13 @@ class AuditLogResponse(BaseModel):
     details: Optional[Dict[str, Any]]
     created_at: datetime
 
+    @field_validator('id', 'actor_id', mode='before')
+    @classmethod
+    def convert_uuid_to_str(cls, v):
+        if isinstance(v, uuid.UUID):
+            return str(v)
+        return v
+
     class Config:
         from_attributes = True
 
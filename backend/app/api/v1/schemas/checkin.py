@@ -1,5 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+from datetime import datetime
 from typing import Optional, Dict
+import uuid
 
 
 class GeoLocation(BaseModel):
@@ -19,4 +21,29 @@ class CheckInResponse(BaseModel):
     attendance_id: str
 
 
+class DeviceEnrollRequest(BaseModel):
+    device_id: str
+    name: Optional[str] = None
 
+
+class DeviceCredentialResponse(BaseModel):
+    id: str
+    device_id: str
+    name: Optional[str] = None
+    created_at: datetime
+    expires_at: datetime
+    revoked_at: Optional[datetime] = None
+
+    @field_validator('id', mode='before')
+    @classmethod
+    def convert_uuid_to_str(cls, v):
+        if isinstance(v, uuid.UUID):
+            return str(v)
+        return v
+
+    class Config:
+        from_attributes = True
+
+
+class DeviceEnrollResponse(DeviceCredentialResponse):
+    token: str
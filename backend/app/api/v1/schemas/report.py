@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator
-from typing import Optional
+from typing import Optional, Literal, List, Dict
 from datetime import datetime
 import uuid
 
@@ -43,3 +43,156 @@ class StudentAttendanceResponse(BaseModel):
 
 
 
+
+
+class ReportJobCreate(BaseModel):
+    format: Literal["csv", "xlsx", "pdf", "json"]
+    session_id: Optional[str] = None
+    class_id: Optional[str] = None
+    student_id: Optional[str] = None
+    from_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None
+
+
+class ReportJobResponse(BaseModel):
+    job_id: str
+    status: str
+    progress: int
+    format: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    size_bytes: Optional[int] = None
+    error: Optional[str] = None
+    download_url: Optional[str] = None
+
+
+class ClassReportStudent(BaseModel):
+    student_id: str
+    user_id: str
+    matricula: str
+    name: str
+    present_count: int
+    sessions_held: int
+    attendance_percentage: Optional[float] = None
+
+
+class ClassReportAttendance(BaseModel):
+    student_id: str
+    session_id: str
+    timestamp: datetime
+    method: str
+
+
+class ClassReportResponse(BaseModel):
+    class_id: str
+    class_name: str
+    month: Optional[int] = None
+    year: Optional[int] = None
+    total_sessions: int
+    total_students: int
+    average_attendance_percentage: Optional[float] = None
+    total_attendances: int = 0
+    attendances_by_method: Dict[str, int] = {}
+    students: List[ClassReportStudent]
+    attendances: Optional[List[ClassReportAttendance]] = None
+
+
+class StudentSubjectSummary(BaseModel):
+    class_id: str
+    subject_id: Optional[str] = None
+    subject_name: Optional[str] = None
+    sessions_held: int
+    sessions_attended: int
+    attendance_percentage: Optional[float] = None
+
+
+class StudentSummaryResponse(BaseModel):
+    student_id: str
+    matricula: str
+    month: Optional[int] = None
+    year: Optional[int] = None
+    sessions_held: int
+    sessions_attended: int
+    attendance_percentage: Optional[float] = None
+    subjects: List[StudentSubjectSummary]
+
+
+class SubjectSummaryResponse(BaseModel):
+    subject_id: str
+    subject_name: str
+    class_id: Optional[str] = None
+    month: Optional[int] = None
+    year: Optional[int] = None
+    total_students: int
+    students: List[ClassReportStudent]
+
+
+class SessionSheetEntry(BaseModel):
+    student_id: str
+    user_id: str
+    matricula: str
+    name: str
+    present: bool
+    timestamp: Optional[datetime] = None
+    method: Optional[str] = None
+
+
+class SessionSheetResponse(BaseModel):
+    session_id: str
+    class_id: str
+    start_at: datetime
+    status: str
+    total_students: int
+    present_count: int
+    absent_count: int
+    students: List[SessionSheetEntry]
+
+
+class StudentAbsence(BaseModel):
+    session_id: str
+    start_at: datetime
+    subject_id: Optional[str] = None
+    subject_name: Optional[str] = None
+
+
+class StudentAbsencesResponse(BaseModel):
+    student_id: str
+    matricula: str
+    from_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None
+    total_absences: int
+    absences: List[StudentAbsence]
+
+
+class ClassAbsenceStudent(BaseModel):
+    student_id: str
+    user_id: str
+    matricula: str
+    name: str
+    absences: int
+
+
+class ClassAbsencesResponse(BaseModel):
+    class_id: str
+    class_name: str
+    from_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None
+    sessions_held: int
+    students: List[ClassAbsenceStudent]
+
+
+class AtRiskStudent(BaseModel):
+    student_id: str
+    user_id: str
+    matricula: str
+    name: str
+    attendance_percentage: float
+
+
+class AtRiskResponse(BaseModel):
+    scope: str
+    scope_id: str
+    threshold: float
+    total_at_risk: int
+    students: List[AtRiskStudent]
@@ -49,6 +49,33 @@ class CSVUploadResponse(BaseModel):
     error_count: int
     errors: List[Dict[str, Any]] = []
     message: str
+    dry_run: bool = False
 
 
+class RosterSyncResponse(BaseModel):
+    total_processed: int
+    inserted: int = 0
+    updated: int = 0
+    deactivated: int = 0
+    unchanged: int = 0
+    error_count: int
+    errors: List[Dict[str, Any]] = []
+    message: str
+    dry_run: bool = False
+
 
+class ImportJobResponse(BaseModel):
+    job_id: str
+    status: str
+    progress: int
+    filename: Optional[str] = None
+    size_bytes: Optional[int] = None
+    processed: int = 0
+    success_count: int = 0
+    error_count: int = 0
+    errors: List[Dict[str, Any]] = []
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    message: Optional[str] = None
+    error: Optional[str] = None
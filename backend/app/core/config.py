@@ -1,10 +1,14 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    # Réplica de leitura opcional (relatórios e listagens)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    # Janela em que o usuário lê do primário após uma escrita (read-your-writes)
+    REPLICA_STICKY_SECONDS: int = 5
     POSTGRES_USER: str = "frequencia_user"
     POSTGRES_PASSWORD: str = "frequencia_pass"
     POSTGRES_DB: str = "frequencia_db"
@@ -22,6 +26,10 @@ class Settings(BaseSettings):
     QR_TOKEN_EXPIRE_MINUTES: int = 10
     QR_TOKEN_SECRET_KEY: str
     
+    # Credenciais de aparelho para check-in (sem chave própria, derivada de SECRET_KEY)
+    DEVICE_CREDENTIAL_SECRET_KEY: Optional[str] = None
+    DEVICE_CREDENTIAL_EXPIRE_DAYS: int = 365
+    
     # Application
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
@@ -33,10 +41,57 @@ class Settings(BaseSettings):
     # File Upload
     MAX_UPLOAD_SIZE_MB: int = 5
     
+    # Importação de alunos em background (arquivo em disco, lotes com commit)
+    IMPORT_MAX_SIZE_MB: int = 200
+    IMPORT_CHUNK_SIZE: int = 2000
+    IMPORT_SPOOL_DIR: str = "storage/imports"
+    IMPORT_JOB_MAX_PENDING: int = 4
+    
     # Geofence (opcional)
     GEOFENCE_ENABLED: bool = False
     GEOFENCE_RADIUS_METERS: int = 100
     
+    # Jobs de relatório (renderização em processos separados)
+    REPORT_JOB_WORKERS: int = 2
+    REPORT_JOB_MAX_PENDING: int = 20
+    REPORT_ARTIFACTS_DIR: str = "storage/reports"
+    REPORT_ARTIFACT_TTL_MINUTES: int = 60
+    REPORT_BUNDLE_WORKERS: int = 4
+    
+    # Cache de relatórios (invalidado por versão de turma/sessão)
+    REPORT_CACHE_TTL_SECONDS: int = 3600
+    
+    # Hash de senhas (bcrypt) em pool de processos
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 8
+    
+    # Verificação de senha no login (threads dedicadas, fila limitada -> 503)
+    PASSWORD_VERIFY_WORKERS: int = 4
+    PASSWORD_VERIFY_MAX_QUEUE: int = 200
+    PASSWORD_VERIFY_QUEUE_TIMEOUT: float = 5.0
+    
+    # Auditoria em lote (fila em memória, INSERT multi-linha, spool em disco sem banco)
+    AUDIT_FLUSH_INTERVAL_MS: int = 200
+    AUDIT_FLUSH_BATCH_SIZE: int = 500
+    AUDIT_QUEUE_MAX_SIZE: int = 10000
+    AUDIT_ENQUEUE_TIMEOUT: float = 1.0
+    AUDIT_SPOOL_DIR: str = "storage/audit_spool"
+    
+    # Partições mensais de audit_logs: retenção em meses e destino dos arquivos exportados
+    AUDIT_RETENTION_MONTHS: int = 12
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 3
+    AUDIT_ARCHIVE_DIR: str = "storage/audit_archive"
+    
+    # Compressão de respostas (gzip; zstd se o pacote zstandard estiver instalado)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    
+    # Frequência mínima (alunos abaixo aparecem em /reports/at-risk)
+    AT_RISK_THRESHOLD: float = 0.75
+    # Período letivo (meses, a partir de janeiro) considerado no score de frequência
+    AT_RISK_TERM_MONTHS: int = 6
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
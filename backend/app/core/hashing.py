@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, List, Dict, Any
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+# bcrypt (~250 ms por hash) roda em um pool de processos dedicado para não
+# bloquear o event loop; o semáforo limita quantas tarefas ocupam o pool.
+
+_executor: Optional[ProcessPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+# Verificação no login: pool de threads separado (bcrypt libera o GIL), para que
+# importações em massa não atrasem logins; a fila de espera é limitada.
+_verify_executor: Optional[ThreadPoolExecutor] = None
+_verify_semaphore: Optional[asyncio.Semaphore] = None
+_verify_waiting = 0
+
+# Tempos de fila das verificações recentes (segundos)
+QUEUE_TIME_SAMPLES = 1000
+
+# Fila acima disso gera log de alerta
+SLOW_QUEUE_SECONDS = 1.0
+
+_verify_stats: Dict[str, Any] = {
+    "in_flight": 0,
+    "completed": 0,
+    "rejected": 0,
+    "queue_times": deque(maxlen=QUEUE_TIME_SAMPLES),
+}
+
+
+class PasswordVerifyOverloadedError(Exception):
+    """Fila de verificação de senha cheia ou espera acima do limite"""
+
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    """Pool de processos para bcrypt (criado sob demanda)"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_hash_executor():
+    """Encerra os pools de hash e de verificação (chamado no shutdown da aplicação)"""
+    global _executor, _verify_executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if _verify_executor is not None:
+        _verify_executor.shutdown(wait=False, cancel_futures=True)
+        _verify_executor = None
+
+
+def get_verify_executor() -> ThreadPoolExecutor:
+    """Pool de threads para bcrypt.checkpw (criado sob demanda)"""
+    global _verify_executor
+    if _verify_executor is None:
+        _verify_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_VERIFY_WORKERS,
+            thread_name_prefix="password-verify"
+        )
+    return _verify_executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+    return _semaphore
+
+
+def _hash_batch(passwords: List[str]) -> List[str]:
+    """Executa no processo worker"""
+    return [get_password_hash(password) for password in passwords]
+
+
+async def _run_in_pool(func, *args):
+    loop = asyncio.get_running_loop()
+    async with _get_semaphore():
+        return await loop.run_in_executor(get_hash_executor(), func, *args)
+
+
+async def hash_password(password: str) -> str:
+    """Gera o hash bcrypt fora do event loop"""
+    return await _run_in_pool(get_password_hash, password)
+
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """Gera hashes em lotes paralelos (um lote por worker), preservando a ordem"""
+    if not passwords:
+        return []
+
+    workers = settings.PASSWORD_HASH_WORKERS
+    batch_size = -(-len(passwords) // workers)
+    batches = [passwords[start:start + batch_size] for start in range(0, len(passwords), batch_size)]
+
+    results = await asyncio.gather(*(_run_in_pool(_hash_batch, batch) for batch in batches))
+    return [hashed for batch in results for hashed in batch]
+
+
+def _get_verify_semaphore() -> asyncio.Semaphore:
+    global _verify_semaphore
+    if _verify_semaphore is None:
+        # Uma verificação por thread: a espera acontece aqui, onde é medida e limitada
+        _verify_semaphore = asyncio.Semaphore(settings.PASSWORD_VERIFY_WORKERS)
+    return _verify_semaphore
+
+
+def _reject(reason: str):
+    _verify_stats["rejected"] += 1
+    raise PasswordVerifyOverloadedError(reason)
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifica a senha no pool dedicado; sob sobrecarga levanta PasswordVerifyOverloadedError"""
+    global _verify_waiting
+    semaphore = _get_verify_semaphore()
+
+    if _verify_waiting >= settings.PASSWORD_VERIFY_MAX_QUEUE:
+        _reject("Password verification queue is full")
+
+    enqueued = time.perf_counter()
+    _verify_waiting += 1
+    try:
+        await asyncio.wait_for(semaphore.acquire(), timeout=settings.PASSWORD_VERIFY_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _reject("Password verification queue timeout")
+    finally:
+        _verify_waiting -= 1
+
+    queue_time = time.perf_counter() - enqueued
+    _verify_stats["queue_times"].append(queue_time)
+    if queue_time > SLOW_QUEUE_SECONDS:
+        logger.warning("Password verification waited %.2fs in queue (%d waiting)", queue_time, _verify_waiting)
+
+    _verify_stats["in_flight"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_verify_executor(), verify_password, plain_password, hashed_password)
+    finally:
+        semaphore.release()
+        _verify_stats["in_flight"] -= 1
+        _verify_stats["completed"] += 1
+
+
+def get_verify_stats() -> Dict[str, Any]:
+    """Métricas da verificação de senha: em uso, na fila, rejeições e tempo de fila"""
+    samples = sorted(_verify_stats["queue_times"])
+
+    def percentile(fraction: float) -> Optional[float]:
+        if not samples:
+            return None
+        return round(samples[min(int(len(samples) * fraction), len(samples) - 1)] * 1000, 1)
+
+    return {
+        "workers": settings.PASSWORD_VERIFY_WORKERS,
+        "in_flight": _verify_stats["in_flight"],
+        "waiting": _verify_waiting,
+        "completed": _verify_stats["completed"],
+        "rejected": _verify_stats["rejected"],
+        "queue_ms_p50": percentile(0.5),
+        "queue_ms_p95": percentile(0.95),
+        "queue_ms_max": percentile(1.0),
+    }
@@ -10,11 +10,28 @@ engine = create_engine(
     max_overflow=20
 )
 
+# Réplica de leitura; sem DATABASE_REPLICA_URL as leituras usam o primário
+if settings.DATABASE_REPLICA_URL:
+    read_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20
+    )
+else:
+    read_engine = engine
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
 
+def replica_enabled() -> bool:
+    """Indica se há uma réplica de leitura separada configurada"""
+    return read_engine is not engine
+
+
 def get_db():
     """Dependency para obter sessão do banco de dados"""
     db = SessionLocal()
@@ -22,6 +39,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
-
-
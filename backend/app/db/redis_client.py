@@ -3,10 +3,15 @@ from app.core.config import settings
 
 redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
 
+# Cliente sem decodificação para conteúdo binário (cache de relatórios)
+redis_binary_client = redis.from_url(settings.REDIS_URL, decode_responses=False)
+
 
 def get_redis():
     """Retorna cliente Redis"""
     return redis_client
 
 
-
+def get_redis_binary():
+    """Retorna cliente Redis para valores binários"""
+    return redis_binary_client
@@ -0,0 +1,66 @@
+import logging
+from redis import RedisError
+from sqlalchemy import event
+from app.core.config import settings
+from app.db.base import SessionLocal, replica_enabled
+from app.db.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Sessões do primário marcam o usuário que escreveu (db.info["user_id"], definido na
+# autenticação). Após o commit, o usuário lê do primário por REPLICA_STICKY_SECONDS.
+
+
+def _sticky_key(user_id) -> str:
+    return f"replica_sticky:{user_id}"
+
+
+def mark_recent_write(user_id):
+    """Faz o usuário ler do primário durante a janela de replicação"""
+    get_redis().setex(_sticky_key(user_id), settings.REPLICA_STICKY_SECONDS, "1")
+
+
+def has_recent_write(user_id) -> bool:
+    """Usuário escreveu há pouco (a réplica pode ainda não ter a escrita)"""
+    return bool(get_redis().exists(_sticky_key(user_id)))
+
+
+def use_replica_for(user_id) -> bool:
+    """Decide se as leituras deste usuário podem ir para a réplica"""
+    if not replica_enabled():
+        return False
+    try:
+        return not has_recent_write(user_id)
+    except RedisError:
+        # Sem como saber se há escrita recente: ler do primário
+        return False
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _flag_flush(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _flag_dml(orm_execute_state):
+    # INSERT/UPDATE/DELETE emitidos via db.execute (ex.: upserts do rollup)
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_writer_sticky(session):
+    has_writes = session.info.pop("has_writes", False)
+    user_id = session.info.get("user_id")
+    if not (has_writes and user_id and replica_enabled()):
+        return
+    try:
+        mark_recent_write(user_id)
+    except RedisError as e:
+        # O commit já aconteceu; não propagar falha do Redis para a requisição
+        logger.warning("Could not mark replica stickiness for %s: %s", user_id, e)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _clear_write_flag(session):
+    session.info.pop("has_writes", None)
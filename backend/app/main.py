@@ -2,7 +2,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.hashing import shutdown_hash_executor
 from app.api.v1.api import api_router
+from app.middleware.compression import CompressionMiddleware
+from app.services.report_job_service import shutdown_report_executor
+from app.services.term_bundle_service import shutdown_bundle_executor
+from app.services.import_job_service import cancel_import_jobs
+from app.services.audit_service import start_audit_writer, stop_audit_writer
 
 # Setup logging
 setup_logging()
@@ -23,12 +29,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
+)
+
+# Compressão gzip/zstd incremental (inclusive respostas em streaming)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
 )
 
 # Incluir rotas da API
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.on_event("startup")
+async def start_workers():
+    """Inicia a gravação em lote da auditoria"""
+    await start_audit_writer()
+
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    """Encerra pools de processos e importações em background; grava a auditoria pendente"""
+    cancel_import_jobs()
+    shutdown_report_executor()
+    shutdown_bundle_executor()
+    shutdown_hash_executor()
+    await stop_audit_writer()
+
+
 @app.get("/")
 async def root():
     return {"message": "Sistema de Frequência Escolar API", "version": "1.0.0"}
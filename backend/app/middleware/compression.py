@@ -0,0 +1,190 @@
+import zlib
+from typing import Optional, List, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # zstd é opcional; sem o pacote, apenas gzip é oferecido
+    zstandard = None
+
+# Tipos que valem a pena comprimir (XLSX, PDF, ZIP, Parquet já são comprimidos)
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/xml",
+    "application/javascript",
+)
+
+# Bytes de entrada acumulados antes de forçar um flush (latência x taxa de compressão)
+FLUSH_THRESHOLD = 64 * 1024
+
+
+class GzipCompressor:
+    encoding = "gzip"
+
+    def __init__(self, level: int = 6):
+        # wbits=31: cabeçalho e trailer gzip
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        self.pending = 0
+
+    def compress(self, data: bytes) -> bytes:
+        output = self.compressor.compress(data)
+        self.pending += len(data)
+        # Sync flush periódico: o cliente recebe dados sem esperar o fim do corpo
+        if self.pending >= FLUSH_THRESHOLD:
+            output += self.compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.pending = 0
+        return output
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class ZstdCompressor:
+    encoding = "zstd"
+
+    def __init__(self, level: int = 3):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        self.pending = 0
+
+    def compress(self, data: bytes) -> bytes:
+        output = self.compressor.compress(data)
+        self.pending += len(data)
+        if self.pending >= FLUSH_THRESHOLD:
+            output += self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            self.pending = 0
+        return output
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def parse_accept_encoding(header: str) -> List[Tuple[str, float]]:
+    """Codificações aceitas pelo cliente com seus pesos (q)"""
+    accepted = []
+    for item in header.split(","):
+        parts = [part.strip() for part in item.split(";")]
+        if not parts[0]:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted.append((parts[0].lower(), quality))
+    return accepted
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    """Escolhe zstd ou gzip conforme Accept-Encoding (zstd preferido em empate)"""
+    available = ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+    weights = dict(parse_accept_encoding(header))
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """Compressão gzip/zstd negociada por Accept-Encoding, incremental por chunk"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        zstd_level: int = 3
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.zstd_level = zstd_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self)
+        await self.app(scope, receive, responder.send)
+
+    def build_compressor(self, encoding: str):
+        if encoding == "zstd":
+            return ZstdCompressor(self.zstd_level)
+        return GzipCompressor(self.gzip_level)
+
+
+class _CompressionResponder:
+    """Decide no primeiro chunk se comprime; depois comprime cada chunk ao passar"""
+
+    def __init__(self, send: Send, encoding: str, middleware: CompressionMiddleware):
+        self._send = send
+        self.encoding = encoding
+        self.middleware = middleware
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _compressible(self, start: Message, headers: Headers) -> bool:
+        if start["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Aguarda o primeiro chunk do corpo para decidir
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            start["headers"] = headers.raw
+
+            small = not more_body and len(body) < self.middleware.minimum_size
+            if small or not self._compressible(start, headers):
+                self.passthrough = True
+            else:
+                self.compressor = self.middleware.build_compressor(self.encoding)
+                headers["Content-Encoding"] = self.encoding
+                headers.add_vary_header("Accept-Encoding")
+                # Tamanho final desconhecido: resposta passa a ser chunked
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                # Representação diferente da original: ETag vira fraca
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+
+            await self._send(start)
+
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        data = self.compressor.compress(body) if body else b""
+        if not more_body:
+            data += self.compressor.finish()
+        elif not data:
+            # Compressor ainda acumulando: nada a enviar neste chunk
+            return
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -10,6 +10,8 @@ from app.models.attendance import Attendance
 from app.models.audit_log import AuditLog
 from app.models.subject import Subject
 from app.models.class_subject import ClassSubject
+from app.models.attendance_rollup import AttendanceRollup
+from app.models.device_credential import DeviceCredential
 
 __all__ = [
     "User",
@@ -24,6 +26,8 @@ __all__ = [
     "AuditLog",
     "Subject",
     "ClassSubject",
+    "AttendanceRollup",
+    "DeviceCredential",
 ]
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum, Float, UniqueConstraint
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum, Float, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, foreign
 import uuid
@@ -37,5 +37,8 @@ class Attendance(Base):
     # Constraint único: um aluno só pode ter uma presença por sessão
     __table_args__ = (
         UniqueConstraint('session_id', 'student_id', name='unique_session_student'),
+        # Índices para paginação por cursor (timestamp, id)
+        Index('ix_attendances_session_timestamp_id', 'session_id', 'timestamp', 'id'),
+        Index('ix_attendances_student_timestamp_id', 'student_id', 'timestamp', 'id'),
     )
 
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from app.db.base import Base
+
+
+class AttendanceRollup(Base):
+    """Agregado mensal de frequência por aluno/turma/disciplina"""
+    __tablename__ = "attendance_rollups"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id"), nullable=False)
+    subject_id = Column(UUID(as_uuid=True), ForeignKey("subjects.id", ondelete="SET NULL"), nullable=True)
+    month = Column(Date, nullable=False)  # Primeiro dia do mês
+    sessions_held = Column(Integer, default=0, nullable=False)
+    sessions_attended = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Uma linha por (aluno, turma, disciplina, mês); sessões sem disciplina agrupam em NULL
+    __table_args__ = (
+        UniqueConstraint(
+            'student_id', 'class_id', 'subject_id', 'month',
+            name='unique_attendance_rollup',
+            postgresql_nulls_not_distinct=True
+        ),
+        Index('ix_attendance_rollups_class_month', 'class_id', 'month'),
+        Index('ix_attendance_rollups_subject_month', 'subject_id', 'month'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 import uuid
@@ -11,12 +11,20 @@ class AuditLog(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     actor_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    action = Column(String, nullable=False, index=True)
+    action = Column(String, nullable=False)
     details = Column(JSONB, nullable=True)  # Detalhes adicionais em JSON
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # Chave de partição (mensal): precisa fazer parte da chave primária
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True)
 
     # Relacionamento
     actor = relationship("User")
 
-
-
+    # Índices para paginação por cursor (created_at, id), com e sem filtro de ação/ator
+    __table_args__ = (
+        Index('ix_audit_logs_created_at_id', 'created_at', 'id'),
+        Index('ix_audit_logs_action_created_at_id', 'action', 'created_at', 'id'),
+        Index('ix_audit_logs_actor_created_at_id', 'actor_id', 'created_at', 'id'),
+        # Filtros por chave de details (details @> {...})
+        Index('ix_audit_logs_details', 'details', postgresql_using='gin', postgresql_ops={'details': 'jsonb_path_ops'}),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
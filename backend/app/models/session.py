@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, foreign
 from sqlalchemy.orm import remote
@@ -37,3 +37,8 @@ class Session(Base):
     attendances = relationship("Attendance", back_populates="session", cascade="all, delete-orphan")
     qr_tokens = relationship("QRCodeToken", back_populates="session", cascade="all, delete-orphan")
 
+    # Índices para paginação por cursor (created_at, id)
+    __table_args__ = (
+        Index('ix_sessions_created_at_id', 'created_at', 'id'),
+        Index('ix_sessions_teacher_created_at_id', 'teacher_id', 'created_at', 'id'),
+    )
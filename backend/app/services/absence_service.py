@@ -0,0 +1,130 @@
+from datetime import datetime
+from typing import Optional, List
+from sqlalchemy import and_, exists, func
+from sqlalchemy.orm import Session
+from app.models.attendance import Attendance
+from app.models.session import Session as SessionModel, SessionStatus
+from app.models.student import Student
+from app.models.subject import Subject
+from app.models.user import User
+
+# Faltas são derivadas: (sessões x alunos da turma) sem linha em attendances.
+# Usa a turma atual do aluno (students.class_id) como lista de chamada.
+
+
+def _not_attended():
+    """Condição anti-join: aluno sem presença na sessão"""
+    return ~exists().where(
+        Attendance.session_id == SessionModel.id,
+        Attendance.student_id == Student.user_id
+    )
+
+
+def _session_filters(
+    class_id: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    only_closed: bool = True
+) -> List:
+    filters = []
+    if class_id:
+        filters.append(SessionModel.class_id == class_id)
+    if from_date:
+        filters.append(SessionModel.start_at >= from_date)
+    if to_date:
+        filters.append(SessionModel.start_at <= to_date)
+    # Sessão aberta ainda aceita check-in, então não gera falta
+    if only_closed:
+        filters.append(SessionModel.status == SessionStatus.CLOSED)
+    return filters
+
+
+def get_session_sheet(db: Session, session: SessionModel):
+    """Lista de chamada de uma sessão: todos os alunos da turma com presença ou falta"""
+    return db.query(
+        Student.id.label("student_id"),
+        Student.user_id,
+        Student.matricula,
+        User.name,
+        Attendance.id.isnot(None).label("present"),
+        Attendance.timestamp,
+        Attendance.method
+    ).join(
+        User, User.id == Student.user_id
+    ).outerjoin(
+        Attendance,
+        and_(Attendance.session_id == session.id, Attendance.student_id == Student.user_id)
+    ).filter(
+        Student.class_id == session.class_id
+    ).order_by(User.name).all()
+
+
+def get_student_absences(
+    db: Session,
+    student: Student,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+):
+    """Sessões da turma do aluno em que não houve presença"""
+    if not student.class_id:
+        return []
+
+    return db.query(
+        SessionModel.id.label("session_id"),
+        SessionModel.start_at,
+        SessionModel.subject_id,
+        Subject.name.label("subject_name")
+    ).select_from(SessionModel).join(
+        Student, Student.id == student.id
+    ).outerjoin(
+        Subject, Subject.id == SessionModel.subject_id
+    ).filter(
+        *_session_filters(student.class_id, from_date, to_date),
+        _not_attended()
+    ).order_by(SessionModel.start_at.desc()).all()
+
+
+def count_class_absences(
+    db: Session,
+    class_id: str,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+):
+    """Total de faltas por aluno da turma em um período (ex.: semestre)"""
+    absences = db.query(
+        Student.id.label("student_id"),
+        func.count(SessionModel.id).label("absences")
+    ).select_from(Student).join(
+        SessionModel,
+        and_(SessionModel.class_id == Student.class_id, *_session_filters(class_id, from_date, to_date))
+    ).filter(
+        Student.class_id == class_id,
+        _not_attended()
+    ).group_by(Student.id).subquery()
+
+    # Alunos sem nenhuma falta aparecem com zero
+    return db.query(
+        Student.id.label("student_id"),
+        Student.user_id,
+        Student.matricula,
+        User.name,
+        func.coalesce(absences.c.absences, 0).label("absences")
+    ).join(
+        User, User.id == Student.user_id
+    ).outerjoin(
+        absences, absences.c.student_id == Student.id
+    ).filter(
+        Student.class_id == class_id
+    ).order_by(User.name).all()
+
+
+def count_held_sessions(
+    db: Session,
+    class_id: str,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+) -> int:
+    """Número de sessões encerradas da turma no período"""
+    return db.query(func.count(SessionModel.id)).filter(
+        *_session_filters(class_id, from_date, to_date)
+    ).scalar()
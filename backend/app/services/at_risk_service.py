@@ -0,0 +1,163 @@
+import logging
+from datetime import date, datetime
+from typing import Optional, List, Tuple, Iterable
+from redis.exceptions import RedisError
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
+from app.core.config import settings
+from app.db.redis_client import get_redis
+from app.models.attendance_rollup import AttendanceRollup
+from app.models.class_model import Class
+from app.models.student import Student
+
+logger = logging.getLogger(__name__)
+
+# Sorted sets de frequência: membro = user_id do aluno, score = presenças / sessões realizadas
+# no período letivo atual (AT_RISK_TERM_MONTHS meses, a partir de janeiro), considerando só a
+# turma atual do aluno. Derivados de attendance_rollups; podem ser reconstruídos a qualquer momento.
+
+# Itens por ZADD no rebuild completo
+REBUILD_CHUNK_SIZE = 5000
+
+
+def at_risk_key(scope: str, scope_id: str) -> str:
+    return f"at_risk:{scope}:{scope_id}"
+
+
+def term_start(today: Optional[date] = None) -> date:
+    """Primeiro mês do período letivo que contém a data"""
+    today = today or datetime.utcnow().date()
+    length = settings.AT_RISK_TERM_MONTHS
+    return date(today.year, (today.month - 1) // length * length + 1, 1)
+
+
+def _ratio_query(db: Session):
+    """Presenças/realizadas por aluno a partir do rollup do período letivo atual"""
+    held = func.sum(AttendanceRollup.sessions_held)
+    attended = func.sum(AttendanceRollup.sessions_attended)
+    return db.query(
+        AttendanceRollup.student_id,
+        held.label("sessions_held"),
+        attended.label("sessions_attended")
+    ).filter(
+        AttendanceRollup.month >= term_start()
+    ).group_by(AttendanceRollup.student_id).having(held > 0)
+
+
+def _ratios(rows) -> dict:
+    return {
+        str(row.student_id): round(row.sessions_attended / row.sessions_held, 4)
+        for row in rows
+    }
+
+
+def refresh_class_ratios(db: Session, class_id, student_ids: Optional[Iterable] = None):
+    """Atualiza os scores da turma e do curso (todos os alunos ou apenas os informados)"""
+    course_id = db.query(Class.course_id).filter(Class.id == class_id).scalar()
+
+    class_query = _ratio_query(db).filter(AttendanceRollup.class_id == class_id)
+    course_query = _ratio_query(db).join(
+        Class, Class.id == AttendanceRollup.class_id
+    ).filter(Class.course_id == course_id)
+
+    # Só alunos que estão na turma hoje (transferidos saem do conjunto da turma antiga)
+    roster = db.query(Student.user_id).filter(Student.class_id == class_id)
+    if student_ids is not None:
+        roster = roster.filter(Student.user_id.in_(list(student_ids)))
+    class_query = class_query.filter(AttendanceRollup.student_id.in_(roster.scalar_subquery()))
+    course_query = course_query.filter(AttendanceRollup.student_id.in_(roster.scalar_subquery()))
+
+    class_scores = _ratios(class_query.all())
+    course_scores = _ratios(course_query.all())
+
+    pipe = get_redis().pipeline()
+    if student_ids is None:
+        # Turma inteira: o conjunto é recriado (sai quem não tem sessões no período ou mudou de turma)
+        pipe.delete(at_risk_key("class", str(class_id)))
+    if class_scores:
+        pipe.zadd(at_risk_key("class", str(class_id)), class_scores)
+    if course_scores and course_id:
+        pipe.zadd(at_risk_key("course", str(course_id)), course_scores)
+    pipe.execute()
+
+
+def rebuild_at_risk_sets(db: Session, class_id: Optional[str] = None) -> int:
+    """Recria os sorted sets a partir do rollup; retorna nº de membros gravados"""
+    redis_client = get_redis()
+
+    if class_id:
+        redis_client.delete(at_risk_key("class", str(class_id)))
+        refresh_class_ratios(db, class_id)
+        return redis_client.zcard(at_risk_key("class", str(class_id)))
+
+    for key in redis_client.scan_iter(match="at_risk:*"):
+        redis_client.delete(key)
+
+    # Conta apenas o histórico da turma (e do curso) em que o aluno está hoje
+    current_class = aliased(Class)
+    class_rows = _ratio_query(db).join(
+        Student,
+        (Student.user_id == AttendanceRollup.student_id) & (Student.class_id == AttendanceRollup.class_id)
+    ).add_columns(
+        AttendanceRollup.class_id.label("scope_id")
+    ).group_by(AttendanceRollup.class_id)
+    course_rows = _ratio_query(db).join(
+        Class, Class.id == AttendanceRollup.class_id
+    ).join(
+        Student, Student.user_id == AttendanceRollup.student_id
+    ).join(
+        current_class,
+        (current_class.id == Student.class_id) & (current_class.course_id == Class.course_id)
+    ).add_columns(Class.course_id.label("scope_id")).group_by(Class.course_id)
+
+    written = 0
+    for scope, query in (("class", class_rows), ("course", course_rows)):
+        pipe = redis_client.pipeline()
+        pending = 0
+        for row in query.yield_per(REBUILD_CHUNK_SIZE):
+            pipe.zadd(
+                at_risk_key(scope, str(row.scope_id)),
+                {str(row.student_id): round(row.sessions_attended / row.sessions_held, 4)}
+            )
+            pending += 1
+            if pending >= REBUILD_CHUNK_SIZE:
+                pipe.execute()
+                written += pending
+                pending = 0
+        pipe.execute()
+        written += pending
+
+    return written
+
+
+def move_student_between_classes(db: Session, user_id, old_class_id, new_class_id):
+    """Transferência de turma: remove o aluno dos conjuntos antigos e calcula os novos"""
+    if old_class_id == new_class_id:
+        return
+    try:
+        if old_class_id:
+            old_course_id = db.query(Class.course_id).filter(Class.id == old_class_id).scalar()
+            new_course_id = db.query(Class.course_id).filter(Class.id == new_class_id).scalar() if new_class_id else None
+            pipe = get_redis().pipeline()
+            pipe.zrem(at_risk_key("class", str(old_class_id)), str(user_id))
+            if old_course_id and old_course_id != new_course_id:
+                pipe.zrem(at_risk_key("course", str(old_course_id)), str(user_id))
+            pipe.execute()
+        if new_class_id:
+            refresh_class_ratios(db, new_class_id, [user_id])
+    except RedisError as e:
+        # Chamado após o commit; o próximo refresh/rebuild da turma corrige os conjuntos
+        logger.warning("Could not update at-risk sets for student %s: %s", user_id, e)
+
+
+def get_at_risk(scope: str, scope_id: str, threshold: float, limit: int) -> Tuple[int, List[Tuple[str, float]]]:
+    """Alunos abaixo do limiar, do menor score para o maior: (total, [(user_id, score)])"""
+    redis_client = get_redis()
+    key = at_risk_key(scope, scope_id)
+
+    # Limite exclusivo: exatamente no limiar não está em risco
+    total = redis_client.zcount(key, "-inf", f"({threshold}")
+    members = redis_client.zrangebyscore(
+        key, "-inf", f"({threshold}", start=0, num=limit, withscores=True
+    )
+    return total, members
@@ -0,0 +1,320 @@
+import re
+import time
+import uuid
+from datetime import timedelta
+from typing import Optional, Dict, Any, List, TextIO
+from sqlalchemy import (
+    Table, Column, MetaData, BigInteger, Text, DateTime, Identity,
+    select, insert, func, cast, case, and_, or_, exists, null, text
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.attendance import Attendance, AttendanceMethod
+from app.models.class_model import Class
+from app.models.session import Session as SessionModel, SessionStatus
+from app.models.student import Student
+
+# Carga de histórico: COPY do arquivo para uma tabela temporária, resolução de matrícula/sessão
+# em uma única consulta e merge em attendances com ON CONFLICT. Tudo em uma transação.
+
+# Opcionais: turma, timestamp, method, notes, device_id (outras colunas são ignoradas)
+REQUIRED_BACKFILL_COLUMNS = ["matricula", "session_start"]
+
+# Datas em ISO 8601 (2023-03-15, 2023-03-15 08:00, 2023-03-15T08:00:00)
+TIMESTAMP_PATTERN = r"^\s*\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?\s*$"
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class BackfillFileError(Exception):
+    """Header do arquivo inválido para a carga de histórico"""
+
+
+def validate_backfill_header(header: List[str]) -> List[str]:
+    """Normaliza o header e verifica colunas obrigatórias/nomes válidos"""
+    columns = [name.strip().lower() for name in header]
+    invalid = [name for name in columns if not _IDENTIFIER.match(name)]
+    if invalid:
+        raise BackfillFileError(f"Invalid column names: {invalid}")
+    missing = [name for name in REQUIRED_BACKFILL_COLUMNS if name not in columns]
+    if missing:
+        raise BackfillFileError(f"Missing required columns: {missing}")
+    if len(set(columns)) != len(columns):
+        raise BackfillFileError("Duplicate column names in header")
+    return columns
+
+
+# Conversão que devolve NULL em datas inexistentes (2023-02-30, 2023-13-01) em vez de abortar a carga
+SAFE_TIMESTAMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION pg_temp.backfill_timestamp(value text) RETURNS timestamp
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    RETURN value::timestamp;
+EXCEPTION WHEN datetime_field_overflow OR invalid_datetime_format THEN
+    RETURN NULL;
+END
+$$
+"""
+
+
+def _parse_timestamp(column):
+    # O padrão restringe o formato (ISO 8601); a função valida a data em si
+    return case(
+        (column.op("~")(TIMESTAMP_PATTERN), func.pg_temp.backfill_timestamp(func.trim(column), type_=DateTime)),
+        else_=null()
+    )
+
+
+def _staging_tables(columns: List[str]):
+    metadata = MetaData()
+    staging = Table(
+        "attendance_backfill_staging",
+        metadata,
+        # Linha 1 é o header; COPY preserva a ordem do arquivo
+        Column("line", BigInteger, Identity(start=2)),
+        *[Column(name, Text) for name in columns],
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP"
+    )
+    resolved = Table(
+        "attendance_backfill_resolved",
+        metadata,
+        Column("line", BigInteger),
+        Column("session_id", UUID(as_uuid=True)),
+        Column("student_id", UUID(as_uuid=True)),
+        Column("class_id", UUID(as_uuid=True)),
+        Column("timestamp", DateTime),
+        Column("method", Text),
+        Column("notes", Text),
+        Column("device_id", Text),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP"
+    )
+    return staging, resolved
+
+
+def _parsed_rows(staging: Table, columns: List[str]):
+    """Linhas do staging com tipos convertidos (NULL onde o valor é inválido)"""
+    def optional(name):
+        return func.nullif(func.trim(staging.c[name]), "") if name in columns else null()
+
+    method = func.lower(func.coalesce(optional("method"), AttendanceMethod.MANUAL.value))
+    valid_methods = [member.value for member in AttendanceMethod]
+    session_start = _parse_timestamp(staging.c.session_start)
+    timestamp = _parse_timestamp(staging.c.timestamp) if "timestamp" in columns else null()
+
+    checks = [session_start.isnot(None), method.in_(valid_methods)]
+    if "timestamp" in columns:
+        checks.append(or_(optional("timestamp").is_(None), timestamp.isnot(None)))
+
+    return select(
+        staging.c.line,
+        func.trim(staging.c.matricula).label("matricula"),
+        session_start.label("session_start"),
+        timestamp.label("checkin_at"),
+        optional("turma").label("turma"),
+        # Enum gravado pelo nome (QRCODE/MANUAL)
+        case((method.in_(valid_methods), func.upper(method)), else_=null()).label("method"),
+        optional("notes").label("notes"),
+        optional("device_id").label("device_id"),
+        func.coalesce(and_(*checks), False).label("is_valid")
+    ).subquery("parsed")
+
+
+def _with_class(parsed):
+    """Junta aluno e turma: coluna turma do arquivo ou, se vazia, a turma atual do aluno"""
+    class_id = case((parsed.c.turma.is_(None), Student.class_id), else_=Class.id)
+    source = parsed.join(Student, Student.matricula == parsed.c.matricula).outerjoin(
+        Class, Class.name == parsed.c.turma
+    )
+    return source, class_id
+
+
+def create_missing_sessions(db: Session, parsed, tolerance: timedelta, teacher_id: str) -> int:
+    """Cria sessões encerradas para (turma, início) do arquivo sem sessão correspondente"""
+    source, class_id = _with_class(parsed)
+    keys = select(class_id.label("class_id"), parsed.c.session_start).select_from(source).where(
+        parsed.c.is_valid,
+        class_id.isnot(None)
+    ).distinct().subquery("session_keys")
+
+    missing = db.execute(
+        select(keys.c.class_id, keys.c.session_start).where(
+            ~exists().where(
+                SessionModel.class_id == keys.c.class_id,
+                SessionModel.start_at.between(keys.c.session_start - tolerance, keys.c.session_start + tolerance)
+            )
+        ).order_by(keys.c.class_id, keys.c.session_start)
+    ).all()
+
+    # Inícios da mesma turma dentro da tolerância do primeiro viram uma única sessão
+    sessions = []
+    anchors: Dict[Any, Any] = {}
+    for key_class_id, session_start in missing:
+        anchor = anchors.get(key_class_id)
+        if anchor is not None and session_start <= anchor + tolerance:
+            continue
+        anchors[key_class_id] = session_start
+        sessions.append({
+            "class_id": key_class_id,
+            "teacher_id": uuid.UUID(str(teacher_id)),
+            "start_at": session_start,
+            "end_at": session_start,
+            "status": SessionStatus.CLOSED
+        })
+
+    if sessions:
+        db.execute(insert(SessionModel), sessions)
+    return len(sessions)
+
+
+def resolve_rows(db: Session, parsed, resolved: Table, tolerance: timedelta) -> int:
+    """Resolve matrícula -> aluno e (turma, início) -> sessão mais próxima dentro da tolerância"""
+    source, class_id = _with_class(parsed)
+    distance = func.abs(func.extract("epoch", SessionModel.start_at - parsed.c.session_start))
+
+    candidates = select(
+        parsed.c.line,
+        SessionModel.id,
+        Student.user_id,
+        SessionModel.class_id,
+        func.coalesce(parsed.c.checkin_at, SessionModel.start_at),
+        parsed.c.method,
+        parsed.c.notes,
+        parsed.c.device_id
+    ).select_from(source).join(
+        SessionModel,
+        and_(
+            SessionModel.class_id == class_id,
+            SessionModel.start_at.between(parsed.c.session_start - tolerance, parsed.c.session_start + tolerance)
+        )
+    ).where(parsed.c.is_valid).distinct(parsed.c.line).order_by(parsed.c.line, distance)
+
+    result = db.execute(
+        insert(resolved).from_select(
+            ["line", "session_id", "student_id", "class_id", "timestamp", "method", "notes", "device_id"],
+            candidates
+        )
+    )
+    return result.rowcount
+
+
+def merge_attendances(db: Session, resolved: Table, update_existing: bool = False) -> int:
+    """Insere as presenças resolvidas; conflito (sessão, aluno) é ignorado ou atualizado"""
+    # Uma linha por (sessão, aluno): ON CONFLICT não pode afetar a mesma linha duas vezes
+    unique_rows = select(
+        func.gen_random_uuid(),
+        resolved.c.session_id,
+        resolved.c.student_id,
+        resolved.c.timestamp,
+        cast(resolved.c.method, Attendance.method.type),
+        resolved.c.notes,
+        resolved.c.device_id
+    ).distinct(resolved.c.session_id, resolved.c.student_id).order_by(
+        resolved.c.session_id, resolved.c.student_id, resolved.c.line
+    )
+
+    stmt = pg_insert(Attendance).from_select(
+        ["id", "session_id", "student_id", "timestamp", "method", "notes", "device_id"],
+        unique_rows
+    )
+    if update_existing:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Attendance.session_id, Attendance.student_id],
+            set_={
+                "timestamp": stmt.excluded.timestamp,
+                "method": stmt.excluded.method,
+                "notes": stmt.excluded.notes,
+            }
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Attendance.session_id, Attendance.student_id])
+
+    return db.execute(stmt).rowcount
+
+
+def unresolved_summary(db: Session, parsed, resolved: Table, sample_size: int = 20) -> Dict[str, Any]:
+    """Contagem de linhas não carregadas por motivo e uma amostra para correção"""
+    reason = case(
+        (~parsed.c.is_valid, "invalid_value"),
+        (Student.id.is_(None), "unknown_matricula"),
+        else_="no_matching_session"
+    )
+    unresolved = select(parsed.c.line, parsed.c.matricula, reason.label("reason")).select_from(
+        parsed.outerjoin(Student, Student.matricula == parsed.c.matricula)
+    ).where(
+        ~exists().where(resolved.c.line == parsed.c.line)
+    ).subquery("unresolved")
+
+    counts = dict(db.execute(
+        select(unresolved.c.reason, func.count()).group_by(unresolved.c.reason)
+    ).all())
+    sample = db.execute(
+        select(unresolved.c.line, unresolved.c.matricula, unresolved.c.reason)
+        .order_by(unresolved.c.line)
+        .limit(sample_size)
+    ).all()
+    return {"counts": counts, "sample": [dict(row._mapping) for row in sample]}
+
+
+def backfill_attendance(
+    db: Session,
+    source: TextIO,
+    header: List[str],
+    tolerance_minutes: int = 30,
+    create_sessions: bool = False,
+    teacher_id: Optional[str] = None,
+    update_existing: bool = False,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """Carrega o histórico do arquivo (posicionado no header) e retorna as estatísticas da carga"""
+    columns = validate_backfill_header(header)
+    if create_sessions and not teacher_id:
+        raise BackfillFileError("teacher_id is required to create sessions")
+
+    tolerance = timedelta(minutes=tolerance_minutes)
+    staging, resolved = _staging_tables(columns)
+    stats: Dict[str, Any] = {}
+    started = time.perf_counter()
+
+    connection = db.connection()
+    connection.execute(text(SAFE_TIMESTAMP_FUNCTION))
+    staging.create(connection)
+    resolved.create(connection)
+
+    # COPY direto do arquivo: o parsing do CSV acontece no servidor
+    preparer = connection.dialect.identifier_preparer
+    column_list = ", ".join(preparer.quote(name) for name in columns)
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {staging.name} ({column_list}) FROM STDIN WITH (FORMAT csv, HEADER true)",
+            source
+        )
+    finally:
+        cursor.close()
+    stats["staged"] = db.execute(select(func.count()).select_from(staging)).scalar()
+    stats["copy_seconds"] = time.perf_counter() - started
+
+    merge_started = time.perf_counter()
+    parsed = _parsed_rows(staging, columns)
+    stats["sessions_created"] = (
+        create_missing_sessions(db, parsed, tolerance, teacher_id) if create_sessions else 0
+    )
+    stats["resolved"] = resolve_rows(db, parsed, resolved, tolerance)
+    stats["inserted"] = merge_attendances(db, resolved, update_existing)
+    stats["unresolved"] = unresolved_summary(db, parsed, resolved)
+    stats["class_ids"] = [
+        str(class_id) for class_id in db.execute(select(resolved.c.class_id).distinct()).scalars()
+    ]
+    stats["merge_seconds"] = time.perf_counter() - merge_started
+
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+
+    stats["total_seconds"] = time.perf_counter() - started
+    stats["rows_per_second"] = stats["staged"] / max(stats["total_seconds"], 1e-9)
+    return stats
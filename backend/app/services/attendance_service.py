@@ -1,7 +1,11 @@
 from datetime import datetime
 from sqlalchemy.orm import Session
 from app.models.attendance import Attendance, AttendanceMethod
+from app.models.session import Session as SessionModel
 from app.db.redis_client import get_redis
+from app.services.report_cache_service import bump_report_versions
+from app.services.rollup_service import record_attendance_rollup
+from app.services.at_risk_service import refresh_class_ratios
 import uuid
 
 
@@ -25,6 +29,8 @@ async def register_attendance(
         raise ValueError("Another check-in is in progress")
     
     try:
+        session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+        
         # Criar registro de presença
         attendance = Attendance(
             id=uuid.uuid4(),
@@ -38,9 +44,20 @@ async def register_attendance(
         )
         
         db.add(attendance)
+        db.flush()
+        
+        # Atualizar rollup de frequência na mesma transação
+        record_attendance_rollup(db, session, student_id)
+        
         db.commit()
         db.refresh(attendance)
         
+        # Invalidar relatórios em cache da sessão/turma
+        bump_report_versions(session_id=session_id, class_id=session.class_id)
+        
+        # Atualizar score de frequência do aluno (turma/curso)
+        refresh_class_ratios(db, session.class_id, [student_id])
+        
         return attendance
     finally:
         # Liberar lock
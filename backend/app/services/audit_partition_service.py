@@ -0,0 +1,200 @@
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime
+from typing import Optional, Dict, Any, Iterator, List, Sequence, Tuple
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# audit_logs é particionada por mês (audit_logs_YYYY_MM) com uma partição DEFAULT para linhas
+# sem partição mensal. A manutenção cria as partições à frente e arquiva (exporta e remove)
+# as mais antigas que AUDIT_RETENTION_MONTHS. Consultas na tabela pai só enxergam as partições vivas.
+PARENT_TABLE = "audit_logs"
+DEFAULT_PARTITION = "audit_logs_default"
+
+_PARTITION_NAME = re.compile(r"^audit_logs_(\d{4})_(\d{2})$")
+
+# Linhas por lote lidas do cursor no servidor (e row group no Parquet)
+ARCHIVE_BATCH_SIZE = 50_000
+
+_UUID_METADATA = {b"logical_type": b"uuid"}
+
+AUDIT_ARCHIVE_SCHEMA = pa.schema([
+    pa.field("id", pa.binary(16), nullable=False, metadata=_UUID_METADATA),
+    pa.field("actor_id", pa.binary(16), nullable=False, metadata=_UUID_METADATA),
+    pa.field("action", pa.string(), nullable=False),
+    pa.field("details", pa.string()),  # JSON
+    pa.field("created_at", pa.timestamp("us"), nullable=False),
+])
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+def list_audit_partitions(db: Session) -> List[Tuple[str, date]]:
+    """Partições mensais existentes (nome, mês), da mais antiga para a mais nova"""
+    names = db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PARENT_TABLE}).scalars()
+
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_audit_partition(db: Session, month: date) -> int:
+    """Cria a partição do mês, movendo para ela as linhas do mês que caíram na DEFAULT (-1 se já existia)"""
+    name = partition_name(month)
+    if name in {existing for existing, _ in list_audit_partitions(db)}:
+        return -1
+
+    bounds = {"start": month, "end": add_months(month, 1)}
+    in_range = "created_at >= :start AND created_at < :end"
+    values = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{bounds['end'].isoformat()}')"
+
+    pending = db.execute(
+        text(f"SELECT count(*) FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds
+    ).scalar()
+    if not pending:
+        db.execute(text(f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} {values}"))
+        db.commit()
+        return 0
+
+    # Com linhas do mês na DEFAULT o CREATE ... PARTITION OF falha: cria solta, move e anexa
+    db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_range} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), bounds)
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} {values}"))
+    db.commit()
+    return pending
+
+
+def ensure_audit_partitions(db: Session, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """Garante partições do mês atual até months_ahead meses à frente"""
+    current = month_start(today or datetime.utcnow())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if create_audit_partition(db, month) >= 0:
+            created.append(partition_name(month))
+    return created
+
+
+def default_partition_rows(db: Session) -> int:
+    """Linhas na partição DEFAULT (indicam que faltou criar partições à frente)"""
+    return db.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar()
+
+
+def _iter_partition_rows(db: Session, name: str) -> Iterator[Sequence]:
+    result = db.execute(
+        text(f"SELECT id, actor_id, action, details, created_at FROM {name} ORDER BY created_at, id"),
+        execution_options={"yield_per": ARCHIVE_BATCH_SIZE}
+    )
+    for rows in result.partitions():
+        yield rows
+
+
+def write_archive_ndjson(row_batches: Iterator[Sequence], path: str) -> int:
+    """Grava as linhas em NDJSON comprimido com gzip; retorna nº de linhas"""
+    total = 0
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for rows in row_batches:
+            for row_id, actor_id, action, details, created_at in rows:
+                f.write(json.dumps({
+                    "id": str(row_id),
+                    "actor_id": str(actor_id),
+                    "action": action,
+                    "details": details,
+                    "created_at": created_at.isoformat()
+                }) + "\n")
+            total += len(rows)
+    return total
+
+
+def write_archive_parquet(row_batches: Iterator[Sequence], path: str) -> int:
+    """Grava as linhas em Parquet (zstd, um row group por lote); retorna nº de linhas"""
+    total = 0
+    with pq.ParquetWriter(path, AUDIT_ARCHIVE_SCHEMA, compression="zstd") as writer:
+        for rows in row_batches:
+            ids, actor_ids, actions, details, created_ats = zip(*rows)
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [
+                    pa.array([value.bytes for value in ids], type=pa.binary(16)),
+                    pa.array([value.bytes for value in actor_ids], type=pa.binary(16)),
+                    pa.array(actions, type=pa.string()),
+                    pa.array([None if value is None else json.dumps(value) for value in details], type=pa.string()),
+                    pa.array(created_ats, type=pa.timestamp("us")),
+                ],
+                schema=AUDIT_ARCHIVE_SCHEMA
+            ))
+            total += len(rows)
+    return total
+
+
+# Formato -> (gravador, extensão)
+ARCHIVE_FORMATS = {
+    "ndjson": (write_archive_ndjson, "ndjson.gz"),
+    "parquet": (write_archive_parquet, "parquet"),
+}
+
+
+def archive_audit_partitions(
+    db: Session,
+    retention_months: int,
+    archive_dir: str,
+    fmt: str = "ndjson",
+    dry_run: bool = False,
+    today: Optional[date] = None
+) -> List[Dict[str, Any]]:
+    """Exporta e remove partições de meses anteriores à retenção (o mês atual conta como 0)"""
+    writer, extension = ARCHIVE_FORMATS[fmt]
+    cutoff = add_months(month_start(today or datetime.utcnow()), -retention_months)
+    expired = [(name, month) for name, month in list_audit_partitions(db) if month < cutoff]
+
+    archived = []
+    for name, month in expired:
+        path = os.path.join(archive_dir, f"{name}.{extension}")
+        if dry_run:
+            rows = db.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+            archived.append({"partition": name, "month": month.isoformat(), "rows": rows, "path": path})
+            continue
+
+        # Bloqueia escritas na partição (ex.: regravação do spool) até o DROP
+        db.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+        rows = db.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+        os.makedirs(archive_dir, exist_ok=True)
+        written = writer(_iter_partition_rows(db, name), path + ".tmp")
+        if written != rows:
+            db.rollback()
+            os.remove(path + ".tmp")
+            raise RuntimeError(f"Archive of {name} wrote {written} rows, expected {rows}")
+        # Arquivo completo no disco antes de remover a partição
+        os.replace(path + ".tmp", path)
+
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+        archived.append({"partition": name, "month": month.isoformat(), "rows": rows, "path": path})
+
+    return archived
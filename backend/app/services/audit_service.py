@@ -1,6 +1,47 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.base import SessionLocal
 from app.models.audit_log import AuditLog
-from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Auditoria em lote: log_audit só enfileira; uma task grava a fila em INSERTs multi-linha a cada
+# AUDIT_FLUSH_INTERVAL_MS ou AUDIT_FLUSH_BATCH_SIZE entradas. Sem o writer (scripts) ou com a fila
+# cheia além do timeout, a entrada é gravada na hora pela sessão do chamador, como antes.
+# Com o banco indisponível, o lote vai para arquivos NDJSON em AUDIT_SPOOL_DIR e é regravado depois.
+
+# Intervalo mínimo entre tentativas de regravar o spool
+SPOOL_REPLAY_SECONDS = 30
+
+# Arquivo em regravação (.replaying) há mais tempo que isso ficou de um worker que caiu
+SPOOL_STALE_CLAIM_SECONDS = 600
+
+_queue: Optional[asyncio.Queue] = None
+_writer_task: Optional[asyncio.Task] = None
+_last_replay = 0.0
+_stats = {"enqueued": 0, "written": 0, "direct": 0, "spooled": 0, "dropped": 0}
+
+
+def _audit_row(actor_id, action: str, details: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # id e created_at definidos no momento da ação (a ordem não depende do flush)
+    return {
+        "id": uuid.uuid4(),
+        "actor_id": actor_id if isinstance(actor_id, uuid.UUID) else uuid.UUID(str(actor_id)),
+        "action": action,
+        "details": details,
+        "created_at": datetime.utcnow()
+    }
 
 
 async def log_audit(
@@ -9,14 +50,229 @@ async def log_audit(
     action: str,
     details: Optional[Dict[str, Any]] = None
 ):
-    """Registra ação de auditoria"""
-    audit_log = AuditLog(
-        actor_id=actor_id,
-        action=action,
-        details=details
-    )
-    db.add(audit_log)
+    """Registra ação de auditoria (enfileira; grava direto se o writer não estiver ativo)"""
+    row = _audit_row(actor_id, action, details)
+
+    if _queue is not None:
+        try:
+            _queue.put_nowait(row)
+            _stats["enqueued"] += 1
+            return
+        except asyncio.QueueFull:
+            pass
+        # Backpressure: espera espaço na fila; passado o timeout, grava no caminho do pedido
+        try:
+            await asyncio.wait_for(_queue.put(row), timeout=settings.AUDIT_ENQUEUE_TIMEOUT)
+            _stats["enqueued"] += 1
+            return
+        except asyncio.TimeoutError:
+            pass
+
+    db.add(AuditLog(**row))
     db.commit()
+    _stats["direct"] += 1
+
+
+def _spool_dir() -> str:
+    os.makedirs(settings.AUDIT_SPOOL_DIR, exist_ok=True)
+    return settings.AUDIT_SPOOL_DIR
+
+
+def _spool(rows: List[Dict[str, Any]]):
+    """Grava o lote em NDJSON para regravar quando o banco voltar"""
+    name = f"audit-{datetime.utcnow():%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}.ndjson"
+    path = os.path.join(_spool_dir(), name)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps({
+                **row,
+                "id": str(row["id"]),
+                "actor_id": str(row["actor_id"]),
+                "created_at": row["created_at"].isoformat()
+            }) + "\n")
+    # Arquivo só aparece completo para a regravação
+    os.rename(path + ".tmp", path)
+    _stats["spooled"] += len(rows)
+
+
+def _read_spool(path: str) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            row["id"] = uuid.UUID(row["id"])
+            row["actor_id"] = uuid.UUID(row["actor_id"])
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+            rows.append(row)
+    return rows
+
+
+def _insert_rows(rows: List[Dict[str, Any]]):
+    db = SessionLocal()
+    try:
+        db.execute(insert(AuditLog), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def write_audit_rows(rows: List[Dict[str, Any]]) -> bool:
+    """Grava o lote em uma transação; retorna False se foi para o spool"""
+    try:
+        _insert_rows(rows)
+        _stats["written"] += len(rows)
+        return True
+    except IntegrityError:
+        # Uma linha inválida (ex.: ator removido, id já regravado) não derruba o lote
+        pass
+    except SQLAlchemyError:
+        logger.exception("Audit flush failed, spooling %d entries", len(rows))
+        _spool(rows)
+        return False
+
+    for index, row in enumerate(rows):
+        try:
+            _insert_rows([row])
+            _stats["written"] += 1
+        except IntegrityError as e:
+            logger.error("Dropping audit entry %s (%s): %s", row["id"], row["action"], e.orig)
+            _stats["dropped"] += 1
+        except SQLAlchemyError:
+            logger.exception("Audit flush failed, spooling %d entries", len(rows) - index)
+            _spool(rows[index:])
+            return False
+    return True
+
+
+def _release_stale_claims():
+    """Devolve ao spool os arquivos .replaying abandonados (worker caiu no meio da regravação)"""
+    now = time.time()
+    for name in os.listdir(settings.AUDIT_SPOOL_DIR):
+        if not name.endswith(".ndjson.replaying"):
+            continue
+        claimed = os.path.join(settings.AUDIT_SPOOL_DIR, name)
+        try:
+            if now - os.path.getmtime(claimed) < SPOOL_STALE_CLAIM_SECONDS:
+                continue
+            os.rename(claimed, claimed[:-len(".replaying")])
+            logger.warning("Releasing stale audit spool claim %s", name)
+        except FileNotFoundError:
+            continue
+
+
+def replay_audit_spool() -> int:
+    """Regrava os arquivos do spool em ordem; para no primeiro que falhar"""
+    if not os.path.isdir(settings.AUDIT_SPOOL_DIR):
+        return 0
+
+    _release_stale_claims()
+    replayed = 0
+    for name in sorted(os.listdir(settings.AUDIT_SPOOL_DIR)):
+        if not name.endswith(".ndjson"):
+            continue
+        path = os.path.join(settings.AUDIT_SPOOL_DIR, name)
+        claimed = path + ".replaying"
+        try:
+            # rename é atômico: com vários workers, só um regrava cada arquivo
+            os.rename(path, claimed)
+            # mtime marca o início da regravação (rename preserva o do spool)
+            os.utime(claimed)
+        except FileNotFoundError:
+            continue
+
+        rows = _read_spool(claimed)
+        ok = write_audit_rows(rows)
+        # Se falhou, as linhas já estão em um novo arquivo do spool
+        os.remove(claimed)
+        if not ok:
+            break
+        replayed += len(rows)
+    return replayed
+
+
+async def _next_batch(queue: asyncio.Queue) -> List[Optional[Dict[str, Any]]]:
+    """Espera a primeira entrada e junta as seguintes até o intervalo ou o tamanho do lote"""
+    loop = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + settings.AUDIT_FLUSH_INTERVAL_MS / 1000
+    while len(batch) < settings.AUDIT_FLUSH_BATCH_SIZE and batch[-1] is not None:
+        try:
+            batch.append(queue.get_nowait())
+            continue
+        except asyncio.QueueEmpty:
+            pass
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+async def _writer_loop(queue: asyncio.Queue):
+    global _last_replay
+    while True:
+        batch = await _next_batch(queue)
+        stopping = batch[-1] is None
+        rows = [row for row in batch if row is not None]
+
+        if rows:
+            try:
+                ok = await run_in_threadpool(write_audit_rows, rows)
+            except Exception:
+                # Nem o spool funcionou (disco): as entradas se perdem, o writer continua
+                logger.exception("Audit writer lost %d entries", len(rows))
+                _stats["dropped"] += len(rows)
+                ok = False
+
+            if ok and time.monotonic() - _last_replay > SPOOL_REPLAY_SECONDS:
+                _last_replay = time.monotonic()
+                try:
+                    await run_in_threadpool(replay_audit_spool)
+                except Exception:
+                    logger.exception("Audit spool replay failed")
+
+        if stopping:
+            return
+
+
+async def start_audit_writer():
+    """Inicia a task de gravação em lote (startup) e regrava o que ficou no spool"""
+    global _queue, _writer_task, _last_replay
+    if _writer_task is not None:
+        return
+
+    _last_replay = time.monotonic()
+    try:
+        await run_in_threadpool(replay_audit_spool)
+    except Exception:
+        logger.exception("Audit spool replay failed")
+
+    queue = asyncio.Queue(maxsize=settings.AUDIT_QUEUE_MAX_SIZE)
+    _writer_task = asyncio.create_task(_writer_loop(queue))
+    _queue = queue
+
+
+async def stop_audit_writer():
+    """Grava o que está na fila e encerra o writer (shutdown)"""
+    global _queue, _writer_task
+    if _writer_task is None:
+        return
 
+    queue, task = _queue, _writer_task
+    # Novas entradas passam a ser gravadas direto; a sentinela fecha a fila depois das pendentes
+    _queue = None
+    await queue.put(None)
+    await task
+    _writer_task = None
 
 
+def get_audit_writer_stats() -> Dict[str, Any]:
+    """Estado da fila de auditoria (exposto em /api/v1/system/stats)"""
+    return {
+        "running": _writer_task is not None,
+        "queued": _queue.qsize() if _queue is not None else 0,
+        **_stats
+    }
@@ -0,0 +1,93 @@
+from typing import Iterable, Iterator, Sequence
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy.orm import Session
+from app.models.attendance import AttendanceMethod
+from app.services.report_service import ReportFilters, iter_report_rows
+
+# Linhas por lote (RecordBatch / row group) lidas do cursor do banco
+EXPORT_BATCH_SIZE = 50_000
+
+METHOD_VALUES = [method.value for method in AttendanceMethod]
+METHOD_INDEX = {method: index for index, method in enumerate(AttendanceMethod)}
+
+# UUIDs como 16 bytes; metadados indicam o tipo lógico para os consumidores
+_UUID_METADATA = {b"logical_type": b"uuid"}
+
+ATTENDANCE_SCHEMA = pa.schema([
+    pa.field("id", pa.binary(16), nullable=False, metadata=_UUID_METADATA),
+    pa.field("session_id", pa.binary(16), nullable=False, metadata=_UUID_METADATA),
+    pa.field("student_id", pa.binary(16), nullable=False, metadata=_UUID_METADATA),
+    pa.field("student_name", pa.string()),
+    pa.field("timestamp", pa.timestamp("us"), nullable=False),
+    pa.field("method", pa.dictionary(pa.int8(), pa.string()), nullable=False),
+    pa.field("device_id", pa.string()),
+    pa.field("geo_lat", pa.float64()),
+    pa.field("geo_lon", pa.float64()),
+])
+
+
+def iter_attendance_rows(db: Session, batch_size: int = EXPORT_BATCH_SIZE, **filters) -> Iterator[Sequence]:
+    """Lê presenças em lotes via cursor no servidor (memória limitada)"""
+    return iter_report_rows(db, ReportFilters(**filters), batch_size)
+
+
+def rows_to_record_batch(rows: Sequence) -> pa.RecordBatch:
+    """Converte um lote de linhas em RecordBatch tipado"""
+    (ids, session_ids, student_ids, names, timestamps,
+     methods, device_ids, geo_lats, geo_lons) = zip(*rows)
+
+    # Dicionário fixo: todos os lotes compartilham os mesmos códigos (exigido pelo IPC)
+    method_array = pa.DictionaryArray.from_arrays(
+        pa.array([METHOD_INDEX[method] for method in methods], type=pa.int8()),
+        pa.array(METHOD_VALUES, type=pa.string())
+    )
+
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array([value.bytes for value in ids], type=pa.binary(16)),
+            pa.array([value.bytes for value in session_ids], type=pa.binary(16)),
+            pa.array([value.bytes for value in student_ids], type=pa.binary(16)),
+            pa.array(names, type=pa.string()),
+            pa.array(timestamps, type=pa.timestamp("us")),
+            method_array,
+            pa.array(device_ids, type=pa.string()),
+            pa.array(geo_lats, type=pa.float64()),
+            pa.array(geo_lons, type=pa.float64()),
+        ],
+        schema=ATTENDANCE_SCHEMA
+    )
+
+
+def write_parquet(row_batches: Iterable[Sequence], sink) -> int:
+    """Grava os lotes em Parquet (um row group por lote); retorna nº de linhas"""
+    total = 0
+    with pq.ParquetWriter(sink, ATTENDANCE_SCHEMA, compression="zstd") as writer:
+        for rows in row_batches:
+            writer.write_batch(rows_to_record_batch(rows))
+            total += len(rows)
+    return total
+
+
+def write_arrow_ipc(row_batches: Iterable[Sequence], sink) -> int:
+    """Grava os lotes em Arrow IPC (formato arquivo/Feather v2); retorna nº de linhas"""
+    total = 0
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_file(sink, ATTENDANCE_SCHEMA, options=options) as writer:
+        for rows in row_batches:
+            writer.write_batch(rows_to_record_batch(rows))
+            total += len(rows)
+    return total
+
+
+# Formato -> (gravador, media type, extensão)
+COLUMNAR_FORMATS = {
+    "parquet": (write_parquet, "application/vnd.apache.parquet", "parquet"),
+    "arrow": (write_arrow_ipc, "application/vnd.apache.arrow.file", "arrow"),
+}
+
+
+async def export_attendance_columnar(db: Session, fmt: str, path: str, **filters) -> int:
+    """Exporta presenças para um arquivo colunar em disco; retorna nº de linhas"""
+    writer = COLUMNAR_FORMATS[fmt][0]
+    return writer(iter_attendance_rows(db, **filters), path)
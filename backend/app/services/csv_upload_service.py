@@ -1,171 +1,350 @@
 import csv
 import io
-from typing import List, Dict, Any
+import os
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple, Set
+from openpyxl import load_workbook
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.models.user import User, UserRole
 from app.models.student import Student
 from app.models.class_model import Class
-from app.core.security import get_password_hash
+from app.core.hashing import hash_passwords
 from app.core.config import settings
 import uuid
 
+REQUIRED_COLUMNS = ['name', 'email', 'matricula']
 
-async def process_student_csv(
-    file,
-    db: Session,
-    actor_id: str
-) -> Dict[str, Any]:
-    """Processa arquivo CSV e cria alunos em lote"""
-    
-    # Ler conteúdo do arquivo
-    contents = await file.read()
-    
-    # Validar tamanho (5MB)
-    max_size = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
-    if len(contents) > max_size:
-        return {
-            "total_processed": 0,
-            "success_count": 0,
-            "error_count": 0,
-            "errors": [{"line": 0, "error": f"File size exceeds {settings.MAX_UPLOAD_SIZE_MB}MB"}],
-            "message": "File too large"
-        }
-    
-    # Decodificar CSV
-    try:
-        csv_content = contents.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(csv_content))
-    except Exception as e:
-        return {
-            "total_processed": 0,
-            "success_count": 0,
-            "error_count": 0,
-            "errors": [{"line": 0, "error": f"Error reading CSV: {str(e)}"}],
-            "message": "Invalid CSV format"
-        }
-    
-    # Validar colunas obrigatórias
-    required_columns = ['name', 'email', 'matricula']
-    if not all(col in csv_reader.fieldnames for col in required_columns):
-        return {
-            "total_processed": 0,
-            "success_count": 0,
-            "error_count": 0,
-            "errors": [{"line": 0, "error": f"Missing required columns. Required: {required_columns}"}],
-            "message": "Invalid CSV format"
-        }
-    
-    success_count = 0
-    error_count = 0
-    errors = []
-    
-    # Processar cada linha
-    for line_num, row in enumerate(csv_reader, start=2):  # Começa em 2 (linha 1 é header)
+# Extensão -> formato aceito na importação de alunos
+ROSTER_FORMATS = {".csv": "csv", ".xlsx": "xlsx"}
+
+# Senha inicial dos alunos importados
+DEFAULT_PASSWORD = "senha123"
+
+# Linhas por transação na inserção em lote
+IMPORT_BATCH_SIZE = 500
+
+# Valores por cláusula IN nas consultas de pré-carga
+LOOKUP_CHUNK_SIZE = 5000
+
+
+def has_required_columns(fieldnames) -> bool:
+    """Verifica se o header contém as colunas obrigatórias"""
+    return bool(fieldnames) and all(col in fieldnames for col in REQUIRED_COLUMNS)
+
+
+def roster_format(filename: Optional[str]) -> Optional[str]:
+    """Formato do arquivo pela extensão (csv/xlsx) ou None se não suportado"""
+    return ROSTER_FORMATS.get(os.path.splitext(filename or "")[1].lower())
+
+
+def read_csv_rows(lines: Iterable[str]) -> Tuple[Optional[List[str]], Iterator[Tuple[int, Dict[str, Any]]]]:
+    """Header e linhas numeradas de um CSV (linha 1 é o header)"""
+    reader = csv.DictReader(lines)
+    return reader.fieldnames, enumerate(reader, start=2)
+
+
+def _cell_to_str(value) -> str:
+    # Matrículas numéricas chegam como float no Excel (12345.0)
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def read_xlsx_rows(source) -> Tuple[List[str], Iterator[Tuple[int, Dict[str, Any]]], int]:
+    """Header, linhas numeradas e total de linhas da primeira planilha, lida em modo read-only
+
+    As linhas são lidas sob demanda do arquivo; linhas vazias são ignoradas.
+    """
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    sheet = workbook.worksheets[0]
+    values = sheet.iter_rows(values_only=True)
+    header = next(values, None) or ()
+    fieldnames = [_cell_to_str(value).strip() for value in header]
+
+    def numbered_rows():
         try:
-            # Validar dados obrigatórios
-            name = row.get('name', '').strip()
-            email = row.get('email', '').strip().lower()
-            matricula = row.get('matricula', '').strip()
-            curso = row.get('curso', '').strip() or None
-            class_name = row.get('class', '').strip() or row.get('turma', '').strip()
-            
-            if not name or not email or not matricula:
-                errors.append({
-                    "line": line_num,
-                    "error": "Missing required fields: name, email, or matricula",
-                    "data": row
-                })
-                error_count += 1
-                continue
-            
-            # Validar email
-            if '@' not in email:
-                errors.append({
-                    "line": line_num,
-                    "error": "Invalid email format",
-                    "data": row
-                })
-                error_count += 1
-                continue
-            
-            # Verificar se email já existe
-            existing_user = db.query(User).filter(User.email == email).first()
-            if existing_user:
-                errors.append({
-                    "line": line_num,
-                    "error": f"Email already exists: {email}",
-                    "data": row
-                })
-                error_count += 1
-                continue
-            
-            # Verificar se matrícula já existe
-            existing_student = db.query(Student).filter(Student.matricula == matricula).first()
-            if existing_student:
+            for line_num, row in enumerate(values, start=2):
+                if all(value is None for value in row):
+                    continue
+                yield line_num, {name: _cell_to_str(value) for name, value in zip(fieldnames, row) if name}
+        finally:
+            workbook.close()
+
+    return fieldnames, numbered_rows(), sheet.max_row or 0
+
+
+def normalize_row(line_num: int, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Extrai e normaliza os campos de uma linha do arquivo"""
+    return {
+        "line": line_num,
+        "name": (row.get('name') or '').strip(),
+        "email": (row.get('email') or '').strip().lower(),
+        "matricula": (row.get('matricula') or '').strip(),
+        "curso": (row.get('curso') or '').strip() or None,
+        "class_name": (row.get('class') or '').strip() or (row.get('turma') or '').strip(),
+        "data": row
+    }
+
+
+def existing_values(db: Session, column, values: Iterable[str]) -> Set[str]:
+    """Valores que já existem no banco (consulta em blocos)"""
+    values = list(values)
+    existing = set()
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[start:start + LOOKUP_CHUNK_SIZE]
+        existing.update(value for (value,) in db.query(column).filter(column.in_(chunk)).all())
+    return existing
+
+
+def load_class_ids(db: Session, class_names: Iterable[str]) -> Dict[str, Any]:
+    """Mapa nome da turma -> id em uma consulta"""
+    names = list(set(class_names))
+    if not names:
+        return {}
+    return {name: class_id for class_id, name in db.query(Class.id, Class.name).filter(Class.name.in_(names)).all()}
+
+
+def required_field_error(row: Dict[str, Any]) -> Optional[str]:
+    """Erro de campos obrigatórios/formato da linha, ou None"""
+    if not row["name"] or not row["email"] or not row["matricula"]:
+        return "Missing required fields: name, email, or matricula"
+    if '@' not in row["email"]:
+        return "Invalid email format"
+    return None
+
+
+def validate_rows(db: Session, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int]:
+    """Valida todas as linhas em memória contra o arquivo e o banco
+
+    Retorna (linhas válidas com class_id resolvido, relatório de erros/avisos, nº de erros).
+    """
+    existing_emails = existing_values(db, User.email, {row["email"] for row in rows if row["email"]})
+    existing_matriculas = existing_values(db, Student.matricula, {row["matricula"] for row in rows if row["matricula"]})
+    class_ids = load_class_ids(db, (row["class_name"] for row in rows if row["class_name"]))
+
+    valid = []
+    errors = []
+    error_count = 0
+    seen_emails: Dict[str, int] = {}
+    seen_matriculas: Dict[str, int] = {}
+
+    for row in rows:
+        error = required_field_error(row)
+        if error is None:
+            if row["email"] in existing_emails:
+                error = f"Email already exists: {row['email']}"
+            elif row["matricula"] in existing_matriculas:
+                error = f"Matrícula already exists: {row['matricula']}"
+            elif row["email"] in seen_emails:
+                error = f"Duplicate email in file (line {seen_emails[row['email']]}): {row['email']}"
+            elif row["matricula"] in seen_matriculas:
+                error = f"Duplicate matrícula in file (line {seen_matriculas[row['matricula']]}): {row['matricula']}"
+
+        if error:
+            errors.append({"line": row["line"], "error": error, "data": row["data"]})
+            error_count += 1
+            continue
+
+        seen_emails[row["email"]] = row["line"]
+        seen_matriculas[row["matricula"]] = row["line"]
+
+        row["class_id"] = None
+        if row["class_name"]:
+            row["class_id"] = class_ids.get(row["class_name"])
+            if row["class_id"] is None:
                 errors.append({
-                    "line": line_num,
-                    "error": f"Matrícula already exists: {matricula}",
-                    "data": row
+                    "line": row["line"],
+                    "error": f"Class not found: {row['class_name']}",
+                    "data": row["data"],
+                    "warning": True  # Aviso, mas continua
                 })
-                error_count += 1
-                continue
-            
-            # Buscar turma se fornecida
-            class_id = None
-            if class_name:
-                class_obj = db.query(Class).filter(Class.name == class_name).first()
-                if class_obj:
-                    class_id = class_obj.id
-                else:
-                    errors.append({
-                        "line": line_num,
-                        "error": f"Class not found: {class_name}",
-                        "data": row,
-                        "warning": True  # Aviso, mas continua
-                    })
-            
-            # Criar usuário
-            user = User(
-                id=uuid.uuid4(),
-                name=name,
-                email=email,
-                role=UserRole.STUDENT,
-                password_hash=get_password_hash("senha123"),  # Senha padrão
-                is_active="true"
-            )
-            db.add(user)
-            db.flush()
-            
-            # Criar estudante
-            student = Student(
-                id=uuid.uuid4(),
-                user_id=user.id,
-                matricula=matricula,
-                curso=curso,
-                class_id=class_id
-            )
-            db.add(student)
-            db.commit()
-            
-            success_count += 1
-            
-        except Exception as e:
-            db.rollback()
+
+        valid.append(row)
+
+    return valid, errors, error_count
+
+
+async def assign_password_hashes(rows: List[Dict[str, Any]]):
+    """Senha padrão com hash (e salt) próprio por aluno, calculado no pool de processos"""
+    hashes = await hash_passwords([DEFAULT_PASSWORD] * len(rows))
+    for row, hashed in zip(rows, hashes):
+        row["password_hash"] = hashed
+
+
+def _build_records(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Monta os parâmetros de users e students para inserção multi-linha"""
+    users = []
+    students = []
+    for row in rows:
+        user_id = uuid.uuid4()
+        users.append({
+            "id": user_id,
+            "name": row["name"],
+            "email": row["email"],
+            "role": UserRole.STUDENT,
+            "password_hash": row["password_hash"],
+            "is_active": "true"
+        })
+        students.append({
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "matricula": row["matricula"],
+            "curso": row["curso"],
+            "class_id": row["class_id"]
+        })
+    return users, students
+
+
+def insert_student_batch(db: Session, rows: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+    """Insere um lote em uma transação; em conflito, isola as linhas com savepoints
+
+    Retorna (nº inseridos, erros por linha).
+    """
+    users, students = _build_records(rows)
+    try:
+        db.execute(insert(User), users)
+        db.execute(insert(Student), students)
+        db.commit()
+        return len(rows), []
+    except IntegrityError:
+        # Outro processo inseriu o mesmo email/matrícula após a validação
+        db.rollback()
+
+    inserted = 0
+    errors = []
+    for row, user, student in zip(rows, users, students):
+        try:
+            with db.begin_nested():
+                db.execute(insert(User), [user])
+                db.execute(insert(Student), [student])
+            inserted += 1
+        except IntegrityError as e:
             errors.append({
-                "line": line_num,
-                "error": f"Error processing line: {str(e)}",
-                "data": row
+                "line": row["line"],
+                "error": f"Error processing line: {str(e.orig).splitlines()[0]}",
+                "data": row["data"]
             })
-            error_count += 1
-            continue
-    
+    db.commit()
+    return inserted, errors
+
+
+def insert_students(db: Session, rows: List[Dict[str, Any]], batch_size: int = IMPORT_BATCH_SIZE) -> Tuple[int, List[Dict[str, Any]]]:
+    """Insere as linhas válidas em transações de até batch_size linhas"""
+    inserted = 0
+    errors = []
+    for start in range(0, len(rows), batch_size):
+        batch_inserted, batch_errors = insert_student_batch(db, rows[start:start + batch_size])
+        inserted += batch_inserted
+        errors.extend(batch_errors)
+    return inserted, errors
+
+
+def import_result(
+    success_count: int,
+    errors: List[Dict[str, Any]],
+    error_count: int,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """Resposta no formato de CSVUploadResponse"""
+    errors.sort(key=lambda error: error["line"])
+    if dry_run:
+        message = f"Validation only: {success_count} students would be created, {error_count} errors"
+    else:
+        message = f"Processed {success_count} students successfully, {error_count} errors"
     return {
         "total_processed": success_count + error_count,
         "success_count": success_count,
         "error_count": error_count,
         "errors": errors,
-        "message": f"Processed {success_count} students successfully, {error_count} errors"
+        "message": message,
+        "dry_run": dry_run
+    }
+
+
+class RosterFileError(Exception):
+    """Arquivo ilegível, grande demais ou sem as colunas obrigatórias"""
+
+    def __init__(self, error: str, message: str, line: int = 0):
+        super().__init__(error)
+        self.error = error
+        self.message = message
+        self.line = line
+
+
+def file_error_result(e: RosterFileError) -> Dict[str, Any]:
+    """Resposta de arquivo rejeitado (nenhuma linha processada)"""
+    return {
+        "total_processed": 0,
+        "success_count": 0,
+        "error_count": 0,
+        "errors": [{"line": e.line, "error": e.error}],
+        "message": e.message
     }
 
 
+async def load_roster_rows(file) -> List[Dict[str, Any]]:
+    """Lê o upload (CSV ou XLSX) e retorna as linhas normalizadas"""
+
+    # Ler conteúdo do arquivo
+    contents = await file.read()
+
+    # Validar tamanho (5MB)
+    max_size = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    if len(contents) > max_size:
+        raise RosterFileError(f"File size exceeds {settings.MAX_UPLOAD_SIZE_MB}MB", "File too large")
+
+    # CSV decodificado em memória; XLSX lido em modo read-only
+    fmt = roster_format(file.filename) or "csv"
+    label = fmt.upper()
+    try:
+        if fmt == "xlsx":
+            fieldnames, numbered_rows, _ = read_xlsx_rows(io.BytesIO(contents))
+        else:
+            fieldnames, numbered_rows = read_csv_rows(io.StringIO(contents.decode('utf-8')))
+    except Exception as e:
+        raise RosterFileError(f"Error reading {label}: {str(e)}", f"Invalid {label} format")
+
+    # Validar colunas obrigatórias
+    if not has_required_columns(fieldnames):
+        raise RosterFileError(f"Missing required columns. Required: {REQUIRED_COLUMNS}", f"Invalid {label} format")
+
+    rows = []
+    try:
+        for line_num, row in numbered_rows:
+            rows.append(normalize_row(line_num, row))
+    except csv.Error as e:
+        raise RosterFileError(f"Error reading CSV: {str(e)}", "Invalid CSV format", line=len(rows) + 2)
+
+    return rows
+
+
+async def process_student_csv(
+    file,
+    db: Session,
+    actor_id: str,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """Processa arquivo CSV/XLSX e cria alunos em lote (dry_run: apenas valida, sem escrita)"""
+    try:
+        rows = await load_roster_rows(file)
+    except RosterFileError as e:
+        return file_error_result(e)
+
+    # Validação em memória com consultas de pré-carga (emails, matrículas, turmas)
+    valid_rows, errors, error_count = validate_rows(db, rows)
+
+    if dry_run:
+        return import_result(len(valid_rows), errors, error_count, dry_run=True)
+
+    # bcrypt no pool de processos, sem bloquear o event loop
+    await assign_password_hashes(valid_rows)
+
+    # Inserção multi-linha em transações por lote
+    success_count, insert_errors = insert_students(db, valid_rows)
+    errors.extend(insert_errors)
+    error_count += len(insert_errors)
 
+    return import_result(success_count, errors, error_count)
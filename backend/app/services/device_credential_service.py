@@ -0,0 +1,204 @@
+import base64
+import calendar
+import hashlib
+import hmac
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.redis_client import get_redis
+from app.models.device_credential import DeviceCredential
+
+logger = logging.getLogger(__name__)
+
+# Credencial de aparelho: dev.<credential_id>.<user_id>.<expira (epoch)>.<device_id b64>.<assinatura>
+# Verificada com um HMAC e uma consulta ao conjunto de revogadas no Redis (sem bcrypt, sem JWT).
+# Não é aceita por get_current_user: só vale nas rotas que usam get_checkin_student.
+DEVICE_TOKEN_PREFIX = "dev"
+
+# Ids revogados (sorted set, score = expiração da credencial); saem só depois de expirar
+REVOKED_SET_KEY = "device_credentials:revoked_until"
+# Marca que o conjunto foi carregado do banco (ausente após flush/restart do Redis)
+REVOKED_LOADED_KEY = "device_credentials:revoked:loaded"
+
+# Recarga periódica do banco: limita a janela de uma revogação que não chegou ao Redis
+# publicada por outro worker (no próprio processo, as pendentes são republicadas)
+REVOKED_RELOAD_SECONDS = 60
+
+REVOKED_LOAD_CHUNK_SIZE = 1000
+
+# Revogações que não chegaram ao Redis: id -> expiração (republicadas na próxima verificação)
+_pending_revocations: Dict[str, int] = {}
+
+
+def _signing_key() -> bytes:
+    secret = settings.DEVICE_CREDENTIAL_SECRET_KEY or settings.SECRET_KEY
+    # Chave derivada: a mesma SECRET_KEY dos JWT não assina credenciais de aparelho diretamente
+    return hmac.new(secret.encode("utf-8"), b"device-credential", hashlib.sha256).digest()
+
+
+def _epoch(value: datetime) -> int:
+    # Datas do banco são UTC sem timezone
+    return calendar.timegm(value.utctimetuple())
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64(hmac.new(_signing_key(), payload.encode("utf-8"), hashlib.sha256).digest())
+
+
+def create_device_token(credential: DeviceCredential) -> str:
+    """Monta o token assinado de uma credencial (mostrado ao aparelho uma única vez)"""
+    payload = ".".join([
+        DEVICE_TOKEN_PREFIX,
+        credential.id.hex,
+        credential.user_id.hex,
+        str(_epoch(credential.expires_at)),
+        _b64(credential.device_id.encode("utf-8"))
+    ])
+    return f"{payload}.{_sign(payload)}"
+
+
+def is_device_token(token: str) -> bool:
+    return token.startswith(DEVICE_TOKEN_PREFIX + ".")
+
+
+def decode_device_token(token: str) -> Optional[Dict[str, Any]]:
+    """Confere assinatura e expiração; retorna credential_id, user_id e device_id"""
+    parts = token.split(".")
+    if len(parts) != 6 or parts[0] != DEVICE_TOKEN_PREFIX:
+        return None
+
+    payload, signature = ".".join(parts[:5]), parts[5]
+    if not hmac.compare_digest(_sign(payload), signature):
+        return None
+
+    try:
+        credential_id = uuid.UUID(parts[1])
+        user_id = uuid.UUID(parts[2])
+        expires_at = int(parts[3])
+        device_id = _unb64(parts[4]).decode("utf-8")
+    except ValueError:
+        return None
+
+    if expires_at < time.time():
+        return None
+
+    return {"credential_id": credential_id, "user_id": user_id, "device_id": device_id}
+
+
+def load_revoked_credentials(db: Session):
+    """Carrega no Redis os ids revogados ainda não expirados e remove os já expirados"""
+    redis_client = get_redis()
+    query = db.query(DeviceCredential.id, DeviceCredential.expires_at).filter(
+        DeviceCredential.revoked_at.isnot(None),
+        DeviceCredential.expires_at > datetime.utcnow()
+    )
+    pipe = redis_client.pipeline()
+    batch = {}
+    for credential_id, expires_at in query.yield_per(REVOKED_LOAD_CHUNK_SIZE):
+        batch[credential_id.hex] = _epoch(expires_at)
+        if len(batch) >= REVOKED_LOAD_CHUNK_SIZE:
+            pipe.zadd(REVOKED_SET_KEY, batch)
+            batch = {}
+    if batch:
+        pipe.zadd(REVOKED_SET_KEY, batch)
+    # ZADD em vez de recriar: revogações concorrentes com a carga não se perdem
+    pipe.zremrangebyscore(REVOKED_SET_KEY, "-inf", int(time.time()))
+    pipe.set(REVOKED_LOADED_KEY, "1", ex=REVOKED_RELOAD_SECONDS)
+    pipe.execute()
+
+
+def is_credential_revoked(db: Session, credential_id: uuid.UUID) -> bool:
+    """Consulta o conjunto de revogadas no Redis; sem Redis, consulta a credencial no banco"""
+    try:
+        # Revogações pendentes entram no conjunto antes da consulta
+        _republish_pending()
+        redis_client = get_redis()
+        loaded, revoked_until = redis_client.pipeline().exists(REVOKED_LOADED_KEY).zscore(
+            REVOKED_SET_KEY, credential_id.hex
+        ).execute()
+        if not loaded:
+            load_revoked_credentials(db)
+            revoked_until = redis_client.zscore(REVOKED_SET_KEY, credential_id.hex)
+        return revoked_until is not None
+    except RedisError:
+        revoked_at = db.query(DeviceCredential.revoked_at).filter(DeviceCredential.id == credential_id).first()
+        return revoked_at is None or revoked_at[0] is not None
+
+
+def enroll_device(db: Session, user_id: uuid.UUID, device_id: str, name: Optional[str] = None) -> Dict[str, Any]:
+    """Emite credencial para o aparelho; credenciais anteriores do mesmo aparelho são revogadas"""
+    previous = db.query(DeviceCredential).filter(
+        DeviceCredential.user_id == user_id,
+        DeviceCredential.device_id == device_id,
+        DeviceCredential.revoked_at.is_(None)
+    ).all()
+
+    now = datetime.utcnow()
+    for credential in previous:
+        credential.revoked_at = now
+
+    credential = DeviceCredential(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        device_id=device_id,
+        name=name,
+        created_at=now,
+        expires_at=now + timedelta(days=settings.DEVICE_CREDENTIAL_EXPIRE_DAYS)
+    )
+    db.add(credential)
+    db.commit()
+    db.refresh(credential)
+
+    _publish_revocations(previous)
+    return {"credential": credential, "token": create_device_token(credential)}
+
+
+def list_devices(db: Session, user_id: uuid.UUID) -> List[DeviceCredential]:
+    """Credenciais do aluno, mais recentes primeiro"""
+    return db.query(DeviceCredential).filter(
+        DeviceCredential.user_id == user_id
+    ).order_by(DeviceCredential.created_at.desc()).all()
+
+
+def revoke_device(db: Session, credential: DeviceCredential):
+    """Revoga no banco (fonte da verdade) e publica no conjunto do Redis"""
+    if credential.revoked_at is None:
+        credential.revoked_at = datetime.utcnow()
+        db.commit()
+    _publish_revocations([credential])
+
+
+def _publish_revocations(credentials: List[DeviceCredential]):
+    for credential in credentials:
+        _pending_revocations[credential.id.hex] = _epoch(credential.expires_at)
+    try:
+        _republish_pending()
+    except RedisError:
+        # Já gravada no banco (consultado enquanto o Redis estiver fora); este processo republica
+        # na volta e os demais workers recarregam do banco em até REVOKED_RELOAD_SECONDS
+        logger.warning("Redis unavailable, %d device revocations pending", len(_pending_revocations))
+
+
+def _republish_pending():
+    if not _pending_revocations:
+        return
+    pending = dict(_pending_revocations)
+    pipe = get_redis().pipeline()
+    pipe.zadd(REVOKED_SET_KEY, pending)
+    pipe.zremrangebyscore(REVOKED_SET_KEY, "-inf", int(time.time()))
+    pipe.execute()
+    for credential_id in pending:
+        _pending_revocations.pop(credential_id, None)
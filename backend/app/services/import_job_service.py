@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple, BinaryIO
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.services.audit_service import log_audit
+from app.services.job_state import create_job, update_job, get_job
+from app.services.csv_upload_service import (
+    REQUIRED_COLUMNS,
+    roster_format,
+    read_csv_rows,
+    read_xlsx_rows,
+    has_required_columns,
+    normalize_row,
+    validate_rows,
+    assign_password_hashes,
+    insert_students
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND = "import"
+
+# Estado do job fica disponível por um dia
+JOB_TTL_SECONDS = 24 * 3600
+
+# Erros e avisos guardados no estado do job, cada um (a contagem continua além disso)
+MAX_REPORTED_ERRORS = 1000
+
+# Bytes por leitura ao copiar o upload para o disco
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+_running_jobs: Dict[str, asyncio.Task] = {}
+
+
+class ImportQueueFullError(Exception):
+    """Limite de importações simultâneas atingido"""
+
+
+class ImportTooLargeError(Exception):
+    """Arquivo acima de IMPORT_MAX_SIZE_MB"""
+
+
+def _spool_dir() -> str:
+    os.makedirs(settings.IMPORT_SPOOL_DIR, exist_ok=True)
+    return settings.IMPORT_SPOOL_DIR
+
+
+async def spool_upload(file, path: str) -> int:
+    """Copia o upload para disco em blocos, sem carregá-lo na memória; retorna o tamanho"""
+    max_size = settings.IMPORT_MAX_SIZE_MB * 1024 * 1024
+    size = 0
+    with open(path, "wb") as out:
+        while True:
+            chunk = await file.read(SPOOL_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise ImportTooLargeError(f"File size exceeds {settings.IMPORT_MAX_SIZE_MB}MB")
+            out.write(chunk)
+    return size
+
+
+class _CountingLines:
+    """Linhas decodificadas do arquivo, contando os bytes consumidos (progresso)"""
+
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for raw in self.f:
+            self.bytes_read += len(raw)
+            yield raw.decode("utf-8")
+
+
+def iter_row_chunks(
+    numbered_rows: Iterable[Tuple[int, Dict[str, Any]]],
+    chunk_size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """Agrupa as linhas normalizadas em lotes"""
+    chunk = []
+    for line_num, row in numbered_rows:
+        chunk.append(normalize_row(line_num, row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _open_rows(f: BinaryIO, fmt: str, total_bytes: int):
+    """Header, linhas numeradas e função de progresso do arquivo aberto"""
+    # Progresso: bytes lidos no CSV; linha atual sobre o total da planilha no XLSX
+    if fmt == "xlsx":
+        fieldnames, numbered_rows, total_rows = read_xlsx_rows(f)
+        return fieldnames, numbered_rows, lambda chunk: chunk[-1]["line"] * 100 / max(total_rows, 1)
+    lines = _CountingLines(f)
+    fieldnames, numbered_rows = read_csv_rows(lines)
+    return fieldnames, numbered_rows, lambda chunk: lines.bytes_read * 100 / total_bytes
+
+
+async def _update_job(job_id: str, **fields):
+    # Redis síncrono: fora do event loop
+    await run_in_threadpool(update_job, JOB_KIND, job_id, **fields)
+
+
+async def _run_import_job(job_id: str, path: str, fmt: str, filename: str, actor_id: str):
+    """Lê o arquivo em lotes: valida, calcula hashes e grava cada lote em sua própria transação"""
+    await _update_job(job_id, status="running", started_at=datetime.utcnow().isoformat())
+
+    db = SessionLocal()
+    processed = 0
+    success_count = 0
+    error_count = 0
+    errors: List[Dict[str, Any]] = []
+    reported = {"error": 0, "warning": 0}
+    try:
+        total_bytes = max(os.path.getsize(path), 1)
+        with open(path, "rb") as f:
+            fieldnames, numbered_rows, progress = await run_in_threadpool(_open_rows, f, fmt, total_bytes)
+
+            if not has_required_columns(fieldnames):
+                raise ValueError(f"Missing required columns. Required: {REQUIRED_COLUMNS}")
+
+            # O parsing de cada lote (csv/openpyxl) também roda no threadpool
+            chunks = iter_row_chunks(numbered_rows, settings.IMPORT_CHUNK_SIZE)
+            while True:
+                chunk = await run_in_threadpool(next, chunks, None)
+                if chunk is None:
+                    break
+                # Lotes anteriores já estão no banco: duplicatas entre lotes aparecem como "already exists"
+                valid_rows, chunk_errors, chunk_error_count = await run_in_threadpool(validate_rows, db, chunk)
+                await assign_password_hashes(valid_rows)
+                inserted, insert_errors = await run_in_threadpool(insert_students, db, valid_rows)
+
+                processed += len(chunk)
+                success_count += inserted
+                error_count += chunk_error_count + len(insert_errors)
+                chunk_errors.extend(insert_errors)
+                chunk_errors.sort(key=lambda error: error["line"])
+                for error in chunk_errors:
+                    # Avisos repetidos (turma inexistente) não escondem os erros
+                    kind = "warning" if error.get("warning") else "error"
+                    if reported[kind] < MAX_REPORTED_ERRORS:
+                        errors.append(error)
+                        reported[kind] += 1
+
+                # Reserva 100% para a conclusão
+                await _update_job(
+                    job_id,
+                    progress=min(int(progress(chunk)), 99),
+                    processed=processed,
+                    success_count=success_count,
+                    error_count=error_count,
+                    errors=errors
+                )
+
+        await log_audit(
+            db=db,
+            actor_id=actor_id,
+            action="import_students_job",
+            details={
+                "job_id": job_id,
+                "filename": filename,
+                "total_processed": processed,
+                "success_count": success_count,
+                "error_count": error_count
+            }
+        )
+
+        await _update_job(
+            job_id,
+            status="done",
+            progress=100,
+            message=f"Processed {success_count} students successfully, {error_count} errors",
+            finished_at=datetime.utcnow().isoformat()
+        )
+    except asyncio.CancelledError:
+        await _update_job(job_id, status="failed", error="Import cancelled", finished_at=datetime.utcnow().isoformat())
+        raise
+    except Exception as e:
+        # Lotes já confirmados permanecem; o estado informa até onde chegou
+        logger.exception("Import job %s failed", job_id)
+        db.rollback()
+        await _update_job(
+            job_id,
+            status="failed",
+            error=str(e),
+            finished_at=datetime.utcnow().isoformat()
+        )
+    finally:
+        db.close()
+        _running_jobs.pop(job_id, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+async def submit_import_job(file, actor_id: str) -> str:
+    """Grava o upload em disco, registra o job e inicia o processamento em background"""
+    fmt = roster_format(file.filename)
+    if fmt is None:
+        raise ValueError("File must be a CSV or XLSX file")
+
+    if len(_running_jobs) >= settings.IMPORT_JOB_MAX_PENDING:
+        raise ImportQueueFullError("Import queue is full")
+
+    path = os.path.join(_spool_dir(), f"{uuid.uuid4()}.{fmt}")
+    try:
+        size = await spool_upload(file, path)
+    except Exception:
+        os.remove(path)
+        raise
+
+    job_id = create_job(
+        JOB_KIND,
+        actor_id,
+        JOB_TTL_SECONDS,
+        filename=file.filename,
+        format=fmt,
+        size_bytes=size,
+        processed=0,
+        success_count=0,
+        error_count=0,
+        errors=[]
+    )
+    _running_jobs[job_id] = asyncio.create_task(_run_import_job(job_id, path, fmt, file.filename, actor_id))
+    return job_id
+
+
+def get_import_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Retorna o estado de um job de importação"""
+    return get_job(JOB_KIND, job_id)
+
+
+def cancel_import_jobs():
+    """Interrompe importações em andamento (shutdown); lotes já gravados permanecem"""
+    for job_id, task in list(_running_jobs.items()):
+        task.cancel()
+        update_job(
+            JOB_KIND,
+            job_id,
+            status="failed",
+            error="Import interrupted by server shutdown",
+            finished_at=datetime.utcnow().isoformat()
+        )
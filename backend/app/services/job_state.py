@@ -0,0 +1,52 @@
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any
+from app.db.redis_client import get_redis
+
+
+def _job_key(kind: str, job_id: str) -> str:
+    return f"job:{kind}:{job_id}"
+
+
+def create_job(kind: str, owner_id: str, ttl_seconds: int, **fields) -> str:
+    """Cria registro de job no Redis e retorna o job_id"""
+    job_id = str(uuid.uuid4())
+    now = datetime.utcnow().isoformat()
+
+    state = {
+        "job_id": job_id,
+        "owner_id": str(owner_id),
+        "status": "queued",
+        "progress": 0,
+        "created_at": now,
+        "updated_at": now,
+        **fields
+    }
+
+    redis_client = get_redis()
+    key = _job_key(kind, job_id)
+    redis_client.hset(key, mapping={k: json.dumps(v, default=str) for k, v in state.items()})
+    redis_client.expire(key, ttl_seconds)
+
+    return job_id
+
+
+def update_job(kind: str, job_id: str, **fields):
+    """Atualiza campos de um job existente"""
+    fields["updated_at"] = datetime.utcnow().isoformat()
+
+    redis_client = get_redis()
+    redis_client.hset(
+        _job_key(kind, job_id),
+        mapping={k: json.dumps(v, default=str) for k, v in fields.items()}
+    )
+
+
+def get_job(kind: str, job_id: str) -> Optional[Dict[str, Any]]:
+    """Retorna o estado de um job ou None se não existir/expirado"""
+    redis_client = get_redis()
+    raw = redis_client.hgetall(_job_key(kind, job_id))
+    if not raw:
+        return None
+    return {k: json.loads(v) for k, v in raw.items()}
@@ -0,0 +1,203 @@
+import io
+from datetime import datetime
+from typing import Optional, List, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, and_
+from sqlalchemy.orm import Session
+from app.models.attendance import Attendance
+from app.models.class_model import Class
+from app.models.session import Session as SessionModel
+from app.models.student import Student
+from app.models.user import User
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, PageBreak
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib import colors
+
+# Colunas de sessão por página no PDF (matriz larga é quebrada em blocos)
+PDF_SESSIONS_PER_PAGE = 15
+
+ID_COLUMNS = ["Matrícula", "Aluno"]
+TOTAL_COLUMNS = ["Presenças", "Faltas", "Frequência (%)"]
+
+
+def _load_matrix_frame(
+    db: Session,
+    class_id: Optional[str] = None,
+    course_id: Optional[str] = None,
+    subject_id: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+) -> pd.DataFrame:
+    """Busca as tuplas (aluno, sessão, presente) em uma única consulta"""
+    query = select(
+        Class.id.label("class_id"),
+        Class.name.label("class_name"),
+        Student.matricula.label("matricula"),
+        User.name.label("student_name"),
+        SessionModel.id.label("session_id"),
+        SessionModel.start_at.label("start_at"),
+        Attendance.id.isnot(None).label("present")
+    ).select_from(SessionModel).join(
+        Class, Class.id == SessionModel.class_id
+    ).join(
+        Student, Student.class_id == SessionModel.class_id
+    ).join(
+        User, User.id == Student.user_id
+    ).outerjoin(
+        Attendance,
+        and_(Attendance.session_id == SessionModel.id, Attendance.student_id == Student.user_id)
+    )
+
+    if class_id:
+        query = query.where(SessionModel.class_id == class_id)
+    if course_id:
+        query = query.where(Class.course_id == course_id)
+    if subject_id:
+        query = query.where(SessionModel.subject_id == subject_id)
+    if from_date:
+        query = query.where(SessionModel.start_at >= from_date)
+    if to_date:
+        query = query.where(SessionModel.start_at <= to_date)
+
+    return pd.read_sql(query, db.connection())
+
+
+def _session_labels(sessions: pd.Series) -> List[str]:
+    """Rótulos dia/hora das sessões; sessões no mesmo minuto recebem sufixo (2), (3)..."""
+    labels = []
+    seen = {}
+    for label in sessions.dt.strftime("%d/%m %H:%M"):
+        seen[label] = seen.get(label, 0) + 1
+        labels.append(f"{label} ({seen[label]})" if seen[label] > 1 else label)
+    return labels
+
+
+def _pivot_class(frame: pd.DataFrame) -> pd.DataFrame:
+    """Monta a matriz alunos x sessões (P/F) de uma turma"""
+    matrix = frame.pivot(
+        index=["matricula", "student_name"],
+        columns="session_id",
+        values="present"
+    )
+
+    # Ordenar colunas pela data da sessão e rotular com dia/hora
+    sessions = frame.drop_duplicates("session_id").set_index("session_id")["start_at"].sort_values()
+    matrix = matrix[sessions.index].fillna(False).astype(bool)
+
+    present_count = matrix.sum(axis=1)
+    total = matrix.shape[1]
+
+    marks = pd.DataFrame(
+        np.where(matrix.to_numpy(), "P", "F"),
+        index=matrix.index,
+        columns=_session_labels(sessions)
+    )
+    marks["Presenças"] = present_count.to_numpy()
+    marks["Faltas"] = total - marks["Presenças"]
+    marks["Frequência (%)"] = (marks["Presenças"] * 100 / total).round(1) if total else 0.0
+
+    marks = marks.sort_index(level="student_name")
+    marks.index = marks.index.set_names(ID_COLUMNS)
+    return marks.reset_index()
+
+
+def build_attendance_matrices(db: Session, **filters) -> List[Tuple[str, pd.DataFrame]]:
+    """Retorna uma matriz (diário de classe) por turma: [(nome_turma, DataFrame)]"""
+    frame = _load_matrix_frame(db, **filters)
+    if frame.empty:
+        return []
+
+    # Agrupa pelo id (nomes de turma podem se repetir); o nome é só o rótulo
+    frame = frame.sort_values(["class_name", "class_id"], kind="stable")
+    return [
+        (group["class_name"].iat[0], _pivot_class(group))
+        for _, group in frame.groupby("class_id", sort=False)
+    ]
+
+
+def render_matrix_csv(matrices: List[Tuple[str, pd.DataFrame]]) -> str:
+    """Renderiza as matrizes em CSV (um bloco por turma)"""
+    output = io.StringIO()
+    for index, (class_name, matrix) in enumerate(matrices):
+        if index:
+            output.write("\n")
+        output.write(f"Turma: {class_name}\n")
+        matrix.to_csv(output, index=False)
+    return output.getvalue()
+
+
+def render_matrix_xlsx(matrices: List[Tuple[str, pd.DataFrame]]) -> bytes:
+    """Renderiza as matrizes em XLSX (uma planilha por turma)"""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        if not matrices:
+            pd.DataFrame(columns=ID_COLUMNS).to_excel(writer, sheet_name="Diário", index=False)
+        used_names = set()
+        for class_name, matrix in matrices:
+            # Nomes de planilha: máximo 31 caracteres e únicos
+            sheet_name = class_name[:31]
+            suffix = 2
+            while sheet_name in used_names:
+                sheet_name = f"{class_name[:27]} ({suffix})"
+                suffix += 1
+            used_names.add(sheet_name)
+            matrix.to_excel(writer, sheet_name=sheet_name, index=False)
+    return output.getvalue()
+
+
+def render_matrix_pdf(matrices: List[Tuple[str, pd.DataFrame]]) -> bytes:
+    """Renderiza as matrizes em PDF (paisagem, sessões quebradas em blocos)"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4))
+    elements = []
+    styles = getSampleStyleSheet()
+
+    style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 7),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+    ])
+
+    if not matrices:
+        elements.append(Paragraph("Diário de Classe - sem sessões no período", styles['Title']))
+
+    for class_index, (class_name, matrix) in enumerate(matrices):
+        # Totais acompanham o aluno em todas as páginas; só as sessões são quebradas em blocos
+        session_columns = [c for c in matrix.columns if c not in ID_COLUMNS + TOTAL_COLUMNS]
+        for start in range(0, max(len(session_columns), 1), PDF_SESSIONS_PER_PAGE):
+            if class_index or start:
+                elements.append(PageBreak())
+            elements.append(Paragraph(f"Diário de Classe - {class_name}", styles['Title']))
+
+            columns = ID_COLUMNS + session_columns[start:start + PDF_SESSIONS_PER_PAGE] + TOTAL_COLUMNS
+            block = matrix[columns].astype(str)
+            data = [columns] + block.to_numpy().tolist()
+
+            table = Table(data, repeatRows=1)
+            table.setStyle(style)
+            elements.append(table)
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+MATRIX_RENDERERS = {
+    "csv": (render_matrix_csv, "text/csv", "csv"),
+    "xlsx": (
+        render_matrix_xlsx,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "xlsx"
+    ),
+    "pdf": (render_matrix_pdf, "application/pdf", "pdf"),
+}
+
+
+async def generate_matrix_report(db: Session, fmt: str, **filters):
+    """Gera o diário de classe (alunos x sessões) no formato pedido"""
+    renderer = MATRIX_RENDERERS[fmt][0]
+    return renderer(build_attendance_matrices(db, **filters))
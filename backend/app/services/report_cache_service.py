@@ -0,0 +1,81 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, Tuple
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.db.redis_client import get_redis, get_redis_binary
+
+
+logger = logging.getLogger(__name__)
+
+
+def _version_key(scope: str, scope_id: str) -> str:
+    return f"report_version:{scope}:{scope_id}"
+
+
+def bump_report_versions(session_id: Optional[str] = None, class_id: Optional[str] = None):
+    """Invalida relatórios afetados por escrita de presença ou encerramento de sessão"""
+    redis_client = get_redis()
+    pipe = redis_client.pipeline()
+    if session_id:
+        pipe.incr(_version_key("session", str(session_id)))
+    if class_id:
+        pipe.incr(_version_key("class", str(class_id)))
+    # Relatórios sem turma/sessão (ex.: por aluno ou período) dependem da versão global
+    pipe.incr(_version_key("global", "all"))
+    try:
+        pipe.execute()
+    except RedisError as e:
+        # Chamado após o commit: não transformar a escrita em erro; o cache expira pelo TTL
+        logger.warning("Could not bump report versions (session=%s, class=%s): %s", session_id, class_id, e)
+
+
+def _version_scope(filters: Dict[str, Any]) -> Tuple[str, str]:
+    """Escolhe o contador de versão mais específico para os filtros"""
+    if filters.get("session_id"):
+        return "session", str(filters["session_id"])
+    if filters.get("class_id"):
+        return "class", str(filters["class_id"])
+    return "global", "all"
+
+
+def _normalize_filters(filters: Dict[str, Any]) -> Dict[str, str]:
+    normalized = {}
+    for key, value in sorted(filters.items()):
+        if value is None:
+            continue
+        normalized[key] = value.isoformat() if isinstance(value, datetime) else str(value)
+    return normalized
+
+
+def build_cache_key(fmt: str, filters: Dict[str, Any]) -> str:
+    """Gera chave de cache a partir do formato, filtros e versão atual"""
+    scope, scope_id = _version_scope(filters)
+    version = get_redis().get(_version_key(scope, scope_id)) or "0"
+
+    raw = json.dumps([fmt, _normalize_filters(filters), scope, scope_id, version])
+    digest = hashlib.sha256(raw.encode()).hexdigest()
+    return f"report_cache:{fmt}:{digest}"
+
+
+def get_cached_report(cache_key: str) -> Optional[Tuple[bytes, str]]:
+    """Retorna (conteúdo, etag) do cache ou None"""
+    cached = get_redis_binary().hmget(cache_key, "content", "etag")
+    if cached[0] is None or cached[1] is None:
+        return None
+    return cached[0], cached[1].decode()
+
+
+def store_cached_report(cache_key: str, content: bytes) -> str:
+    """Armazena relatório no cache e retorna o ETag"""
+    etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+    redis_client = get_redis_binary()
+    pipe = redis_client.pipeline()
+    pipe.hset(cache_key, mapping={"content": content, "etag": etag})
+    pipe.expire(cache_key, settings.REPORT_CACHE_TTL_SECONDS)
+    pipe.execute()
+
+    return etag
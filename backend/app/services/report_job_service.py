@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Optional, Dict, Any
+from app.core.config import settings
+from app.db.base import ReadSessionLocal
+from app.services.job_state import create_job, update_job, get_job
+from app.services.report_service import (
+    RENDERERS,
+    generate_csv_report,
+    generate_xlsx_report,
+    generate_pdf_report,
+    generate_json_report
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND = "report"
+
+# Formato -> (gerador, media type, extensão)
+REPORT_FORMATS = {
+    fmt: (generator, RENDERERS[fmt].media_type, RENDERERS[fmt].extension)
+    for fmt, generator in (
+        ("csv", generate_csv_report),
+        ("xlsx", generate_xlsx_report),
+        ("pdf", generate_pdf_report),
+        ("json", generate_json_report),
+    )
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+_pending_jobs: set = set()
+
+
+class ReportQueueFullError(Exception):
+    """Fila de jobs de relatório atingiu o limite configurado"""
+
+
+def get_report_executor() -> ProcessPoolExecutor:
+    """Retorna o pool de processos de renderização (criado sob demanda)"""
+    global _executor
+    if _executor is None:
+        # spawn evita herdar conexões do banco/Redis do processo pai
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.REPORT_JOB_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_report_executor():
+    """Encerra o pool de processos (chamado no shutdown da aplicação)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _artifacts_dir() -> str:
+    os.makedirs(settings.REPORT_ARTIFACTS_DIR, exist_ok=True)
+    return settings.REPORT_ARTIFACTS_DIR
+
+
+def artifact_path(job_id: str, fmt: str) -> str:
+    """Caminho do artefato em disco para um job"""
+    extension = REPORT_FORMATS[fmt][2]
+    return os.path.join(_artifacts_dir(), f"{job_id}.{extension}")
+
+
+def purge_expired_artifacts():
+    """Remove artefatos mais antigos que o TTL configurado"""
+    cutoff = time.time() - settings.REPORT_ARTIFACT_TTL_MINUTES * 60
+    directory = _artifacts_dir()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            # Arquivo removido por outro processo
+            continue
+
+
+def _run_report_job(job_id: str, fmt: str, filters: Dict[str, Any]):
+    """Executa o job de relatório no processo worker"""
+    generator = REPORT_FORMATS[fmt][0]
+    update_job(JOB_KIND, job_id, status="running", started_at=datetime.utcnow().isoformat())
+
+    def on_progress(done: int, total: int):
+        # Reserva os últimos 10% para a gravação do artefato
+        update_job(JOB_KIND, job_id, progress=int(done * 90 / max(total, 1)))
+
+    db = ReadSessionLocal()
+    try:
+        content = asyncio.run(generator(db=db, on_progress=on_progress, **filters))
+        if isinstance(content, str):
+            content = content.encode()
+
+        # Gravar em arquivo temporário e renomear para evitar downloads parciais
+        path = artifact_path(job_id, fmt)
+        tmp_path = f"{path}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        expires_at = datetime.utcnow() + timedelta(minutes=settings.REPORT_ARTIFACT_TTL_MINUTES)
+        update_job(
+            JOB_KIND,
+            job_id,
+            status="done",
+            progress=100,
+            size_bytes=len(content),
+            finished_at=datetime.utcnow().isoformat(),
+            expires_at=expires_at.isoformat()
+        )
+    except Exception as e:
+        update_job(
+            JOB_KIND,
+            job_id,
+            status="failed",
+            error=str(e),
+            finished_at=datetime.utcnow().isoformat()
+        )
+    finally:
+        db.close()
+
+
+def _on_job_done(job_id: str, future: Future):
+    """Callback no processo pai quando o worker termina"""
+    _pending_jobs.discard(job_id)
+    exc = future.exception() if not future.cancelled() else None
+    if future.cancelled() or exc is not None:
+        # Worker morreu ou job cancelado antes de registrar o próprio estado
+        logger.error("Report job %s aborted: %s", job_id, exc)
+        update_job(JOB_KIND, job_id, status="failed", error=str(exc or "Job cancelled"))
+
+
+def submit_report_job(owner_id: str, fmt: str, filters: Dict[str, Any]) -> str:
+    """Enfileira um job de relatório e retorna o job_id"""
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unsupported report format: {fmt}")
+
+    if len(_pending_jobs) >= settings.REPORT_JOB_MAX_PENDING:
+        raise ReportQueueFullError("Report queue is full")
+
+    purge_expired_artifacts()
+
+    # O estado do job sobrevive um pouco mais que o artefato
+    ttl_seconds = settings.REPORT_ARTIFACT_TTL_MINUTES * 60 * 2
+    job_id = create_job(JOB_KIND, owner_id, ttl_seconds, format=fmt, filters=filters)
+
+    _pending_jobs.add(job_id)
+    future = get_report_executor().submit(_run_report_job, job_id, fmt, filters)
+    future.add_done_callback(partial(_on_job_done, job_id))
+
+    return job_id
+
+
+def get_report_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Retorna o estado de um job de relatório"""
+    return get_job(JOB_KIND, job_id)
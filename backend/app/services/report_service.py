@@ -1,11 +1,15 @@
 import csv
 import io
+import json
+import zipfile
+from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Callable, Dict, Iterable, Iterator, List, Sequence, Union
+from pydantic import BaseModel
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 from app.models.attendance import Attendance
 from app.models.session import Session as SessionModel
-from app.models.student import Student
 from app.models.user import User
 from openpyxl import Workbook
 from reportlab.lib.pagesizes import letter
@@ -13,181 +17,285 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 
+# Linhas por lote lidas do cursor do banco (e granularidade do progresso)
+STREAM_BATCH_SIZE = 1000
 
-async def generate_csv_report(
-    db: Session,
-    session_id: Optional[str] = None,
-    class_id: Optional[str] = None,
-    student_id: Optional[str] = None,
-    from_date: Optional[datetime] = None,
+REPORT_COLUMNS = ["ID", "Session ID", "Student ID", "Student Name", "Timestamp", "Method", "Device ID"]
+
+
+class ReportFilters(BaseModel):
+    """Filtros comuns a todos os formatos de relatório de presenças"""
+    session_id: Optional[str] = None
+    class_id: Optional[str] = None
+    student_id: Optional[str] = None
+    from_date: Optional[datetime] = None
     to_date: Optional[datetime] = None
-) -> str:
-    """Gera relatório CSV de presenças"""
-    query = db.query(Attendance)
-    
-    if session_id:
-        query = query.filter(Attendance.session_id == session_id)
-    if student_id:
-        query = query.filter(Attendance.student_id == student_id)
-    if from_date:
-        query = query.filter(Attendance.timestamp >= from_date)
-    if to_date:
-        query = query.filter(Attendance.timestamp <= to_date)
-    if class_id:
-        query = query.join(SessionModel).filter(SessionModel.class_id == class_id)
-    
-    attendances = query.all()
-    
-    # Criar CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Header
-    writer.writerow(["ID", "Session ID", "Student ID", "Student Name", "Timestamp", "Method", "Device ID"])
-    
-    # Dados
-    for att in attendances:
-        user = db.query(User).filter(User.id == att.student_id).first()
-        student_name = user.name if user else "Unknown"
-        
-        writer.writerow([
-            str(att.id),
-            str(att.session_id),
-            str(att.student_id),
-            student_name,
-            att.timestamp.isoformat(),
-            att.method.value,
-            att.device_id or ""
-        ])
-    
-    return output.getvalue()
 
 
-async def generate_xlsx_report(
+def report_rows_query(filters: ReportFilters):
+    """Consulta única de presenças com o nome do aluno (sem N+1)"""
+    query = select(
+        Attendance.id,
+        Attendance.session_id,
+        Attendance.student_id,
+        User.name,
+        Attendance.timestamp,
+        Attendance.method,
+        Attendance.device_id,
+        Attendance.geo_lat,
+        Attendance.geo_lon
+    ).outerjoin(User, User.id == Attendance.student_id)
+
+    if filters.session_id:
+        query = query.where(Attendance.session_id == filters.session_id)
+    if filters.student_id:
+        query = query.where(Attendance.student_id == filters.student_id)
+    if filters.from_date:
+        query = query.where(Attendance.timestamp >= filters.from_date)
+    if filters.to_date:
+        query = query.where(Attendance.timestamp <= filters.to_date)
+    if filters.class_id:
+        query = query.join(SessionModel, SessionModel.id == Attendance.session_id).where(
+            SessionModel.class_id == filters.class_id
+        )
+
+    return query
+
+
+def iter_report_rows(
     db: Session,
-    session_id: Optional[str] = None,
-    class_id: Optional[str] = None,
-    student_id: Optional[str] = None,
-    from_date: Optional[datetime] = None,
-    to_date: Optional[datetime] = None
-) -> bytes:
-    """Gera relatório XLSX de presenças"""
-    query = db.query(Attendance)
-    
-    if session_id:
-        query = query.filter(Attendance.session_id == session_id)
-    if student_id:
-        query = query.filter(Attendance.student_id == student_id)
-    if from_date:
-        query = query.filter(Attendance.timestamp >= from_date)
-    if to_date:
-        query = query.filter(Attendance.timestamp <= to_date)
-    if class_id:
-        query = query.join(SessionModel).filter(SessionModel.class_id == class_id)
-    
-    attendances = query.all()
-    
-    # Criar workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Attendance Report"
-    
-    # Header
-    ws.append(["ID", "Session ID", "Student ID", "Student Name", "Timestamp", "Method", "Device ID"])
-    
-    # Dados
-    for att in attendances:
-        student = db.query(Student).join(User).filter(Student.user_id == att.student_id).first()
-        if student:
-            user = db.query(User).filter(User.id == att.student_id).first()
-            student_name = user.name if user else "Unknown"
-        else:
-            student_name = "Unknown"
-        
-        ws.append([
-            str(att.id),
-            str(att.session_id),
-            str(att.student_id),
-            student_name,
-            att.timestamp.isoformat(),
-            att.method.value,
-            att.device_id or ""
+    filters: ReportFilters,
+    batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[Sequence]:
+    """Lê as linhas do relatório em lotes via cursor no servidor"""
+    result = db.execute(report_rows_query(filters), execution_options={"yield_per": batch_size})
+    for partition in result.partitions():
+        yield partition
+
+
+def count_report_rows(db: Session, filters: ReportFilters) -> int:
+    """Total de linhas do relatório (usado apenas para progresso de jobs)"""
+    return db.execute(
+        select(func.count()).select_from(report_rows_query(filters).subquery())
+    ).scalar()
+
+
+class ReportRenderer(ABC):
+    """Renderizador plugável: recebe lotes de linhas e produz o arquivo no final"""
+    media_type = "application/octet-stream"
+    extension = "bin"
+
+    @abstractmethod
+    def write_rows(self, rows: Sequence):
+        """Acrescenta um lote de linhas"""
+
+    @abstractmethod
+    def finish(self) -> Union[str, bytes]:
+        """Conteúdo final do arquivo"""
+
+
+class CsvRenderer(ReportRenderer):
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self):
+        self.output = io.StringIO()
+        self.writer = csv.writer(self.output)
+        self.writer.writerow(REPORT_COLUMNS)
+
+    def write_rows(self, rows: Sequence):
+        self.writer.writerows(
+            [
+                str(row.id),
+                str(row.session_id),
+                str(row.student_id),
+                row.name or "Unknown",
+                row.timestamp.isoformat(),
+                row.method.value,
+                row.device_id or ""
+            ]
+            for row in rows
+        )
+
+    def finish(self) -> str:
+        return self.output.getvalue()
+
+
+class XlsxRenderer(ReportRenderer):
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    extension = "xlsx"
+
+    def __init__(self):
+        # write_only: linhas são serializadas direto, sem manter células em memória
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Attendance Report")
+        self.sheet.append(REPORT_COLUMNS)
+
+    def write_rows(self, rows: Sequence):
+        for row in rows:
+            self.sheet.append([
+                str(row.id),
+                str(row.session_id),
+                str(row.student_id),
+                row.name or "Unknown",
+                row.timestamp.isoformat(),
+                row.method.value,
+                row.device_id or ""
+            ])
+
+    def finish(self) -> bytes:
+        output = io.BytesIO()
+        self.workbook.save(output)
+        return output.getvalue()
+
+
+class PdfRenderer(ReportRenderer):
+    media_type = "application/pdf"
+    extension = "pdf"
+
+    def __init__(self):
+        self.data = [["ID", "Session ID", "Student Name", "Timestamp", "Method"]]
+
+    def write_rows(self, rows: Sequence):
+        self.data.extend(
+            [
+                str(row.id)[:8],
+                str(row.session_id)[:8],
+                row.name or "Unknown",
+                row.timestamp.strftime("%Y-%m-%d %H:%M"),
+                row.method.value
+            ]
+            for row in rows
+        )
+
+    def finish(self) -> bytes:
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        styles = getSampleStyleSheet()
+
+        table = Table(self.data)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+
+        doc.build([
+            Paragraph("Attendance Report", styles['Title']),
+            Paragraph("<br/>", styles['Normal']),
+            table
         ])
-    
-    # Salvar em bytes
-    output = io.BytesIO()
-    wb.save(output)
-    return output.getvalue()
+        return buffer.getvalue()
+
+
+class JsonRenderer(ReportRenderer):
+    media_type = "application/json"
+    extension = "json"
+
+    def __init__(self):
+        self.output = io.StringIO()
+        self.output.write("[")
+        self.empty = True
+
+    def write_rows(self, rows: Sequence):
+        for row in rows:
+            if not self.empty:
+                self.output.write(",")
+            self.empty = False
+            json.dump({
+                "id": str(row.id),
+                "session_id": str(row.session_id),
+                "student_id": str(row.student_id),
+                "student_name": row.name,
+                "timestamp": row.timestamp.isoformat(),
+                "method": row.method.value,
+                "device_id": row.device_id
+            }, self.output)
 
+    def finish(self) -> str:
+        self.output.write("]")
+        return self.output.getvalue()
 
-async def generate_pdf_report(
+
+# Formato -> classe do renderizador
+RENDERERS = {
+    "csv": CsvRenderer,
+    "xlsx": XlsxRenderer,
+    "pdf": PdfRenderer,
+    "json": JsonRenderer,
+}
+
+
+def render_reports(
     db: Session,
-    session_id: Optional[str] = None,
-    class_id: Optional[str] = None,
-    student_id: Optional[str] = None,
-    from_date: Optional[datetime] = None,
-    to_date: Optional[datetime] = None
-) -> bytes:
-    """Gera relatório PDF de presenças"""
-    query = db.query(Attendance)
-    
-    if session_id:
-        query = query.filter(Attendance.session_id == session_id)
-    if student_id:
-        query = query.filter(Attendance.student_id == student_id)
-    if from_date:
-        query = query.filter(Attendance.timestamp >= from_date)
-    if to_date:
-        query = query.filter(Attendance.timestamp <= to_date)
-    if class_id:
-        query = query.join(SessionModel).filter(SessionModel.class_id == class_id)
-    
-    attendances = query.all()
-    
-    # Criar PDF
+    formats: Iterable[str],
+    filters: ReportFilters,
+    on_progress: Optional[Callable[[int, int], None]] = None
+) -> Dict[str, Union[str, bytes]]:
+    """Renderiza vários formatos em uma única passada pelos dados"""
+    renderers = {fmt: RENDERERS[fmt]() for fmt in formats}
+    total = count_report_rows(db, filters) if on_progress else 0
+
+    done = 0
+    for rows in iter_report_rows(db, filters):
+        for renderer in renderers.values():
+            renderer.write_rows(rows)
+        done += len(rows)
+        if on_progress:
+            on_progress(done, total)
+
+    return {fmt: renderer.finish() for fmt, renderer in renderers.items()}
+
+
+def build_report_bundle(contents: Dict[str, Union[str, bytes]], basename: str = "attendance_report") -> bytes:
+    """Empacota os arquivos renderizados em um ZIP"""
     buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Título
-    title = Paragraph("Attendance Report", styles['Title'])
-    elements.append(title)
-    elements.append(Paragraph("<br/>", styles['Normal']))
-    
-    # Tabela
-    data = [["ID", "Session ID", "Student Name", "Timestamp", "Method"]]
-    
-    for att in attendances:
-        student = db.query(Student).join(User).filter(Student.user_id == att.student_id).first()
-        if student:
-            user = db.query(User).filter(User.id == att.student_id).first()
-            student_name = user.name if user else "Unknown"
-        else:
-            student_name = "Unknown"
-        
-        data.append([
-            str(att.id)[:8],
-            str(att.session_id)[:8],
-            student_name,
-            att.timestamp.strftime("%Y-%m-%d %H:%M"),
-            att.method.value
-        ])
-    
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    elements.append(table)
-    
-    doc.build(elements)
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for fmt, content in contents.items():
+            bundle.writestr(f"{basename}.{RENDERERS[fmt].extension}", content)
     return buffer.getvalue()
 
+
+async def generate_report(
+    db: Session,
+    fmt: str,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    **filters
+) -> Union[str, bytes]:
+    """Gera o relatório de presenças em um formato"""
+    return render_reports(db, [fmt], ReportFilters(**filters), on_progress)[fmt]
+
+
+async def generate_csv_report(db: Session, on_progress: Optional[Callable[[int, int], None]] = None, **filters) -> str:
+    """Gera relatório CSV de presenças"""
+    return await generate_report(db, "csv", on_progress, **filters)
+
+
+async def generate_xlsx_report(db: Session, on_progress: Optional[Callable[[int, int], None]] = None, **filters) -> bytes:
+    """Gera relatório XLSX de presenças"""
+    return await generate_report(db, "xlsx", on_progress, **filters)
+
+
+async def generate_pdf_report(db: Session, on_progress: Optional[Callable[[int, int], None]] = None, **filters) -> bytes:
+    """Gera relatório PDF de presenças"""
+    return await generate_report(db, "pdf", on_progress, **filters)
+
+
+async def generate_json_report(db: Session, on_progress: Optional[Callable[[int, int], None]] = None, **filters) -> str:
+    """Gera relatório JSON de presenças"""
+    return await generate_report(db, "json", on_progress, **filters)
+
+
+async def generate_report_bundle(
+    db: Session,
+    formats: List[str],
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    **filters
+) -> bytes:
+    """Gera vários formatos com uma única consulta e retorna um ZIP"""
+    return build_report_bundle(render_reports(db, formats, ReportFilters(**filters), on_progress))
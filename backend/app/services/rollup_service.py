@@ -0,0 +1,153 @@
+from datetime import datetime, date
+from typing import Optional, List
+from sqlalchemy import select, insert, delete, func, and_, or_, exists, literal, cast, Date, DateTime, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.models.attendance import Attendance
+from app.models.attendance_rollup import AttendanceRollup
+from app.models.session import Session as SessionModel, SessionStatus
+from app.models.student import Student
+
+# Semântica dos contadores:
+# - check-in: sessions_held += 1 e sessions_attended += 1 (presença já conta a sessão)
+# - encerramento: sessions_held += 1 apenas para alunos da turma sem presença
+# Assim sessions_attended <= sessions_held mesmo com sessões ainda abertas.
+
+
+def month_start(value: datetime) -> date:
+    """Primeiro dia do mês de uma data"""
+    return date(value.year, value.month, 1)
+
+
+def _rollup_conflict_key():
+    return [
+        AttendanceRollup.student_id,
+        AttendanceRollup.class_id,
+        AttendanceRollup.subject_id,
+        AttendanceRollup.month,
+    ]
+
+
+def record_attendance_rollup(db: Session, session: SessionModel, student_id):
+    """Incrementa o rollup do aluno para uma presença registrada (sem commit)"""
+    stmt = pg_insert(AttendanceRollup).values(
+        id=func.gen_random_uuid(),
+        student_id=student_id,
+        class_id=session.class_id,
+        subject_id=session.subject_id,
+        month=month_start(session.start_at),
+        sessions_held=1,
+        sessions_attended=1,
+        updated_at=datetime.utcnow()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_rollup_conflict_key(),
+        set_={
+            "sessions_held": AttendanceRollup.sessions_held + 1,
+            "sessions_attended": AttendanceRollup.sessions_attended + 1,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    )
+    db.execute(stmt)
+
+
+def record_session_closed_rollup(db: Session, session: SessionModel):
+    """Conta a sessão encerrada para os alunos da turma que faltaram (sem commit)"""
+    absent_students = select(
+        func.gen_random_uuid(),
+        Student.user_id,
+        cast(literal(str(session.class_id)), UUID(as_uuid=True)),
+        cast(literal(str(session.subject_id) if session.subject_id else None), UUID(as_uuid=True)),
+        cast(literal(month_start(session.start_at)), Date),
+        cast(literal(1), Integer),
+        cast(literal(0), Integer),
+        cast(literal(datetime.utcnow()), DateTime)
+    ).where(
+        Student.class_id == session.class_id,
+        ~exists().where(
+            Attendance.session_id == session.id,
+            Attendance.student_id == Student.user_id
+        )
+    )
+
+    stmt = pg_insert(AttendanceRollup).from_select(
+        [
+            "id", "student_id", "class_id", "subject_id", "month",
+            "sessions_held", "sessions_attended", "updated_at"
+        ],
+        absent_students
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_rollup_conflict_key(),
+        set_={
+            "sessions_held": AttendanceRollup.sessions_held + 1,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    )
+    db.execute(stmt)
+
+
+def rebuild_attendance_rollups(db: Session, class_id: Optional[str] = None) -> int:
+    """Recalcula o rollup a partir de sessions/attendances (backfill)"""
+    delete_stmt = delete(AttendanceRollup)
+    if class_id:
+        delete_stmt = delete_stmt.where(AttendanceRollup.class_id == class_id)
+    db.execute(delete_stmt)
+
+    month = cast(func.date_trunc("month", SessionModel.start_at), Date)
+    # Sessão conta como realizada se foi encerrada ou se o aluno registrou presença
+    held = func.count().filter(
+        or_(SessionModel.status == SessionStatus.CLOSED, Attendance.id.isnot(None))
+    )
+
+    source = select(
+        func.gen_random_uuid(),
+        Student.user_id,
+        SessionModel.class_id,
+        SessionModel.subject_id,
+        month,
+        held,
+        func.count(Attendance.id),
+        cast(literal(datetime.utcnow()), DateTime)
+    ).select_from(SessionModel).join(
+        Student, Student.class_id == SessionModel.class_id
+    ).outerjoin(
+        Attendance,
+        and_(Attendance.session_id == SessionModel.id, Attendance.student_id == Student.user_id)
+    ).group_by(
+        Student.user_id, SessionModel.class_id, SessionModel.subject_id, month
+    ).having(held > 0)
+
+    if class_id:
+        source = source.where(SessionModel.class_id == class_id)
+
+    result = db.execute(
+        insert(AttendanceRollup).from_select(
+            [
+                "id", "student_id", "class_id", "subject_id", "month",
+                "sessions_held", "sessions_attended", "updated_at"
+            ],
+            source
+        )
+    )
+    db.commit()
+
+    return result.rowcount
+
+
+def rollup_aggregates():
+    """Colunas agregadas (realizadas, presenças, percentual) sobre o rollup"""
+    held = func.coalesce(func.sum(AttendanceRollup.sessions_held), 0)
+    attended = func.coalesce(func.sum(AttendanceRollup.sessions_attended), 0)
+    percentage = func.round(cast(attended, Numeric) * 100 / func.nullif(held, 0), 2)
+    return held.label("sessions_held"), attended.label("sessions_attended"), percentage.label("attendance_percentage")
+
+
+def rollup_month_filters(month: Optional[int] = None, year: Optional[int] = None) -> List:
+    """Condições de período sobre a coluna month do rollup"""
+    if month and year:
+        return [AttendanceRollup.month == date(year, month, 1)]
+    if year:
+        return [AttendanceRollup.month >= date(year, 1, 1), AttendanceRollup.month < date(year + 1, 1, 1)]
+    return []
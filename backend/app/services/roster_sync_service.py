@@ -0,0 +1,184 @@
+from typing import List, Dict, Any
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.student import Student
+from app.services.csv_upload_service import (
+    LOOKUP_CHUNK_SIZE,
+    required_field_error,
+    existing_values,
+    load_class_ids,
+    assign_password_hashes,
+    insert_students
+)
+from app.services.at_risk_service import move_student_between_classes
+
+# Sincronização de cadastro: o arquivo é a lista completa de alunos, identificados pela matrícula.
+# Células vazias de curso/turma mantêm o valor atual; o email de alunos existentes não é alterado.
+
+
+def load_current_roster(db: Session) -> Dict[str, Any]:
+    """Estado atual por matrícula em uma consulta: ids, nome, curso, turma e situação"""
+    query = db.query(
+        Student.id,
+        Student.user_id,
+        Student.matricula,
+        Student.curso,
+        Student.class_id,
+        User.name,
+        User.is_active
+    ).join(User, User.id == Student.user_id)
+    return {row.matricula: row for row in query.yield_per(LOOKUP_CHUNK_SIZE)}
+
+
+def plan_roster_sync(db: Session, rows: List[Dict[str, Any]], deactivate_missing: bool = False) -> Dict[str, Any]:
+    """Compara o arquivo com o banco e calcula inserções, atualizações e desativações"""
+    current = load_current_roster(db)
+    class_ids = load_class_ids(db, (row["class_name"] for row in rows if row["class_name"]))
+    taken_emails = existing_values(
+        db, User.email, {row["email"] for row in rows if row["email"] and row["matricula"] not in current}
+    )
+
+    plan = {
+        "inserts": [],
+        "user_updates": [],
+        "student_updates": [],
+        "deactivate_user_ids": [],
+        "class_transfers": [],
+        "updated": 0,
+        "unchanged": 0,
+        "errors": [],
+        "error_count": 0
+    }
+    seen_emails: Dict[str, int] = {}
+    seen_matriculas: Dict[str, int] = {}
+    # Matrícula presente no arquivo nunca é desativada, mesmo com erro na linha
+    file_matriculas = {row["matricula"] for row in rows}
+
+    for row in rows:
+        error = required_field_error(row)
+        if error is None:
+            if row["email"] in seen_emails:
+                error = f"Duplicate email in file (line {seen_emails[row['email']]}): {row['email']}"
+            elif row["matricula"] in seen_matriculas:
+                error = f"Duplicate matrícula in file (line {seen_matriculas[row['matricula']]}): {row['matricula']}"
+            elif row["matricula"] not in current and row["email"] in taken_emails:
+                error = f"Email already exists: {row['email']}"
+
+        if error:
+            plan["errors"].append({"line": row["line"], "error": error, "data": row["data"]})
+            plan["error_count"] += 1
+            continue
+
+        seen_emails[row["email"]] = row["line"]
+        seen_matriculas[row["matricula"]] = row["line"]
+
+        class_id = None
+        if row["class_name"]:
+            class_id = class_ids.get(row["class_name"])
+            if class_id is None:
+                plan["errors"].append({
+                    "line": row["line"],
+                    "error": f"Class not found: {row['class_name']}",
+                    "data": row["data"],
+                    "warning": True  # Aviso, mas continua
+                })
+
+        existing = current.get(row["matricula"])
+        if existing is None:
+            row["class_id"] = class_id
+            plan["inserts"].append(row)
+            continue
+
+        user_changes = {}
+        if row["name"] != existing.name:
+            user_changes["name"] = row["name"]
+        if existing.is_active != "true":
+            user_changes["is_active"] = "true"
+
+        student_changes = {}
+        if row["curso"] and row["curso"] != existing.curso:
+            student_changes["curso"] = row["curso"]
+        if class_id is not None and class_id != existing.class_id:
+            student_changes["class_id"] = class_id
+            plan["class_transfers"].append((existing.user_id, existing.class_id, class_id))
+
+        if user_changes:
+            plan["user_updates"].append({"id": existing.user_id, **user_changes})
+        if student_changes:
+            plan["student_updates"].append({"id": existing.id, **student_changes})
+        if user_changes or student_changes:
+            plan["updated"] += 1
+        else:
+            plan["unchanged"] += 1
+
+    if deactivate_missing:
+        plan["deactivate_user_ids"] = [
+            record.user_id
+            for matricula, record in current.items()
+            if matricula not in file_matriculas and record.is_active == "true"
+        ]
+
+    return plan
+
+
+def apply_roster_changes(db: Session, plan: Dict[str, Any]):
+    """Aplica atualizações e desativações em uma transação, com statements em lote"""
+    # Bulk UPDATE por chave primária: um executemany por conjunto de colunas
+    if plan["user_updates"]:
+        db.execute(update(User), plan["user_updates"])
+    if plan["student_updates"]:
+        db.execute(update(Student), plan["student_updates"])
+
+    user_ids = plan["deactivate_user_ids"]
+    for start in range(0, len(user_ids), LOOKUP_CHUNK_SIZE):
+        db.execute(
+            update(User)
+            .where(User.id.in_(user_ids[start:start + LOOKUP_CHUNK_SIZE]))
+            .values(is_active="false"),
+            execution_options={"synchronize_session": False}
+        )
+
+    db.commit()
+
+
+async def sync_student_roster(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    deactivate_missing: bool = False,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """Sincroniza o cadastro com o arquivo; reimportar um arquivo sem mudanças não gera escritas"""
+    plan = plan_roster_sync(db, rows, deactivate_missing)
+    errors = plan["errors"]
+    error_count = plan["error_count"]
+
+    inserted = len(plan["inserts"])
+    if not dry_run:
+        apply_roster_changes(db, plan)
+        for user_id, old_class_id, new_class_id in plan["class_transfers"]:
+            move_student_between_classes(db, user_id, old_class_id, new_class_id)
+        await assign_password_hashes(plan["inserts"])
+        inserted, insert_errors = insert_students(db, plan["inserts"])
+        errors.extend(insert_errors)
+        error_count += len(insert_errors)
+
+    updated = plan["updated"]
+    deactivated = len(plan["deactivate_user_ids"])
+    errors.sort(key=lambda error: error["line"])
+
+    prefix = "Validation only: " if dry_run else ""
+    return {
+        "total_processed": len(rows),
+        "inserted": inserted,
+        "updated": updated,
+        "deactivated": deactivated,
+        "unchanged": plan["unchanged"],
+        "error_count": error_count,
+        "errors": errors,
+        "message": (
+            f"{prefix}{inserted} inserted, {updated} updated, "
+            f"{deactivated} deactivated, {plan['unchanged']} unchanged, {error_count} errors"
+        ),
+        "dry_run": dry_run
+    }
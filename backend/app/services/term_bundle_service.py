@@ -0,0 +1,130 @@
+import asyncio
+import multiprocessing
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional, Callable, Dict, List, Tuple, AsyncIterator, Union
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.base import ReadSessionLocal
+from app.models.class_model import Class
+from app.models.course import Course
+from app.services.report_service import RENDERERS, ReportFilters, render_reports
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_bundle_executor() -> ProcessPoolExecutor:
+    """Pool de processos para renderização por turma (criado sob demanda)"""
+    global _executor
+    if _executor is None:
+        # spawn evita herdar conexões do banco/Redis do processo pai
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.REPORT_BUNDLE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_bundle_executor():
+    """Encerra o pool de processos (chamado no shutdown da aplicação)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _safe_name(value: str) -> str:
+    """Nome seguro para caminho dentro do ZIP"""
+    return re.sub(r"[^\w\- ]+", "_", value).strip() or "sem_nome"
+
+
+def render_class_reports(
+    class_id: str,
+    formats: List[str],
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None
+) -> Dict[str, Union[str, bytes]]:
+    """Renderiza os relatórios de uma turma (executa no processo worker)"""
+    db = ReadSessionLocal()
+    try:
+        filters = ReportFilters(class_id=class_id, from_date=from_date, to_date=to_date)
+        return render_reports(db, formats, filters)
+    finally:
+        db.close()
+
+
+class _ZipStream:
+    """Destino não-seekable do ZipFile: acumula bytes até serem drenados"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def list_term_classes(db: Session, course_id: Optional[str] = None) -> List[Tuple[str, str, str]]:
+    """Turmas incluídas no pacote: [(class_id, nome_curso, nome_turma)]"""
+    query = db.query(Class.id, Course.name, Class.name).join(Course, Course.id == Class.course_id)
+    if course_id:
+        query = query.filter(Class.course_id == course_id)
+    return [(str(row[0]), row[1], row[2]) for row in query.order_by(Course.name, Class.name).all()]
+
+
+async def stream_term_bundle(
+    classes: List[Tuple[str, str, str]],
+    formats: List[str],
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    executor: Optional[ProcessPoolExecutor] = None,
+    render: Callable = render_class_reports
+) -> AsyncIterator[bytes]:
+    """Distribui as turmas no pool e emite o ZIP à medida que cada turma termina"""
+    executor = executor or get_bundle_executor()
+    loop = asyncio.get_running_loop()
+
+    futures = {}
+    for class_id, course_name, class_name in classes:
+        future = loop.run_in_executor(executor, render, class_id, formats, from_date, to_date)
+        futures[future] = f"{_safe_name(course_name)}/{_safe_name(class_name)}_{class_id[:8]}"
+
+    stream = _ZipStream()
+    errors = []
+    pending = set(futures)
+    try:
+        with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    prefix = futures[future]
+                    if future.exception() is not None:
+                        errors.append(f"{prefix}: {future.exception()}")
+                        continue
+                    for fmt, content in future.result().items():
+                        bundle.writestr(f"{prefix}.{RENDERERS[fmt].extension}", content)
+                yield stream.drain()
+
+            if errors:
+                bundle.writestr("ERROS.txt", "\n".join(errors))
+
+        yield stream.drain()
+    finally:
+        # Cliente desconectou: não renderizar o restante
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Script para carregar histórico de presenças (migração de outro sistema) via COPY
+
+Formato do CSV (header obrigatório, datas em ISO 8601):
+    matricula,session_start[,turma][,timestamp][,method][,notes][,device_id]
+
+Cada linha é associada à sessão da turma (coluna turma ou turma atual do aluno) cujo início
+está mais próximo de session_start, dentro da tolerância. Com --create-sessions, sessões
+inexistentes são criadas como encerradas.
+"""
+import csv
+import sys
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from redis.exceptions import RedisError
+from app.db.base import SessionLocal
+from app.services.attendance_backfill_service import backfill_attendance, BackfillFileError
+from app.services.rollup_service import rebuild_attendance_rollups
+from app.services.at_risk_service import rebuild_at_risk_sets
+from app.services.report_cache_service import bump_report_versions
+
+
+def refresh_derived_data(db, class_ids):
+    """Recalcula rollups, scores de risco e versões de cache das turmas afetadas"""
+    for class_id in class_ids:
+        rebuild_attendance_rollups(db, class_id=class_id)
+        try:
+            rebuild_at_risk_sets(db, class_id=class_id)
+            bump_report_versions(class_id=class_id)
+        except RedisError as e:
+            print(f"⚠️  Redis indisponível para a turma {class_id}: {e}")
+
+
+def backfill(
+    path: str,
+    tolerance_minutes: int = 30,
+    create_sessions: bool = False,
+    teacher_id: str = None,
+    update_existing: bool = False,
+    dry_run: bool = False
+):
+    """Carrega o arquivo e imprime contagens e throughput"""
+    db = SessionLocal()
+
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader([f.readline()]), [])
+            f.seek(0)
+            stats = backfill_attendance(
+                db,
+                f,
+                header,
+                tolerance_minutes=tolerance_minutes,
+                create_sessions=create_sessions,
+                teacher_id=teacher_id,
+                update_existing=update_existing,
+                dry_run=dry_run
+            )
+
+        mode = " (dry-run, nada gravado)" if dry_run else ""
+        print(f"✅ Carga concluída{mode}")
+        print(f"   Linhas no arquivo:    {stats['staged']}")
+        print(f"   Sessões criadas:      {stats['sessions_created']}")
+        print(f"   Linhas resolvidas:    {stats['resolved']}")
+        print(f"   Presenças gravadas:   {stats['inserted']}")
+        for reason, count in sorted(stats["unresolved"]["counts"].items()):
+            print(f"   Não carregadas ({reason}): {count}")
+        for row in stats["unresolved"]["sample"]:
+            print(f"     linha {row['line']}: matrícula {row['matricula']!r} - {row['reason']}")
+        print(
+            f"   COPY: {stats['copy_seconds']:.2f}s | merge: {stats['merge_seconds']:.2f}s | "
+            f"total: {stats['total_seconds']:.2f}s ({stats['rows_per_second']:,.0f} linhas/s)"
+        )
+
+        if not dry_run and stats["class_ids"]:
+            refresh_derived_data(db, stats["class_ids"])
+            print(f"   Rollups atualizados para {len(stats['class_ids'])} turmas")
+
+        return stats
+
+    except (BackfillFileError, OSError) as e:
+        print(f"❌ Arquivo inválido: {e}")
+        return None
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro na carga: {e}")
+        return None
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Carregar histórico de presenças via COPY')
+    parser.add_argument('path', help='Arquivo CSV com o histórico')
+    parser.add_argument('--tolerance-minutes', type=int, default=30,
+                        help='Diferença máxima entre session_start e o início da sessão')
+    parser.add_argument('--create-sessions', action='store_true',
+                        help='Criar sessões encerradas quando não houver correspondente')
+    parser.add_argument('--teacher-id', help='Professor (user id) das sessões criadas')
+    parser.add_argument('--update-existing', action='store_true',
+                        help='Atualizar presenças já existentes em vez de ignorá-las')
+    parser.add_argument('--dry-run', action='store_true', help='Executa tudo e desfaz no final')
+
+    args = parser.parse_args()
+
+    result = backfill(
+        args.path,
+        tolerance_minutes=args.tolerance_minutes,
+        create_sessions=args.create_sessions,
+        teacher_id=args.teacher_id,
+        update_existing=args.update_existing,
+        dry_run=args.dry_run
+    )
+    sys.exit(0 if result is not None else 1)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark de compressão de respostas: identity x gzip x zstd (tamanho e latência)
+
+Usa os mesmos compressores incrementais do CompressionMiddleware sobre um CSV de
+presenças e um JSON de relatório de turma sintéticos, enviados em chunks.
+"""
+import gzip
+import json
+import random
+import sys
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.middleware import compression
+from app.models.attendance import AttendanceMethod
+from app.services.report_service import CsvRenderer
+
+CHUNK_SIZE = 64 * 1024
+
+Row = namedtuple("Row", "id session_id student_id name timestamp method device_id geo_lat geo_lon")
+
+
+def synthetic_csv(rows: int) -> bytes:
+    """CSV no layout do relatório de presenças"""
+    random.seed(42)
+    students = [(uuid.uuid4(), f"Aluno {i}") for i in range(2000)]
+    sessions = [uuid.uuid4() for _ in range(max(rows // 40, 1))]
+    start = datetime(2026, 2, 1, 7, 30)
+
+    renderer = CsvRenderer()
+    renderer.write_rows([
+        Row(
+            uuid.uuid4(), random.choice(sessions), student_id, name,
+            start + timedelta(seconds=random.randint(0, 180 * 86400)),
+            AttendanceMethod.QRCODE, f"device-{random.randint(1, 5000)}", None, None
+        )
+        for student_id, name in (random.choice(students) for _ in range(rows))
+    ])
+    return renderer.finish().encode()
+
+
+def synthetic_class_report(students: int, attendances: int) -> bytes:
+    """JSON no formato de get_class_report com include_attendances"""
+    random.seed(7)
+    report = {
+        "class_id": str(uuid.uuid4()),
+        "class_name": "Turma A",
+        "total_sessions": 180,
+        "total_students": students,
+        "students": [
+            {
+                "student_id": str(uuid.uuid4()),
+                "user_id": str(uuid.uuid4()),
+                "matricula": f"2026{i:06d}",
+                "name": f"Aluno {i}",
+                "present_count": random.randint(100, 180),
+                "sessions_held": 180,
+                "attendance_percentage": round(random.uniform(50, 100), 2)
+            }
+            for i in range(students)
+        ],
+        "attendances": [
+            {
+                "student_id": str(uuid.uuid4()),
+                "session_id": str(uuid.uuid4()),
+                "timestamp": datetime(2026, 3, 1, 8, random.randint(0, 59)).isoformat(),
+                "method": "qrcode"
+            }
+            for _ in range(attendances)
+        ]
+    }
+    return json.dumps(report).encode()
+
+
+def measure(payload: bytes, build_compressor):
+    """Comprime em chunks; retorna (tamanho, tempo total, tempo até o 1º byte)"""
+    started = time.perf_counter()
+    first_byte = None
+    size = 0
+    compressor = build_compressor() if build_compressor else None
+
+    for offset in range(0, len(payload), CHUNK_SIZE):
+        chunk = payload[offset:offset + CHUNK_SIZE]
+        output = compressor.compress(chunk) if compressor else chunk
+        if output and first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(output)
+    if compressor:
+        size += len(compressor.finish())
+
+    return size, time.perf_counter() - started, first_byte or 0.0
+
+
+def run(csv_rows: int, mbps: float):
+    encodings = [
+        ("identity", None),
+        ("gzip-1", lambda: compression.GzipCompressor(1)),
+        ("gzip-6", lambda: compression.GzipCompressor(6)),
+        ("gzip-9", lambda: compression.GzipCompressor(9)),
+    ]
+    if compression.zstandard is not None:
+        encodings += [
+            ("zstd-3", lambda: compression.ZstdCompressor(3)),
+            ("zstd-10", lambda: compression.ZstdCompressor(10)),
+        ]
+    else:
+        print("(pacote zstandard não instalado: zstd ignorado)")
+
+    payloads = {
+        f"CSV {csv_rows} linhas": synthetic_csv(csv_rows),
+        "JSON relatório de turma": synthetic_class_report(students=60, attendances=50_000),
+    }
+
+    bytes_per_second = mbps * 1_000_000 / 8
+    for name, payload in payloads.items():
+        print(f"\n{name} ({len(payload) / (1024 * 1024):.2f} MB)")
+        print(f"{'codificação':<12}{'tamanho (MB)':>14}{'razão':>8}{'CPU (s)':>10}{'1º byte (ms)':>14}{'rede (s)':>10}")
+        for encoding, build in encodings:
+            size, seconds, first_byte = measure(payload, build)
+            # Estimativa de entrega: CPU e rede em pipeline, domina o mais lento
+            delivery = max(seconds, size / bytes_per_second)
+            print(
+                f"{encoding:<12}{size / (1024 * 1024):>14.2f}{len(payload) / size:>8.1f}"
+                f"{seconds:>10.2f}{first_byte * 1000:>14.1f}{delivery:>10.2f}"
+            )
+
+    # Sanidade: o gzip incremental é decodificável
+    sample = payloads[next(iter(payloads))][:CHUNK_SIZE * 3]
+    compressor = compression.GzipCompressor()
+    assert gzip.decompress(compressor.compress(sample) + compressor.finish()) == sample
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark de compressão de respostas')
+    parser.add_argument('--rows', type=int, default=200_000, help='Linhas do CSV sintético (default: 200000)')
+    parser.add_argument('--mbps', type=float, default=10.0, help='Banda da rede da escola em Mbit/s (default: 10)')
+
+    args = parser.parse_args()
+
+    run(args.rows, args.mbps)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark de exportação de presenças: CSV x Parquet x Arrow IPC (tamanho e tempo)
+
+Por padrão usa dados sintéticos; com --from-db usa a consulta real de exportação.
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.attendance import AttendanceMethod
+from app.services.columnar_export_service import EXPORT_BATCH_SIZE, write_parquet, write_arrow_ipc
+
+
+def synthetic_batches(total_rows: int, batch_size: int = EXPORT_BATCH_SIZE):
+    """Gera lotes sintéticos no mesmo formato da consulta de exportação"""
+    random.seed(42)
+    sessions = [uuid.uuid4() for _ in range(max(total_rows // 40, 1))]
+    students = [(uuid.uuid4(), f"Aluno {i}") for i in range(2000)]
+    start = datetime(2026, 2, 1, 7, 30)
+
+    produced = 0
+    while produced < total_rows:
+        size = min(batch_size, total_rows - produced)
+        batch = []
+        for _ in range(size):
+            student_id, name = random.choice(students)
+            batch.append((
+                uuid.uuid4(),
+                random.choice(sessions),
+                student_id,
+                name,
+                start + timedelta(seconds=random.randint(0, 180 * 86400)),
+                AttendanceMethod.QRCODE if random.random() < 0.9 else AttendanceMethod.MANUAL,
+                f"device-{random.randint(1, 5000)}",
+                -23.5 + random.random() / 100,
+                -46.6 + random.random() / 100
+            ))
+        produced += size
+        yield batch
+
+
+def write_csv(row_batches, path: str) -> int:
+    """Mesmo layout de colunas do relatório CSV existente"""
+    total = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Session ID", "Student ID", "Student Name", "Timestamp", "Method", "Device ID"])
+        for rows in row_batches:
+            for row in rows:
+                writer.writerow([
+                    str(row[0]), str(row[1]), str(row[2]), row[3],
+                    row[4].isoformat(), row[5].value, row[6] or ""
+                ])
+            total += len(rows)
+    return total
+
+
+def read_back(fmt: str, path: str) -> float:
+    """Tempo de leitura do arquivo exportado (lado do consumidor)"""
+    import pandas as pd
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    started = time.perf_counter()
+    if fmt == "csv":
+        pd.read_csv(path)
+    elif fmt == "parquet":
+        pq.read_table(path)
+    else:
+        feather.read_table(path)
+    return time.perf_counter() - started
+
+
+def run(rows: int, from_db: bool):
+    writers = {"csv": write_csv, "parquet": write_parquet, "arrow": write_arrow_ipc}
+
+    if from_db:
+        from app.db.base import SessionLocal
+        from app.services.columnar_export_service import iter_attendance_rows
+
+    print(f"{'formato':<10}{'linhas':>12}{'tamanho (MB)':>15}{'escrita (s)':>14}{'leitura (s)':>14}")
+    for fmt, writer in writers.items():
+        fd, path = tempfile.mkstemp(suffix=f".{fmt}")
+        os.close(fd)
+        db = None
+        try:
+            if from_db:
+                db = SessionLocal()
+                batches = iter_attendance_rows(db)
+            else:
+                batches = synthetic_batches(rows)
+
+            started = time.perf_counter()
+            written = writer(batches, path)
+            write_seconds = time.perf_counter() - started
+
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            read_seconds = read_back(fmt, path)
+            print(f"{fmt:<10}{written:>12}{size_mb:>15.2f}{write_seconds:>14.2f}{read_seconds:>14.2f}")
+        finally:
+            if db is not None:
+                db.close()
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark de formatos de exportação de presenças')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Linhas sintéticas (default: 1000000)')
+    parser.add_argument('--from-db', action='store_true', help='Exportar presenças reais do banco')
+
+    args = parser.parse_args()
+
+    run(args.rows, args.from_db)
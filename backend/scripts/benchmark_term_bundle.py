@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pacote de relatórios do período: escalabilidade com o nº de processos
+
+Por padrão usa turmas sintéticas (renderização CPU-bound sem banco);
+com --from-db usa as turmas e presenças reais do período informado.
+"""
+import asyncio
+import random
+import sys
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.attendance import AttendanceMethod
+from app.services.report_service import RENDERERS
+from app.services.term_bundle_service import render_class_reports, stream_term_bundle
+
+SyntheticRow = namedtuple(
+    "SyntheticRow",
+    "id session_id student_id name timestamp method device_id geo_lat geo_lon"
+)
+
+# Presenças por turma sintética (~40 alunos x 100 sessões)
+ROWS_PER_CLASS = 4000
+
+
+def render_synthetic_class(class_id: str, formats, from_date=None, to_date=None):
+    """Mesmo contrato de render_class_reports, com linhas geradas em memória"""
+    rng = random.Random(class_id)
+    students = [(uuid.uuid4(), f"Aluno {i}") for i in range(40)]
+    sessions = [uuid.uuid4() for _ in range(100)]
+    start = datetime(2026, 2, 1, 7, 30)
+
+    rows = [
+        SyntheticRow(
+            uuid.uuid4(), rng.choice(sessions), student_id, name,
+            start + timedelta(minutes=rng.randint(0, 180 * 24 * 60)),
+            AttendanceMethod.QRCODE, None, None, None
+        )
+        for student_id, name in (rng.choice(students) for _ in range(ROWS_PER_CLASS))
+    ]
+
+    renderers = {fmt: RENDERERS[fmt]() for fmt in formats}
+    for renderer in renderers.values():
+        renderer.write_rows(rows)
+    return {fmt: renderer.finish() for fmt, renderer in renderers.items()}
+
+
+async def build_bundle(classes, formats, workers: int, render, from_date, to_date) -> int:
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+    try:
+        size = 0
+        async for chunk in stream_term_bundle(classes, formats, from_date, to_date, executor=executor, render=render):
+            size += len(chunk)
+        return size
+    finally:
+        executor.shutdown()
+
+
+def run(worker_counts, class_count: int, formats, from_db: bool, from_date, to_date):
+    if from_db:
+        from app.db.base import SessionLocal
+        from app.services.term_bundle_service import list_term_classes
+
+        db = SessionLocal()
+        try:
+            classes = list_term_classes(db)
+        finally:
+            db.close()
+        render = render_class_reports
+    else:
+        classes = [(str(uuid.uuid4()), "Curso", f"Turma {i}") for i in range(class_count)]
+        render = render_synthetic_class
+
+    print(f"{len(classes)} turmas, formatos: {', '.join(formats)}")
+    print(f"{'processos':<12}{'tempo (s)':>12}{'speedup':>10}{'ZIP (MB)':>12}")
+    baseline = None
+    for workers in worker_counts:
+        started = time.perf_counter()
+        size = asyncio.run(build_bundle(classes, formats, workers, render, from_date, to_date))
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"{workers:<12}{elapsed:>12.2f}{baseline / elapsed:>10.2f}{size / (1024 * 1024):>12.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description='Benchmark do pacote de relatórios por turma')
+    parser.add_argument('--workers', default=None, help='Lista de processos (default: 1,2,4,...,nº de CPUs)')
+    parser.add_argument('--classes', type=int, default=24, help='Turmas sintéticas (default: 24)')
+    parser.add_argument('--formats', default='xlsx,pdf', help='Formatos (default: xlsx,pdf)')
+    parser.add_argument('--from-db', action='store_true', help='Usar turmas e presenças do banco')
+    parser.add_argument('--from-date', type=datetime.fromisoformat, default=None)
+    parser.add_argument('--to-date', type=datetime.fromisoformat, default=None)
+
+    args = parser.parse_args()
+
+    if args.workers:
+        counts = [int(value) for value in args.workers.split(",")]
+    else:
+        counts, value = [], 1
+        while value < (os.cpu_count() or 1):
+            counts.append(value)
+            value *= 2
+        counts.append(os.cpu_count() or 1)
+
+    run(counts, args.classes, args.formats.split(","), args.from_db, args.from_date, args.to_date)
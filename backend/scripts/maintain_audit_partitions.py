@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Script de manutenção das partições mensais de audit_logs (rodar diariamente via cron)
+
+Cria as partições dos próximos meses e arquiva as partições mais antigas que a retenção:
+exporta para NDJSON (gzip) ou Parquet em AUDIT_ARCHIVE_DIR e remove a partição.
+"""
+import sys
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.services.audit_partition_service import (
+    ARCHIVE_FORMATS,
+    ensure_audit_partitions,
+    archive_audit_partitions,
+    default_partition_rows
+)
+
+
+def maintain(
+    months_ahead: int = settings.AUDIT_PARTITION_MONTHS_AHEAD,
+    retention_months: int = settings.AUDIT_RETENTION_MONTHS,
+    archive_dir: str = settings.AUDIT_ARCHIVE_DIR,
+    fmt: str = "ndjson",
+    dry_run: bool = False
+):
+    """Cria partições à frente e arquiva as expiradas"""
+    db = SessionLocal()
+
+    try:
+        if not dry_run:
+            created = ensure_audit_partitions(db, months_ahead)
+            print(f"✅ Partições criadas: {', '.join(created) if created else 'nenhuma'}")
+
+        pending = default_partition_rows(db)
+        if pending:
+            print(f"⚠️  {pending} linhas na partição default (fora das partições mensais)")
+
+        archived = archive_audit_partitions(db, retention_months, archive_dir, fmt, dry_run=dry_run)
+        verb = "Seriam arquivadas" if dry_run else "Arquivadas"
+        print(f"✅ {verb} {len(archived)} partições (retenção: {retention_months} meses)")
+        for partition in archived:
+            print(f"   {partition['partition']}: {partition['rows']} linhas -> {partition['path']}")
+        return archived
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro na manutenção de audit_logs: {e}")
+        return None
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Manter partições mensais de audit_logs')
+    parser.add_argument('--months-ahead', type=int, default=settings.AUDIT_PARTITION_MONTHS_AHEAD,
+                        help='Meses à frente com partição criada')
+    parser.add_argument('--retention-months', type=int, default=settings.AUDIT_RETENTION_MONTHS,
+                        help='Meses mantidos no banco além do atual')
+    parser.add_argument('--archive-dir', default=settings.AUDIT_ARCHIVE_DIR, help='Destino dos arquivos')
+    parser.add_argument('--format', choices=sorted(ARCHIVE_FORMATS), default='ndjson',
+                        help='Formato do arquivo exportado')
+    parser.add_argument('--dry-run', action='store_true', help='Apenas lista o que seria arquivado')
+
+    args = parser.parse_args()
+
+    result = maintain(
+        months_ahead=args.months_ahead,
+        retention_months=args.retention_months,
+        archive_dir=args.archive_dir,
+        fmt=args.format,
+        dry_run=args.dry_run
+    )
+    sys.exit(0 if result is not None else 1)
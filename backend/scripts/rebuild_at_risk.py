@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir os sorted sets de alunos em risco (Redis) a partir do rollup
+"""
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.base import SessionLocal
+from app.services.at_risk_service import rebuild_at_risk_sets
+
+
+def rebuild(class_id: str = None):
+    """Reconstrói os scores de frequência (todas as turmas/cursos ou apenas uma turma)"""
+    db = SessionLocal()
+    
+    try:
+        started = time.perf_counter()
+        members = rebuild_at_risk_sets(db, class_id=class_id)
+        elapsed = time.perf_counter() - started
+        
+        scope = f"turma {class_id}" if class_id else "todas as turmas e cursos"
+        print(f"✅ Scores reconstruídos para {scope}: {members} membros em {elapsed:.2f}s")
+        return members
+        
+    except Exception as e:
+        print(f"❌ Erro ao reconstruir scores: {e}")
+        return None
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Reconstruir sorted sets de alunos em risco')
+    parser.add_argument('--class-id', help='Reconstruir apenas esta turma')
+    
+    args = parser.parse_args()
+    
+    rebuild(args.class_id)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Script para reconstruir a tabela attendance_rollups a partir de sessions/attendances
+"""
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.base import SessionLocal
+from app.services.rollup_service import rebuild_attendance_rollups
+
+
+def rebuild(class_id: str = None):
+    """Reconstrói o rollup (todas as turmas ou apenas uma)"""
+    db = SessionLocal()
+    
+    try:
+        started = time.perf_counter()
+        rows = rebuild_attendance_rollups(db, class_id=class_id)
+        elapsed = time.perf_counter() - started
+        
+        scope = f"turma {class_id}" if class_id else "todas as turmas"
+        print(f"✅ Rollup reconstruído para {scope}: {rows} linhas em {elapsed:.2f}s")
+        return rows
+        
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erro ao reconstruir rollup: {e}")
+        return None
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Reconstruir rollup mensal de frequência')
+    parser.add_argument('--class-id', help='Reconstruir apenas esta turma')
+    
+    args = parser.parse_args()
+    
+    rebuild(args.class_id)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Verifica o roteamento primário/réplica e a aderência read-your-writes
+
+Requer DATABASE_REPLICA_URL apontando para outro banco (ver docker-compose.replica.yml)
+e Redis disponível.
+"""
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Adicionar o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import Column, Integer, MetaData, Table, insert, text
+from app.core.config import settings
+from app.db.base import SessionLocal, replica_enabled
+from app.api.v1.dependencies import get_read_db
+
+
+class FakeUser:
+    def __init__(self):
+        self.id = uuid.uuid4()
+
+
+def routed_database(user) -> str:
+    """Banco usado por get_read_db para o usuário"""
+    primary = SessionLocal()
+    dependency = get_read_db(current_user=user, db=primary)
+    try:
+        db = next(dependency)
+        return db.execute(text("SELECT current_database()")).scalar()
+    finally:
+        dependency.close()
+        primary.close()
+
+
+def write_as(user):
+    """Escrita no primário atribuída ao usuário (tabela temporária)"""
+    probe = Table("replica_probe", MetaData(), Column("x", Integer), prefixes=["TEMPORARY"])
+    db = SessionLocal()
+    try:
+        db.info["user_id"] = user.id
+        probe.create(db.connection())
+        db.execute(insert(probe).values(x=1))
+        db.commit()
+    finally:
+        db.close()
+
+
+def check(description: str, ok: bool) -> bool:
+    print(f"{'✅' if ok else '❌'} {description}")
+    return ok
+
+
+def verify() -> bool:
+    if not replica_enabled():
+        print("❌ DATABASE_REPLICA_URL não configurada")
+        return False
+
+    db = SessionLocal()
+    try:
+        primary_db = db.execute(text("SELECT current_database()")).scalar()
+    finally:
+        db.close()
+
+    user = FakeUser()
+    results = []
+
+    first = routed_database(user)
+    results.append(check(f"Leitura sem escrita recente vai para a réplica ({first})", first != primary_db))
+
+    write_as(user)
+    after_write = routed_database(user)
+    results.append(check(f"Leitura logo após escrita vai para o primário ({after_write})", after_write == primary_db))
+
+    other = routed_database(FakeUser())
+    results.append(check(f"Outros usuários continuam na réplica ({other})", other != primary_db))
+
+    time.sleep(settings.REPLICA_STICKY_SECONDS + 1)
+    expired = routed_database(user)
+    results.append(check(f"Após {settings.REPLICA_STICKY_SECONDS}s volta para a réplica ({expired})", expired != primary_db))
+
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify() else 1)
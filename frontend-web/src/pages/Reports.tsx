@@ -102,23 +102,28 @@ const Reports: React.FC = () => {
     },
   ];
 
-  const attendancesCount = reportData?.attendances?.length || 0;
   const hasFilters = !!(classId || studentId);
 
-  // Estatísticas calculadas
+  // Estatísticas: no relatório da turma vêm dos totais do backend (a lista de presenças é limitada)
   const stats = useMemo(() => {
+    if (reportData && typeof reportData.total_attendances === 'number') {
+      const byMethod = reportData.attendances_by_method || {};
+      return {
+        total: reportData.total_attendances,
+        qrcode: byMethod.qrcode || 0,
+        manual: byMethod.manual || 0,
+        uniqueStudents: (reportData.students || []).filter((s: { present_count: number }) => s.present_count > 0).length,
+      };
+    }
+
     const attendances = reportData?.attendances || [];
-    const qrcodeCount = attendances.filter((a: Attendance) => a.method === 'qrcode').length;
-    const manualCount = attendances.filter((a: Attendance) => a.method === 'manual').length;
-    const uniqueStudents = new Set(attendances.map((a: Attendance) => a.student_id)).size;
-    
     return {
-      total: attendancesCount,
-      qrcode: qrcodeCount,
-      manual: manualCount,
-      uniqueStudents,
+      total: attendances.length,
+      qrcode: attendances.filter((a: Attendance) => a.method === 'qrcode').length,
+      manual: attendances.filter((a: Attendance) => a.method === 'manual').length,
+      uniqueStudents: new Set(attendances.map((a: Attendance) => a.student_id)).size,
     };
-  }, [reportData, attendancesCount]);
+  }, [reportData]);
 
   return (
     <Box>
@@ -228,7 +233,7 @@ const Reports: React.FC = () => {
           }
           subheader={
             hasFilters
-              ? `${attendancesCount} registro${attendancesCount !== 1 ? 's' : ''} encontrado${attendancesCount !== 1 ? 's' : ''}`
+              ? `${stats.total} registro${stats.total !== 1 ? 's' : ''} encontrado${stats.total !== 1 ? 's' : ''}`
               : 'Selecione uma turma ou aluno para visualizar o relatório'
           }
           action={
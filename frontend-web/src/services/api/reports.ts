@@ -15,7 +15,8 @@ export const reportsApi = {
   },
 
   getClassReport: async (classId: string, month?: number, year?: number) => {
-    const params: any = {};
+    // A lista de presenças é só para a tabela (limitada); os totais vêm no resumo do relatório
+    const params: any = { include_attendances: true, limit: 1000 };
     if (month) params.month = month;
     if (year) params.year = year;
     const response = await api.get(`/reports/classes/${classId}/report`, { params });